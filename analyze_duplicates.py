@@ -4,27 +4,76 @@ Product Duplicate Analysis Script for NK Beauty Database
 Analyzes products_data.json for potential duplicates and generates detailed report
 """
 
+import argparse
 import json
 import re
 from collections import defaultdict, Counter
 from difflib import SequenceMatcher
-from typing import Dict, List, Tuple, Set
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Tuple, Set
+import os
+import time
 import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from catalog_reader import ANALYSIS_FIELDS, full_product, load_catalog
+from content_fingerprint import SimHashIndex, content_text, simhash
+from duplicate_report import (AnalysisResult, BrandAnalysis, DuplicatePair, render_detailed_json,
+                              render_text_report, write_pairs_jsonl)
+from product_features import FeatureCache, ProductFeatures, feature_key
+from similarity_index import MinHashLSH
 
 class ProductDuplicateAnalyzer:
-    def __init__(self, json_file_path: str):
+    # Brands covered by the report
+    TARGET_BRANDS = ['Genosys', 'Theraderm', 'MeLine']
+
+    # Below this many distinct names all-pairs scoring beats building the LSH index
+    LSH_MIN_NAMES = 200
+
+    # Shorter description + ingredients texts are too generic to fingerprint
+    MIN_CONTENT_WORDS = 12
+
+    # Similar-name threshold per scorer; TF-IDF cosine runs on a lower scale than ratio()
+    DEFAULT_THRESHOLDS = {'sequence': 0.85, 'tfidf': 0.7}
+
+    def __init__(self, json_file_path: str, similar_method: str = 'lsh', lsh_params: Dict = None,
+                 feature_cache_path: str = None, scorer: str = 'sequence', tfidf_params: Dict = None,
+                 use_descriptions: bool = False, similar_threshold: Optional[float] = None,
+                 content_distance: Optional[int] = 3):
         self.json_file_path = json_file_path
+        self.similar_method = similar_method
+        self.lsh_params = lsh_params or {}
+        # 'sequence' scores candidate pairs with SequenceMatcher, 'tfidf' scores
+        # whole brand blocks with n-gram TF-IDF cosine (see tfidf_scorer.py)
+        if scorer not in ('sequence', 'tfidf'):
+            raise ValueError(f"Unknown scorer '{scorer}'")
+        self.scorer = scorer
+        self.tfidf_params = tfidf_params or {}
+        self.use_descriptions = use_descriptions
+        self.similar_threshold = (self.DEFAULT_THRESHOLDS[scorer] if similar_threshold is None
+                                  else similar_threshold)
+        # Max SimHash bits apart for near-identical description/ingredients; None disables
+        self.content_distance = content_distance
+        # Normalized names and sizes, computed once per product and optionally persisted
+        self.feature_cache = FeatureCache(feature_cache_path)
         self.products = []
         self.duplicates = defaultdict(list)
         self.recommendations = []
+        self.result: Optional[AnalysisResult] = None
+
+    def __getstate__(self) -> Dict:
+        # Pool workers get their brand's products as arguments, not the whole catalog
+        state = self.__dict__.copy()
+        state['products'] = []
+        state['result'] = None
+        return state
 
     def load_products(self) -> None:
-        """Load products from JSON file"""
+        """Load products from JSON file, keeping only the compared fields in memory"""
         try:
-            with open(self.json_file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.products = data.get('products', [])
-                print(f"Loaded {len(self.products)} products")
+            self.products = load_catalog(self.json_file_path, ANALYSIS_FIELDS)
+            self.result = None
+            print(f"Loaded {len(self.products)} products")
         except Exception as e:
             print(f"Error loading products: {e}")
 
@@ -88,14 +137,38 @@ class ProductDuplicateAnalyzer:
                 brands[brand].append(product)
         return brands
 
+    def extract_features(self, product: dict) -> ProductFeatures:
+        """Compute the comparison features of one product"""
+        name = (product.get('name', '') or '').strip()
+        product_id = (product.get('product_id', '') or '').strip()
+        if not name:
+            return ProductFeatures('', '', '', '', (), product_id)
+
+        clean_name, size = self.extract_size_info(name, product.get('size', ''))
+        clean_normalized = self.normalize_name(clean_name)
+        return ProductFeatures(name, self.normalize_name(name), clean_normalized, size,
+                               tuple(clean_normalized.split()), product_id)
+
+    def features_for(self, products: List[dict]) -> List[ProductFeatures]:
+        """Features of every product, reused from the feature cache where the product is unchanged"""
+        features = []
+        for product in products:
+            key = feature_key(product)
+            cached = self.feature_cache.get(key)
+            if cached is None:
+                cached = self.extract_features(product)
+                self.feature_cache.put(key, cached)
+            features.append(cached)
+        return features
+
     def find_exact_duplicates(self, products: List[dict]) -> List[Tuple[dict, dict, str]]:
         """Find products with exact name matches"""
         duplicates = []
         normalized_names = {}
 
-        for product in products:
-            name = product.get('name', '').strip()
-            normalized = self.normalize_name(name)
+        for product, features in zip(products, self.features_for(products)):
+            name = features.name
+            normalized = features.normalized
 
             if normalized and normalized in normalized_names:
                 original = normalized_names[normalized]
@@ -107,42 +180,166 @@ class ProductDuplicateAnalyzer:
 
         return duplicates
 
-    def find_similar_duplicates(self, products: List[dict], threshold: float = 0.85) -> List[Tuple[dict, dict, str]]:
-        """Find products with similar names"""
-        duplicates = []
-
-        for i, product1 in enumerate(products):
-            name1 = product1.get('name', '').strip()
-            if not name1:
+    def candidate_pairs(self, names: List[str], method: str = 'lsh') -> Iterable[Tuple[int, int]]:
+        """Index pairs (i < j, ascending) of the names worth scoring
+
+        'all-pairs' returns every pair; 'lsh' only pairs sharing a MinHash
+        LSH bucket (see similarity_index.MinHashLSH). Small sets are cheaper
+        to compare exhaustively, so 'lsh' falls back to all pairs below
+        LSH_MIN_NAMES names.
+        """
+        if method == 'all-pairs' or (method == 'lsh' and len(names) < self.LSH_MIN_NAMES):
+            return combinations(range(len(names)), 2)
+        if method != 'lsh':
+            raise ValueError(f"Unknown candidate method '{method}'")
+
+        index = MinHashLSH(**self.lsh_params)
+        index.add_all(enumerate(names))
+        return index.candidate_pairs()
+
+    @staticmethod
+    def name_groups(features: List[ProductFeatures]) -> Dict[str, List[int]]:
+        """Positions of the named products per size-less normalized name, in first-seen order"""
+        groups = defaultdict(list)
+        for position, product_features in enumerate(features):
+            if product_features.name:
+                groups[product_features.clean_normalized].append(position)
+        return groups
+
+    def similar_name_pairs(self, features: List[ProductFeatures], threshold: float = None,
+                           method: str = 'lsh', descriptions: List[str] = None) -> List[Tuple[int, int, float]]:
+        """(position1, position2, similarity) of named products at or above the threshold
+        (default similar_threshold), in all-pairs order
+
+        Each distinct normalized name is indexed and scored once; products
+        sharing a normalized name are exact duplicates and never compared.
+        """
+        if threshold is None:
+            threshold = self.similar_threshold
+        if self.scorer == 'tfidf':
+            return self.tfidf_name_pairs(features, threshold, descriptions)
+
+        groups = self.name_groups(features)
+        names = list(groups)
+
+        matches = []
+        for a, b in self.candidate_pairs(names, method):
+            name_a, name_b = names[a], names[b]
+
+            # Cheap upper bounds of ratio() rule out most pairs before the full comparison
+            matcher = SequenceMatcher(None, name_a, name_b)
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
                 continue
 
-            clean_name1, size1 = self.extract_size_info(name1, product1.get('size', ''))
-            normalized1 = self.normalize_name(clean_name1)
+            # ratio() depends on argument order, which follows product order
+            scores = {}
+            for p in groups[name_a]:
+                for q in groups[name_b]:
+                    i, j, key = (p, q, (name_a, name_b)) if p < q else (q, p, (name_b, name_a))
+                    if key not in scores:
+                        scores[key] = self.calculate_similarity(*key)
+                    if scores[key] >= threshold:
+                        matches.append((i, j, scores[key]))
+
+        matches.sort()
+        return matches
+
+    def tfidf_name_pairs(self, features: List[ProductFeatures], threshold: float = None,
+                         descriptions: List[str] = None) -> List[Tuple[int, int, float]]:
+        """Batch TF-IDF cosine counterpart of similar_name_pairs, blending in descriptions when given"""
+        if threshold is None:
+            threshold = self.similar_threshold
+        from tfidf_scorer import TfidfScorer
+
+        scorer = TfidfScorer(**self.tfidf_params)
+        groups = self.name_groups(features)
+
+        if descriptions is None:
+            matches = []
+            names = list(groups)
+            for a, b, score in scorer.similar_pairs(names, threshold):
+                for p in groups[names[a]]:
+                    for q in groups[names[b]]:
+                        matches.append((min(p, q), max(p, q), score))
+            matches.sort()
+            return matches
+
+        # Descriptions differ per product, so every named product gets its own row
+        positions = [position for members in groups.values() for position in members]
+        positions.sort()
+        names = [features[position].clean_normalized for position in positions]
+        normalized_descriptions = [self.normalize_name(descriptions[position]) for position in positions]
+        return [(positions[a], positions[b], score)
+                for a, b, score in scorer.similar_pairs(names, threshold, normalized_descriptions)
+                if names[a] != names[b]]
+
+    def find_similar_duplicates(self, products: List[dict], threshold: float = None,
+                                method: str = None) -> List[Tuple[dict, dict, str]]:
+        """Find products with similar names ('lsh' or 'all-pairs' candidates, default similar_method)"""
+        if threshold is None:
+            threshold = self.similar_threshold
+        duplicates = []
+        features = self.features_for(products)
+        descriptions = ([product.get('description', '') or '' for product in products]
+                        if self.use_descriptions else None)
 
-            for j, product2 in enumerate(products[i+1:], i+1):
-                name2 = product2.get('name', '').strip()
-                if not name2:
-                    continue
+        for i, j, similarity in self.similar_name_pairs(features, threshold, method or self.similar_method,
+                                                        descriptions):
+            product1, product2 = products[i], products[j]
+            name1, size1 = features[i].name, features[i].size
+            name2, size2 = features[j].name, features[j].size
 
-                clean_name2, size2 = self.extract_size_info(name2, product2.get('size', ''))
-                normalized2 = self.normalize_name(clean_name2)
+            # Check if they have different sizes (legitimate variants)
+            if size1 != size2 and size1 and size2:
+                if similarity >= 0.95:  # Very similar names with different sizes
+                    reason = f"Similar names with different sizes - likely variants: '{name1}' ({size1}) vs '{name2}' ({size2}) - Similarity: {similarity:.2f}"
+                    duplicates.append((product1, product2, reason))
+            else:
+                reason = f"Similar names: '{name1}' vs '{name2}' - Similarity: {similarity:.2f}"
+                duplicates.append((product1, product2, reason))
 
-                # Skip if already found as exact duplicate
-                if normalized1 == normalized2:
-                    continue
+        return duplicates
 
-                similarity = self.calculate_similarity(normalized1, normalized2)
+    def check_similar_recall(self, products: List[dict], threshold: float = None) -> Dict[str, float]:
+        """Compare LSH candidates against all-pairs scoring on the same products"""
+        if threshold is None:
+            threshold = self.similar_threshold
+        features = self.features_for(products)
+        expected = {(i, j) for i, j, _ in self.similar_name_pairs(features, threshold, method='all-pairs')}
+        names = list(self.name_groups(features))
+        # Measure the index itself, not the small-set fallback
+        min_names, self.LSH_MIN_NAMES = self.LSH_MIN_NAMES, 0
+        try:
+            found = {(i, j) for i, j, _ in self.similar_name_pairs(features, threshold, method='lsh')}
+            candidates = sum(1 for _ in self.candidate_pairs(names, 'lsh'))
+        finally:
+            self.LSH_MIN_NAMES = min_names
+
+        return {
+            'expected': len(expected),
+            'found': len(found & expected),
+            'recall': len(found & expected) / len(expected) if expected else 1.0,
+            'candidate_pairs': candidates,
+            'all_pairs': len(names) * (len(names) - 1) // 2,
+        }
 
-                if similarity >= threshold:
-                    # Check if they have different sizes (legitimate variants)
-                    if size1 != size2 and size1 and size2:
-                        if similarity >= 0.95:  # Very similar names with different sizes
-                            reason = f"Similar names with different sizes - likely variants: '{name1}' ({size1}) vs '{name2}' ({size2}) - Similarity: {similarity:.2f}"
-                            duplicates.append((product1, product2, reason))
-                    else:
-                        reason = f"Similar names: '{name1}' vs '{name2}' - Similarity: {similarity:.2f}"
-                        duplicates.append((product1, product2, reason))
+    def find_content_duplicates(self, products: List[dict],
+                                max_distance: int = None) -> List[Tuple[dict, dict, str]]:
+        """Find products whose description and ingredients are near-identical (SimHash Hamming distance)"""
+        if max_distance is None:
+            max_distance = self.content_distance
+        index = SimHashIndex(max_distance)
+        for position, product in enumerate(products):
+            text = content_text(full_product(product))
+            if len(text.split()) >= self.MIN_CONTENT_WORDS:
+                index.add(position, simhash(text))
 
+        duplicates = []
+        for i, j, distance in index.near_pairs():
+            product1, product2 = products[i], products[j]
+            reason = (f"Near-identical description/ingredients: '{product1.get('name', '')}' vs "
+                      f"'{product2.get('name', '')}' - {distance} of 64 fingerprint bits differ")
+            duplicates.append((product1, product2, reason))
         return duplicates
 
     def find_id_duplicates(self, products: List[dict]) -> List[Tuple[dict, dict, str]]:
@@ -150,8 +347,8 @@ class ProductDuplicateAnalyzer:
         duplicates = []
         product_ids = {}
 
-        for product in products:
-            product_id = product.get('product_id', '').strip()
+        for product, features in zip(products, self.features_for(products)):
+            product_id = features.product_id
             if product_id:
                 if product_id in product_ids:
                     original = product_ids[product_id]
@@ -169,6 +366,7 @@ class ProductDuplicateAnalyzer:
             'exact': [],
             'similar': [],
             'id_conflicts': [],
+            'content': [],
             'recommendations': []
         }
 
@@ -184,8 +382,17 @@ class ProductDuplicateAnalyzer:
         id_dups = self.find_id_duplicates(products)
         results['id_conflicts'] = id_dups
 
+        # Find near-identical content, leaving out pairs the name and id checks already flagged
+        content_dups = []
+        if self.content_distance is not None:
+            flagged = {frozenset((id(prod1), id(prod2))) for prod1, prod2, _ in exact_dups + similar_dups + id_dups}
+            content_dups = [dup for dup in self.find_content_duplicates(products)
+                            if frozenset((id(dup[0]), id(dup[1]))) not in flagged]
+        results['content'] = content_dups
+
         # Generate recommendations
-        for dup_type, dups in [('exact', exact_dups), ('similar', similar_dups), ('id_conflicts', id_dups)]:
+        for dup_type, dups in [('exact', exact_dups), ('similar', similar_dups), ('id_conflicts', id_dups),
+                               ('content', content_dups)]:
             for prod1, prod2, reason in dups:
                 recommendation = self.generate_recommendation(prod1, prod2, reason, dup_type)
                 results['recommendations'].append(recommendation)
@@ -244,11 +451,24 @@ class ProductDuplicateAnalyzer:
             recommendation['action'] = 'FIX_ID_CONFLICT'
             recommendation['reason_detail'] = "Same product_id with different products - needs unique IDs"
 
+        elif dup_type == 'content':
+            # Size variants usually share their description
+            size1 = self.extract_size_info(prod1.get('name', ''), prod1.get('size', ''))[1]
+            size2 = self.extract_size_info(prod2.get('name', ''), prod2.get('size', ''))[1]
+
+            if size1 != size2 and size1 and size2:
+                recommendation['action'] = 'KEEP_BOTH'
+                recommendation['reason_detail'] = "Same content in different sizes - legitimate product variants"
+            else:
+                recommendation['action'] = 'REVIEW_NEEDED'
+                recommendation['reason_detail'] = "Same description/ingredients under another name - likely one product"
+
         return recommendation
 
     def calculate_completeness_score(self, product: dict) -> int:
         """Calculate how complete a product's data is"""
         score = 0
+        product = full_product(product)
         fields_to_check = [
             'name', 'description', 'price', 'brand', 'size',
             'ingredients', 'usage_instructions', 'features', 'benefits',
@@ -256,171 +476,127 @@ class ProductDuplicateAnalyzer:
         ]
 
         for field in fields_to_check:
-            value = product.get(field, '')
-            if value:
-                if isinstance(value, list):
-                    score += len(value)
-                elif isinstance(value, str) and value.strip():
-                    score += len(value.split()) // 5 + 1  # Rough word count score
-                else:
-                    score += 1
+            score += self.field_completeness(product.get(field, ''))
 
         return score
 
-    def generate_report(self) -> str:
-        """Generate comprehensive duplicate analysis report"""
-        brands = self.group_products_by_brand()
-
-        # Target brands to analyze
-        target_brands = ['Genosys', 'Theraderm', 'MeLine']
-
-        report = []
-        report.append("PRODUCT DUPLICATE ANALYSIS REPORT")
-        report.append("=" * 50)
-        report.append("")
-
-        total_current = 0
-        total_after = 0
-        brand_results = {}
-
-        for brand in target_brands:
-            brand_products = brands.get(brand, [])
-            current_count = len(brand_products)
-            total_current += current_count
-
-            if brand_products:
-                analysis = self.analyze_brand_duplicates(brand, brand_products)
-                brand_results[brand] = analysis
-
-                report.append(f"{brand.upper()} DUPLICATES ({current_count} products):")
-                report.append("-" * 40)
-
-                if not any(analysis[key] for key in ['exact', 'similar', 'id_conflicts']):
-                    report.append("No duplicates found.")
-                    estimated_after = current_count
-                else:
-                    # Count potential removals
-                    removals = 0
-                    for rec in analysis['recommendations']:
-                        if rec['action'] in ['REMOVE_PRODUCT1', 'REMOVE_PRODUCT2']:
-                            removals += 1
-                        elif rec['action'] == 'MERGE_OR_REMOVE':
-                            removals += 0.5  # Estimate half will be removed
-
-                    estimated_after = max(current_count - int(removals), 0)
-
-                    # Report exact duplicates
-                    if analysis['exact']:
-                        report.append("\nEXACT DUPLICATES:")
-                        for prod1, prod2, reason in analysis['exact']:
-                            report.append(f"  • {prod1.get('name', 'N/A')} vs {prod2.get('name', 'N/A')}")
-                            report.append(f"    Reason: {reason}")
-
-                    # Report similar duplicates
-                    if analysis['similar']:
-                        report.append("\nSIMILAR DUPLICATES:")
-                        for prod1, prod2, reason in analysis['similar']:
-                            report.append(f"  • {prod1.get('name', 'N/A')} vs {prod2.get('name', 'N/A')}")
-                            report.append(f"    Reason: {reason}")
-
-                    # Report ID conflicts
-                    if analysis['id_conflicts']:
-                        report.append("\nID CONFLICTS:")
-                        for prod1, prod2, reason in analysis['id_conflicts']:
-                            report.append(f"  • {prod1.get('name', 'N/A')} vs {prod2.get('name', 'N/A')}")
-                            report.append(f"    Reason: {reason}")
-
-                    # Report recommendations
-                    report.append("\nRECOMMENDATIONS:")
-                    for rec in analysis['recommendations']:
-                        action_map = {
-                            'REMOVE_PRODUCT1': '❌ Remove first product',
-                            'REMOVE_PRODUCT2': '❌ Remove second product',
-                            'MERGE_OR_REMOVE': '🔄 Merge or remove duplicate',
-                            'KEEP_BOTH': '✅ Keep both (different variants)',
-                            'FIX_ID_CONFLICT': '🔧 Fix ID conflict',
-                            'REVIEW_NEEDED': '👁️ Manual review needed'
-                        }
-                        action_desc = action_map.get(rec['action'], rec['action'])
-                        report.append(f"  • {rec['product1']['name']} vs {rec['product2']['name']}")
-                        report.append(f"    Action: {action_desc}")
-                        if rec.get('reason_detail'):
-                            report.append(f"    Detail: {rec['reason_detail']}")
-
-                total_after += estimated_after
-                report.append(f"\nEstimated count after cleanup: {estimated_after}")
-                report.append("")
-
-        # Summary
-        report.append("SUMMARY:")
-        report.append("-" * 20)
-        for brand in target_brands:
-            current = len(brands.get(brand, []))
-            # Recalculate estimated after cleanup
-            if brand in brand_results:
-                removals = sum(1 for rec in brand_results[brand]['recommendations']
-                             if rec['action'] in ['REMOVE_PRODUCT1', 'REMOVE_PRODUCT2'])
-                partial_removals = sum(0.5 for rec in brand_results[brand]['recommendations']
-                                     if rec['action'] == 'MERGE_OR_REMOVE')
-                estimated_after = max(current - removals - int(partial_removals), 0)
-            else:
-                estimated_after = current
-            report.append(f"• {brand}: {current} → {estimated_after}")
-
-        report.append(f"\nTotal: {total_current} → ~{total_after}")
-        report.append(f"Expected reduction: ~{total_current - total_after} products")
-
-        # Detailed recommendations section
-        report.append("\n" + "="*50)
-        report.append("DETAILED RECOMMENDATIONS FOR CLEANUP:")
-        report.append("="*50)
+    @staticmethod
+    def field_completeness(value) -> int:
+        """Completeness of one field value: list length, rough word count, or 1 for any other set value"""
+        if not value:
+            return 0
+        if isinstance(value, list):
+            return len(value)
+        if isinstance(value, str) and value.strip():
+            return len(value.split()) // 5 + 1  # Rough word count score
+        return 1
+
+    def analyze_brand(self, brand: str, products: List[dict]) -> BrandAnalysis:
+        """Typed counterpart of analyze_brand_duplicates"""
+        results = self.analyze_brand_duplicates(brand, products)
+        pairs = {
+            dup_type: [DuplicatePair(dup_type, prod1, prod2, reason) for prod1, prod2, reason in results[dup_type]]
+            for dup_type in ('exact', 'similar', 'id_conflicts', 'content')
+        }
+        return BrandAnalysis(brand, len(products), pairs['exact'], pairs['similar'], pairs['id_conflicts'],
+                             pairs['content'], results['recommendations'])
 
-        for brand in target_brands:
-            if brand in brand_results and brand_results[brand]['recommendations']:
-                report.append(f"\n{brand.upper()} CLEANUP ACTIONS:")
-                report.append("-" * 30)
+    def analyze(self, workers: Optional[int] = None) -> AnalysisResult:
+        """Run every detector once per target brand, in a process pool when there is more than one brand
 
-                for i, rec in enumerate(brand_results[brand]['recommendations'], 1):
-                    report.append(f"\n{i}. DUPLICATE PAIR:")
-                    report.append(f"   Product A: {rec['product1']['name']} (ID: {rec['product1']['id']})")
-                    report.append(f"   Product B: {rec['product2']['name']} (ID: {rec['product2']['id']})")
-                    report.append(f"   Issue: {rec['reason']}")
-                    report.append(f"   Recommended Action: {rec['action']}")
-                    if rec.get('reason_detail'):
-                        report.append(f"   Details: {rec['reason_detail']}")
+        `workers=1` keeps the analysis in this process. The result is kept
+        in `self.result` for the renderers.
+        """
+        brands = self.group_products_by_brand()
+        target_brands = list(self.TARGET_BRANDS)
+        jobs = [(brand, brands[brand]) for brand in target_brands if brands.get(brand)]
+
+        # Features are computed here so the feature cache sees them; workers get a warm copy
+        for _, products in jobs:
+            self.features_for(products)
+
+        if workers == 1 or len(jobs) < 2:
+            analyses = [self.analyze_brand(brand, products) for brand, products in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+                analyses = list(pool.map(_analyze_brand, [self] * len(jobs), *zip(*jobs)))
+
+        self.result = AnalysisResult(
+            analysis_timestamp=time.strftime('%Y-%m-%d'),
+            total_products=len(self.products),
+            target_brands=target_brands,
+            brand_counts={brand: len(brands.get(brand, [])) for brand in target_brands},
+            brands={analysis.brand: analysis for analysis in analyses},
+        )
+        return self.result
 
-        return "\n".join(report)
+    def generate_report(self) -> str:
+        """Generate comprehensive duplicate analysis report"""
+        return render_text_report(self.result or self.analyze())
 
     def save_detailed_analysis(self, output_file: str) -> None:
         """Save detailed analysis to JSON for further processing"""
-        brands = self.group_products_by_brand()
-        target_brands = ['Genosys', 'Theraderm', 'MeLine']
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(render_detailed_json(self.result or self.analyze()), f, indent=2, ensure_ascii=False)
 
-        detailed_analysis = {
-            'analysis_timestamp': '2025-09-15',
-            'total_products': len(self.products),
-            'brands': {}
-        }
+    def save_pairs_jsonl(self, output_file: str) -> int:
+        """Stream every flagged pair with its recommendation to a JSON-lines file"""
+        with open(output_file, 'w', encoding='utf-8') as f:
+            return write_pairs_jsonl(self.result or self.analyze(), f)
 
-        for brand in target_brands:
-            brand_products = brands.get(brand, [])
-            if brand_products:
-                analysis = self.analyze_brand_duplicates(brand, brand_products)
-                detailed_analysis['brands'][brand] = {
-                    'current_count': len(brand_products),
-                    'duplicates_found': len(analysis['exact']) + len(analysis['similar']) + len(analysis['id_conflicts']),
-                    'recommendations': analysis['recommendations']
-                }
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(detailed_analysis, f, indent=2, ensure_ascii=False)
+def _analyze_brand(analyzer: ProductDuplicateAnalyzer, brand: str, products: List[dict]) -> BrandAnalysis:
+    """Process-pool entry point for one brand"""
+    return analyzer.analyze_brand(brand, products)
+
 
 def main():
     """Main function to run the duplicate analysis"""
-    json_file = "/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/src/data/products_data.json"
+    parser = argparse.ArgumentParser(description="Find duplicate products in a scraped catalog")
+    parser.add_argument('--input', default="/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/src/data/products_data.json",
+                        help="Products JSON ({\"products\": [...]})")
+    parser.add_argument('--report', default="/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/duplicate_analysis_report.txt",
+                        help="Text report output")
+    parser.add_argument('--details', default="/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/duplicate_analysis_detailed.json",
+                        help="Detailed JSON analysis output")
+    parser.add_argument('--method', choices=['lsh', 'all-pairs'], default='lsh',
+                        help="Candidate generation for similar names (all-pairs compares every pair)")
+    parser.add_argument('--scorer', choices=['sequence', 'tfidf'], default='sequence',
+                        help="Pairwise SequenceMatcher or batch n-gram TF-IDF cosine (needs numpy and scipy)")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Similarity at which names count as similar duplicates "
+                             "(default: 0.85 for sequence, 0.7 for tfidf)")
+    parser.add_argument('--use-descriptions', action='store_true',
+                        help="Blend description similarity into the tfidf score")
+    parser.add_argument('--content-distance', type=int, default=3,
+                        help="Max SimHash bits apart for near-identical description/ingredients")
+    parser.add_argument('--no-content', action='store_true',
+                        help="Skip the description/ingredients fingerprint check")
+    parser.add_argument('--feature-cache', default=None,
+                        help="JSON file persisting per-product features between runs")
+    parser.add_argument('--pairs-jsonl', default=None,
+                        help="Also stream every flagged pair with its recommendation to this JSON-lines file")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Processes analyzing brands in parallel (1 analyzes in this process)")
+    parser.add_argument('--check-recall', action='store_true',
+                        help="Compare LSH candidates against all-pairs for every brand and exit")
+    parser.add_argument('--index', default=None,
+                        help="Incremental mode: compare only new or changed products against this SQLite "
+                             "dedup index, update it in place and exit")
+    parser.add_argument('--prune', action='store_true',
+                        help="With --index, drop indexed products missing from the input (input is the full catalog)")
+    args = parser.parse_args()
+    if args.index and args.scorer != 'sequence':
+        parser.error("--index scores with SequenceMatcher; it cannot be combined with --scorer tfidf")
+
+    json_file = args.input
 
     print("Starting Product Duplicate Analysis...")
-    analyzer = ProductDuplicateAnalyzer(json_file)
+    analyzer = ProductDuplicateAnalyzer(json_file, similar_method=args.method,
+                                        feature_cache_path=args.feature_cache, scorer=args.scorer,
+                                        use_descriptions=args.use_descriptions,
+                                        similar_threshold=args.threshold,
+                                        content_distance=None if args.no_content else args.content_distance)
 
     # Load products
     analyzer.load_products()
@@ -429,24 +605,55 @@ def main():
         print("No products loaded. Exiting.")
         return
 
-    # Generate report
+    if args.check_recall:
+        for brand, products in sorted(analyzer.group_products_by_brand().items()):
+            result = analyzer.check_similar_recall(products)
+            print(f"{brand}: recall {result['recall']:.3f} ({result['found']}/{result['expected']} pairs), "
+                  f"{result['candidate_pairs']}/{result['all_pairs']} name pairs scored")
+        return
+
+    if args.index:
+        from dedup_index import DedupIndex
+
+        with DedupIndex(args.index, analyzer) as index:
+            update = index.update(analyzer.products, prune=args.prune)
+            clusters = len(index.clusters())
+        print(f"🗂️ Index {args.index}: {update['new']} new, {update['changed']} changed, "
+              f"{update['unchanged']} unchanged, {update['removed']} removed, {update['skipped']} skipped in {update['seconds']}s")
+        for match in update['matches']:
+            print(f"  • [{match['type']}] {match['name']} vs {match['match_name']} ({match['score']:.2f})")
+        print(f"{len(update['matches'])} new matches, {clusters} duplicate clusters indexed")
+        if args.pairs_jsonl:
+            with open(args.pairs_jsonl, 'w', encoding='utf-8') as f:
+                for match in update['matches']:
+                    f.write(json.dumps(match, ensure_ascii=False) + '\n')
+            print(f"Matches saved to: {args.pairs_jsonl}")
+        return
+
+    # Analyze once, then render every output from the same result
     print("Analyzing duplicates...")
+    analyzer.analyze(workers=args.workers)
     report = analyzer.generate_report()
 
     # Save report
-    report_file = "/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/duplicate_analysis_report.txt"
+    report_file = args.report
     with open(report_file, 'w', encoding='utf-8') as f:
         f.write(report)
 
     # Save detailed analysis
-    analysis_file = "/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/duplicate_analysis_detailed.json"
+    analysis_file = args.details
     analyzer.save_detailed_analysis(analysis_file)
+    if args.pairs_jsonl:
+        pairs = analyzer.save_pairs_jsonl(args.pairs_jsonl)
+        print(f"Pairs saved to: {args.pairs_jsonl} ({pairs} pairs)")
+    analyzer.feature_cache.save()
 
     print(f"\nAnalysis complete!")
     print(f"Report saved to: {report_file}")
     print(f"Detailed analysis saved to: {analysis_file}")
+    print(f"Feature cache: {analyzer.feature_cache.hits} hits, {analyzer.feature_cache.misses} misses")
     print("\n" + "="*50)
     print(report)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Apply duplicate recommendations to a catalog
+Reads the analyzer's recommendations (duplicate_analysis_detailed.json or a
+--pairs-jsonl stream), then streams the catalog once: duplicates are merged
+into their most complete member, conflicting ids are renamed, and the cleaned
+catalog is written out (or only described, in dry-run mode)
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+from analyze_duplicates import ProductDuplicateAnalyzer
+from catalog_reader import iter_catalog
+from dedup_utils import UnionFind
+
+# Actions that leave one product where there were several
+MERGE_ACTIONS = ('REMOVE_PRODUCT1', 'REMOVE_PRODUCT2', 'MERGE_OR_REMOVE')
+# Never copied from a merged-away duplicate, so the survivor keeps its identity
+IDENTITY_FIELDS = ('product_id', 'name', 'url')
+
+# (product_id, name, size, url): how recommendations refer to catalog products
+ProductKey = Tuple[str, str, str, str]
+
+
+def product_key(product) -> ProductKey:
+    return (product.get('product_id', '') or '', product.get('name', '') or '',
+            product.get('size', '') or '', product.get('url', '') or '')
+
+
+def reference_key(reference: Dict) -> ProductKey:
+    """product_key of a product1/product2 entry of a recommendation"""
+    return (reference.get('id', '') or '', reference.get('name', '') or '',
+            reference.get('size', '') or '', reference.get('url', '') or '')
+
+
+def load_recommendations(path: str) -> Iterator[Dict]:
+    """Recommendations from the detailed analysis JSON, or one per line from a .jsonl pairs file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    for analysis in data.get('brands', {}).values():
+        yield from analysis.get('recommendations', [])
+
+
+def _id_suffix(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text.casefold().replace('ı', 'i'))
+    text = ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-')
+
+
+class RecommendationApplier:
+    """Turns recommendations into merge groups and id renames, then applies them in one catalog pass
+
+    Products are found through an index by product_id, so the pass is O(n)
+    in the catalog size. Merge groups are the connected pairs of the
+    REMOVE_*/MERGE_OR_REMOVE recommendations; a group's members are held
+    back until its last one is read, and the merged product is written at
+    that position. KEEP_BOTH and REVIEW_NEEDED pairs are left alone.
+    """
+
+    def __init__(self, analyzer: Optional[ProductDuplicateAnalyzer] = None):
+        self.analyzer = analyzer or ProductDuplicateAnalyzer('')
+        # product_id -> {product key -> merge group}
+        self.groups_by_id: Dict[str, Dict[ProductKey, int]] = defaultdict(dict)
+        self.group_sizes: List[int] = []
+        self.renames: Set[ProductKey] = set()
+        # Every product_id of the catalog, so renamed ids never take one a later product has
+        self.catalog_ids: Set[str] = set()
+        self.actions = Counter()
+        self.changes: List[Dict] = []
+        self.stats = Counter()
+
+    def load(self, recommendations: Iterable[Dict]) -> 'RecommendationApplier':
+        keys: Dict[ProductKey, int] = {}
+        pairs = []
+        for rec in recommendations:
+            action = rec.get('action', 'REVIEW_NEEDED')
+            self.actions[action] += 1
+            key1, key2 = reference_key(rec['product1']), reference_key(rec['product2'])
+            if action in MERGE_ACTIONS:
+                pairs.append((keys.setdefault(key1, len(keys)), keys.setdefault(key2, len(keys))))
+            elif action == 'FIX_ID_CONFLICT':
+                # The first product of the id keeps it
+                self.renames.add(key2)
+
+        sets = UnionFind(len(keys))
+        for a, b in pairs:
+            sets.union(a, b)
+        by_index = list(keys)
+        for group, members in enumerate(sets.groups()):
+            self.group_sizes.append(len(members))
+            for member in members:
+                key = by_index[member]
+                self.groups_by_id[key[0]][key] = group
+        return self
+
+    def index_ids(self, products: Iterable) -> 'RecommendationApplier':
+        """Record the catalog's product ids; run over the whole catalog before apply"""
+        for product in products:
+            self.catalog_ids.add(product.get('product_id', '') or '')
+        return self
+
+    def merge(self, members: List[dict]) -> dict:
+        """The most complete member (first on ties), with any field another member has more of filled in"""
+        scores = [self.analyzer.calculate_completeness_score(product) for product in members]
+        survivor = max(range(len(members)), key=lambda i: (scores[i], -i))
+        merged = dict(members[survivor])
+        filled = []
+        for position, product in enumerate(members):
+            if position == survivor:
+                continue
+            for field, value in product.items():
+                if field in IDENTITY_FIELDS:
+                    continue
+                if self.analyzer.field_completeness(value) > self.analyzer.field_completeness(merged.get(field)):
+                    merged[field] = value
+                    filled.append(field)
+
+        self.stats['merged_groups'] += 1
+        self.stats['removed'] += len(members) - 1
+        self.changes.append({
+            'action': 'merge',
+            'kept': {'id': merged.get('product_id', ''), 'name': merged.get('name', '')},
+            'removed': [{'id': product.get('product_id', ''), 'name': product.get('name', '')}
+                        for position, product in enumerate(members) if position != survivor],
+            'filled_fields': sorted(set(filled))
+        })
+        return merged
+
+    def rename(self, product: dict, used_ids: Set[str]) -> dict:
+        """Copy of product with an id made unique from its size or name"""
+        old_id = product.get('product_id', '') or ''
+        suffix = _id_suffix(product.get('size', '') or '') or _id_suffix(product.get('name', '') or '') or 'variant'
+        new_id = f"{old_id}-{suffix}" if old_id else suffix
+        candidate, n = new_id, 2
+        while candidate in used_ids:
+            candidate, n = f"{new_id}-{n}", n + 1
+
+        self.stats['renamed'] += 1
+        self.changes.append({'action': 'rename', 'name': product.get('name', ''), 'from': old_id, 'to': candidate})
+        return dict(product, product_id=candidate)
+
+    def apply(self, products: Iterable[dict]) -> Iterator[dict]:
+        """Stream the cleaned catalog (ids recorded by index_ids are never given to renamed products)"""
+        pending: Dict[int, List[dict]] = defaultdict(list)
+        seen_keys: Dict[int, Set[ProductKey]] = defaultdict(set)
+        done: Set[int] = set()
+        used_ids = {key[0] for keys in self.groups_by_id.values() for key in keys} | self.catalog_ids
+        renamed: Set[ProductKey] = set()
+
+        for product in products:
+            self.stats['read'] += 1
+            key = product_key(product)
+            group = self.groups_by_id.get(key[0], {}).get(key)
+
+            if group is None:
+                if key in self.renames and key not in renamed:
+                    renamed.add(key)
+                    product = self.rename(product, used_ids)
+                used_ids.add(product.get('product_id', '') or '')
+                self.stats['written'] += 1
+                yield product
+                continue
+
+            if group in done:
+                # Another copy of an already merged product
+                self.stats['late_duplicates'] += 1
+                self.stats['removed'] += 1
+                continue
+            pending[group].append(product)
+            seen_keys[group].add(key)
+            if len(seen_keys[group]) == self.group_sizes[group]:
+                done.add(group)
+                merged = self.merge(pending.pop(group))
+                used_ids.add(merged.get('product_id', '') or '')
+                self.stats['written'] += 1
+                yield merged
+
+        # Groups with members missing from the catalog (analysis older than the catalog)
+        for group, members in pending.items():
+            self.stats['incomplete_groups'] += 1
+            self.stats['written'] += 1
+            yield self.merge(members) if len(members) > 1 else members[0]
+        self.stats['unmatched_groups'] = len(self.group_sizes) - len(done) - len(pending)
+        self.stats['unmatched_renames'] = len(self.renames - renamed)
+
+
+def _indented(value, indent: str) -> str:
+    return json.dumps(value, indent=2, ensure_ascii=False).replace('\n', '\n' + indent)
+
+
+def write_catalog(stream: IO[str], products: Iterable[dict], extras: Dict, bare: bool) -> None:
+    """Write products in the layout of json.dump(..., indent=2), one product at a time"""
+    indent = '  ' if bare else '    '
+    stream.write('[' if bare else '{\n  "products": [')
+    count = 0
+    for product in products:
+        stream.write((',\n' if count else '\n') + indent + _indented(product, indent))
+        count += 1
+    stream.write(('\n' + indent[:-2] if count else '') + ']')
+    if not bare:
+        for key, value in extras.items():
+            stream.write(f',\n  {json.dumps(key, ensure_ascii=False)}: {_indented(value, "  ")}')
+        stream.write('\n}')
+
+
+def _is_bare_array(path: str) -> bool:
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        while True:
+            char = f.read(1)
+            if not char or not char.isspace():
+                return char == '['
+
+
+def apply_to_file(applier: RecommendationApplier, catalog: str, output: Optional[str]) -> None:
+    """Run the pass over catalog, writing the result to output (dry run when None)"""
+    # A cheap first pass over the ids only, so renames cannot collide with products further on
+    applier.index_ids(iter_catalog(catalog, ('product_id',)))
+    extras: Dict = {}
+    cleaned = applier.apply(iter_catalog(catalog, extras=extras))
+    if output is None:
+        for _ in cleaned:
+            pass
+        return
+
+    # Stream into a temporary file beside the output so a failed run leaves the old catalog intact
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output) or '.', prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            write_catalog(f, cleaned, extras, _is_bare_array(catalog))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply duplicate recommendations to a catalog")
+    parser.add_argument('--input', default='public/data/products_data.json', help="Catalog to clean")
+    parser.add_argument('--recommendations', default='duplicate_analysis_detailed.json',
+                        help="Detailed analysis JSON or --pairs-jsonl output of analyze_duplicates.py")
+    parser.add_argument('--write', action='store_true', help="Write the cleaned catalog (default is a dry run)")
+    parser.add_argument('--output', help="Cleaned catalog path (default: <input>.cleaned.json)")
+    parser.add_argument('--changes', help="Save the list of merges and renames as JSON")
+    args = parser.parse_args()
+
+    applier = RecommendationApplier().load(load_recommendations(args.recommendations))
+    print(f"📋 Loaded {sum(applier.actions.values())} recommendations: "
+          + ', '.join(f"{action} {count}" for action, count in sorted(applier.actions.items())))
+
+    output = None
+    if args.write:
+        output = args.output or os.path.splitext(args.input)[0] + '.cleaned.json'
+    else:
+        print("🔍 Dry run - nothing will be written")
+    apply_to_file(applier, args.input, output)
+
+    stats = applier.stats
+    print(f"📦 {stats['read']} products read, {stats['written']} {'written' if output else 'would be written'}")
+    print(f"🔄 {stats['merged_groups']} duplicate groups merged, {stats['removed']} products removed")
+    print(f"🔧 {stats['renamed']} conflicting ids renamed")
+    missing = stats['incomplete_groups'] + stats['unmatched_groups'] + stats['unmatched_renames']
+    if missing:
+        print(f"⚠️ {missing} merges or renames refer to products missing from the catalog "
+              f"({stats['incomplete_groups']} merged partially) - is the analysis out of date?")
+
+    if args.changes:
+        with open(args.changes, 'w', encoding='utf-8') as f:
+            json.dump({'catalog': args.input, 'written_to': output, 'stats': dict(stats),
+                       'changes': applier.changes}, f, indent=2, ensure_ascii=False)
+        print(f"📄 Changes saved to: {args.changes}")
+    if output:
+        print(f"✅ Cleaned catalog saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
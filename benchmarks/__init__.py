@@ -0,0 +1,4 @@
+"""
+Offline benchmarks for the NK Beauty data tools
+Run from the repository root with `python -m benchmarks.run`
+"""
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Duplicate analyzer throughput benchmarks
+Runs ProductDuplicateAnalyzer on synthetic catalogs with planted exact,
+near and size-variant duplicates and reports pairs per second for the LSH
+index and for all-pairs scoring, plus the index's recall, the content
+fingerprint check and the cost of an incremental update against a
+persistent dedup index
+"""
+
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List
+
+from analyze_duplicates import ProductDuplicateAnalyzer
+from dedup_index import DedupIndex
+
+# Cold index builds go through the incremental path one product at a time,
+# so the incremental benchmark stops at this catalog size
+MAX_INDEX_SIZE = 10_000
+
+BRANDS = ['Genosys', 'Theraderm', 'MeLine', 'pHformula']
+LINES = ['Hydra', 'Age', 'Mela', 'AC', 'Pore', 'Sebo', 'Calm', 'Bright', 'Vita', 'Retino', 'Peptide',
+         'Derma', 'Pure', 'Ultra', 'Daily', 'Night', 'Intensive', 'Clear', 'Lift', 'Glow']
+PRODUCTS = ['Cleanse', 'Serum', 'Cream', 'Toner', 'Essence', 'Peel', 'Mask', 'Recovery', 'Solution',
+            'Balm', 'Gel', 'Emulsion', 'Ampoule', 'Oil', 'Foam', 'Lotion', 'Spray', 'Patch']
+MODIFIERS = ['', 'Plus', 'Mild', 'Forte', 'Complex', 'SPF 30', 'SPF 50', 'Sensitive', 'Pro', 'Rich',
+             'Light', 'Matrix', 'Boost', 'Repair', 'Care', 'Fix', 'Shield', 'Duo', 'Max', 'Soft']
+SIZES = ['15 ml', '20 ml', '30 ml', '50 ml', '75 ml', '100 ml', '150 ml', '200 ml', '250 ml', '500 ml']
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    """Swap two neighbouring letters or drop one"""
+    i = rng.randrange(1, len(name) - 1)
+    if rng.random() < 0.5:
+        return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+    return name[:i] + name[i + 1:]
+
+
+def synthetic_catalog(size: int, seed: int = 0, duplicate_rate: float = 0.15) -> List[Dict]:
+    """Catalog of `size` products across BRANDS; `duplicate_rate` of them duplicate an earlier product
+
+    Duplicates are split evenly between exact copies with different
+    punctuation/casing, names with a typo and the same product in another size.
+    """
+    rng = random.Random(seed)
+    products = []
+
+    for i in range(size):
+        if products and rng.random() < duplicate_rate:
+            original = rng.choice(products)
+            kind = rng.randrange(3)
+            base = original['base_name']
+            size_label = original['size']
+            if kind == 0:
+                base = base.upper() if rng.random() < 0.5 else base.replace(' ', ' - ', 1)
+            elif kind == 1:
+                base = _typo(base, rng)
+            else:
+                size_label = rng.choice([s for s in SIZES if s != size_label])
+            brand = original['brand']
+        else:
+            base = ' '.join(part for part in (rng.choice(LINES), rng.choice(PRODUCTS), rng.choice(MODIFIERS))
+                            if part)
+            size_label = rng.choice(SIZES)
+            brand = rng.choice(BRANDS)
+
+        products.append({
+            'product_id': f'p{i}',
+            'base_name': base,
+            'name': f'{base} {size_label}',
+            'size': size_label,
+            'brand': brand,
+            'description': f'{base} {brand} ürün açıklaması',
+            'url': f'https://nurederm.com/urun/p{i}',
+        })
+
+    return products
+
+
+def sample_block(brands: Dict[str, List[Dict]], max_pairs: int, seed: int = 0) -> List[Dict]:
+    """Random block of the largest brand with at most `max_pairs` all-pairs comparisons"""
+    largest = max(brands.values(), key=len)
+    block_size = int((1 + (1 + 8 * max_pairs) ** 0.5) / 2)
+    if block_size >= len(largest):
+        return largest
+    return random.Random(seed).sample(largest, block_size)
+
+
+def bench_similar(size: int, seed: int = 0, max_pairs: int = 500_000, method: str = 'lsh',
+                  scorer: str = 'sequence') -> Dict:
+    """Time find_similar_duplicates over every brand of a synthetic catalog
+
+    pairs_per_sec counts every pair the method accounts for, compared or
+    ruled out by the index. With method='all-pairs', catalogs whose pair
+    count exceeds `max_pairs` are measured on one sampled block of the
+    largest brand and the full run is projected from that block. The
+    tfidf scorer scores whole brands in batch and ignores `method`.
+    """
+    analyzer = ProductDuplicateAnalyzer('', scorer=scorer)
+    analyzer.products = synthetic_catalog(size, seed)
+    brands = analyzer.group_products_by_brand()
+    total_pairs = sum(len(products) * (len(products) - 1) // 2 for products in brands.values())
+
+    blocks = list(brands.values())
+    sampled = method == 'all-pairs' and total_pairs > max_pairs
+    if sampled:
+        blocks = [sample_block(brands, max_pairs, seed)]
+
+    pairs = sum(len(products) * (len(products) - 1) // 2 for products in blocks)
+    started_at = time.perf_counter()
+    found = sum(len(analyzer.find_similar_duplicates(products, method=method)) for products in blocks)
+    seconds = time.perf_counter() - started_at
+
+    pairs_per_sec = pairs / seconds if seconds else float('inf')
+    return {
+        'products': size,
+        'method': method,
+        'scorer': scorer,
+        'total_pairs': total_pairs,
+        'sampled': sampled,
+        'pairs_covered': pairs,
+        'duplicates_found': found,
+        'seconds': round(seconds, 3),
+        'pairs_per_sec': round(pairs_per_sec, 1),
+        'projected_seconds': round(total_pairs / pairs_per_sec, 1),
+    }
+
+
+def bench_recall(size: int, seed: int = 0, max_pairs: int = 500_000) -> Dict:
+    """Share of all-pairs matches the LSH index finds, on a block of at most `max_pairs` pairs"""
+    analyzer = ProductDuplicateAnalyzer('')
+    analyzer.products = synthetic_catalog(size, seed)
+    block = sample_block(analyzer.group_products_by_brand(), max_pairs, seed)
+    result = analyzer.check_similar_recall(block)
+    result['products'] = len(block)
+    result['candidate_ratio'] = round(result['candidate_pairs'] / result['all_pairs'], 4) if result['all_pairs'] else 0
+    return result
+
+
+def bench_exact(size: int, seed: int = 0) -> Dict:
+    """Time the linear exact-name and product_id passes over the whole catalog"""
+    analyzer = ProductDuplicateAnalyzer('')
+    analyzer.products = synthetic_catalog(size, seed)
+    brands = analyzer.group_products_by_brand()
+
+    started_at = time.perf_counter()
+    found = 0
+    for products in brands.values():
+        found += len(analyzer.find_exact_duplicates(products)) + len(analyzer.find_id_duplicates(products))
+    seconds = time.perf_counter() - started_at
+
+    return {
+        'products': size,
+        'duplicates_found': found,
+        'seconds': round(seconds, 3),
+        'products_per_sec': round(size / seconds, 1) if seconds else None,
+    }
+
+
+def bench_content(size: int, seed: int = 0, words: int = 60) -> Dict:
+    """Time the description/ingredients SimHash check over every brand of a synthetic catalog
+
+    Descriptions are `words` words drawn from a generator seeded by the
+    lowercased base name, so copies and size variants of a product share
+    one while every other product gets its own.
+    """
+    vocabulary = LINES + PRODUCTS + MODIFIERS + ['cilt', 'bakım', 'nem', 'leke', 'akne', 'serum', 'krem',
+                                                 'yağ', 'ton', 'gece', 'gündüz', 'hassas', 'kuru', 'karma']
+    analyzer = ProductDuplicateAnalyzer('')
+    analyzer.products = synthetic_catalog(size, seed)
+    for product in analyzer.products:
+        rng = random.Random(f"{seed}:{product['base_name'].lower().replace(' - ', ' ')}")
+        product['description'] = ' '.join(rng.choice(vocabulary) for _ in range(words))
+    brands = analyzer.group_products_by_brand()
+
+    started_at = time.perf_counter()
+    found = sum(len(analyzer.find_content_duplicates(products)) for products in brands.values())
+    seconds = time.perf_counter() - started_at
+
+    return {
+        'products': size,
+        'duplicates_found': found,
+        'seconds': round(seconds, 3),
+        'products_per_sec': round(size / seconds, 1) if seconds else None,
+    }
+
+
+def bench_incremental(size: int, seed: int = 0, delta: int = 3) -> Dict:
+    """Time a DedupIndex update adding `delta` products to an index of the rest of the catalog"""
+    products = synthetic_catalog(size, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        with DedupIndex(os.path.join(directory, 'index.db')) as index:
+            started_at = time.perf_counter()
+            index.update(products[:-delta])
+            build_seconds = time.perf_counter() - started_at
+            update = index.update(products)
+
+    return {
+        'products': size,
+        'delta': delta,
+        'build_seconds': round(build_seconds, 3),
+        'delta_seconds': update['seconds'],
+        'delta_products_per_sec': round(delta / update['seconds'], 1) if update['seconds'] else None,
+        'matches_found': len(update['matches']),
+    }
+
+
+def run(sizes=(100, 10_000, 100_000), seed: int = 0, max_pairs: int = 500_000) -> Dict:
+    """Analyzer benchmarks for every catalog size"""
+    results = {}
+    for size in sizes:
+        results[str(size)] = {
+            'similar': bench_similar(size, seed, max_pairs),
+            'similar_all_pairs': bench_similar(size, seed, max_pairs, method='all-pairs'),
+            'similar_tfidf': bench_similar(size, seed, max_pairs, scorer='tfidf'),
+            'recall': bench_recall(size, seed, max_pairs),
+            'exact': bench_exact(size, seed),
+            'content': bench_content(size, seed),
+        }
+        if size <= MAX_INDEX_SIZE:
+            results[str(size)]['incremental'] = bench_incremental(size, seed)
+    return results
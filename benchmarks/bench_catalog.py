@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Catalog loading benchmarks
+Loads scaled-up copies of the scraped catalog with json.load and with the
+streaming reader, and reports load time plus peak and retained memory
+"""
+
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict
+
+from catalog_reader import ANALYSIS_FIELDS, load_catalog
+
+DEFAULT_CATALOG = 'public/data/products_data.json'
+
+
+def scaled_catalog(source: str, factor: int, path: str) -> int:
+    """Write `factor` copies of a catalog's products (with distinct ids) to path, returning its size in bytes"""
+    with open(source, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    products = data.get('products', [])
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"products": [')
+        for copy in range(factor):
+            for i, product in enumerate(products):
+                product = dict(product, product_id=f"{product.get('product_id', '')}-{copy}")
+                f.write((',' if copy or i else '') + json.dumps(product, ensure_ascii=False))
+        f.write('], "summary": ')
+        json.dump(data.get('summary', {}), f, ensure_ascii=False)
+        f.write('}')
+    return os.path.getsize(path)
+
+
+def measure(load: Callable) -> Dict:
+    """Time of one load, then peak and retained memory of a second one under tracemalloc"""
+    gc.collect()
+    started_at = time.perf_counter()
+    products = load()
+    seconds = time.perf_counter() - started_at
+    del products
+
+    gc.collect()
+    tracemalloc.start()
+    products = load()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'products': len(products),
+        'seconds': round(seconds, 3),
+        'products_per_sec': round(len(products) / seconds, 1) if seconds else None,
+        'peak_mb': round(peak / 1024 / 1024, 1),
+        'retained_mb': round(retained / 1024 / 1024, 1),
+    }
+
+
+def json_load(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('products', [])
+
+
+def run(source: str = DEFAULT_CATALOG, factors=(1, 100)) -> Dict:
+    """json.load against the projected streaming reader for each scale factor"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for factor in factors:
+            path = os.path.join(directory, f'catalog-{factor}.json')
+            size = scaled_catalog(source, factor, path)
+            results[str(factor)] = {
+                'file_mb': round(size / 1024 / 1024, 1),
+                'json_load': measure(lambda: json_load(path)),
+                'streaming': measure(lambda: load_catalog(path, ANALYSIS_FIELDS)),
+            }
+    return results
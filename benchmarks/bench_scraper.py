@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Scraper throughput benchmarks
+Crawls the fixture site through the stand-in server (pages/sec, images/sec)
+and times the parse and image stages on their own
+"""
+
+import contextlib
+import glob
+import io
+import os
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.fixtures import FIXTURES_DIR
+from benchmarks.server import FixtureServer
+
+
+@contextlib.contextmanager
+def quiet_workdir():
+    """Run in a scratch directory with the scrapers' progress output silenced"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield workdir
+        finally:
+            os.chdir(cwd)
+
+
+def bench_crawl(fixtures_dir: str = FIXTURES_DIR, latency_ms: float = 20.0, jitter_ms: float = 10.0,
+                error_rate: float = 0.0, max_per_host: int = 8, rate: float = 200.0,
+                image_workers=None, parse_workers=None) -> Dict:
+    """End-to-end async crawl of the fixture brand: discovery, product pages and images"""
+    from brand_adapters import TheradermAdapter
+    from scrape_theraderm import BrandScraper
+
+    with FixtureServer(fixtures_dir, latency_ms, jitter_ms, error_rate) as server, quiet_workdir():
+        adapter = TheradermAdapter()
+        adapter.base_url = server.base_url
+        scraper = BrandScraper(adapter, max_per_host=max_per_host, rate=rate, use_cache=False,
+                               image_workers=image_workers, parse_workers=parse_workers)
+
+        started_at = time.perf_counter()
+        scraper.run_async()
+        seconds = time.perf_counter() - started_at
+
+        telemetry = scraper.telemetry.to_dict()
+        images = scraper.images.written + scraper.images.skipped
+        return {
+            'latency_ms': latency_ms,
+            'error_rate': error_rate,
+            'max_per_host': max_per_host,
+            'seconds': round(seconds, 3),
+            'pages': scraper.scraped_count,
+            'images': images,
+            'images_converted': scraper.images.written,
+            'requests': server.requests,
+            'injected_errors': server.errors,
+            'retries': telemetry['retries'],
+            'pages_per_sec': round(scraper.scraped_count / seconds, 2),
+            'images_per_sec': round(images / seconds, 2),
+            'ttfb_p50_ms': telemetry['histograms']['ttfb_ms'].get('p50'),
+        }
+
+
+def bench_parse(fixtures_dir: str = FIXTURES_DIR, rounds: int = 20) -> Dict:
+    """Single-process product page parsing"""
+    from product_extractor import parse_product_html
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, 'urun', '*.html'))):
+        with open(path, 'rb') as f:
+            pages.append((f.read(), path))
+
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        for content, path in pages:
+            parse_product_html(content, path)
+    seconds = time.perf_counter() - started_at
+
+    parsed = len(pages) * rounds
+    return {'pages': parsed, 'seconds': round(seconds, 3), 'pages_per_sec': round(parsed / seconds, 2)}
+
+
+def bench_images(fixtures_dir: str = FIXTURES_DIR) -> Dict:
+    """Single-process JPEG master plus WebP/AVIF derivative encoding"""
+    from image_pipeline import available_derivative_formats, process_image
+
+    formats = available_derivative_formats()
+    images = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, 'storage', '*'))):
+        with open(path, 'rb') as f:
+            images.append(f.read())
+
+    with tempfile.TemporaryDirectory() as workdir:
+        started_at = time.perf_counter()
+        for i, content in enumerate(images):
+            process_image(content, os.path.join(workdir, str(i)), formats)
+        seconds = time.perf_counter() - started_at
+
+    return {
+        'images': len(images),
+        'formats': formats,
+        'seconds': round(seconds, 3),
+        'images_per_sec': round(len(images) / seconds, 2),
+    }
+
+
+def run(fixtures_dir: str = FIXTURES_DIR, latency_ms: float = 20.0, error_rate: float = 0.05,
+        image_workers=None, parse_workers=None) -> Dict:
+    """All scraper benchmarks: a clean crawl, a crawl with injected errors and the isolated stages"""
+    return {
+        'crawl': bench_crawl(fixtures_dir, latency_ms, image_workers=image_workers, parse_workers=parse_workers),
+        'crawl_with_errors': bench_crawl(fixtures_dir, latency_ms, error_rate=error_rate,
+                                         image_workers=image_workers, parse_workers=parse_workers),
+        'parse': bench_parse(fixtures_dir),
+        'images': bench_images(fixtures_dir),
+    }
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixtures: a stand-in copy of the brand listing, product pages,
+sitemap and product images, stored under benchmarks/fixtures/site with the
+same URL layout as the live site
+"""
+
+import argparse
+import contextlib
+import html
+import io
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'site')
+
+PRODUCTS_PER_LISTING_PAGE = 12
+
+
+def fixture_path(root: str, url: str) -> str:
+    """File holding the response for a URL: extension-less paths are `.html`, `?page=N` a `-page-N` suffix"""
+    parts = urlsplit(url)
+    path = parts.path.strip('/') or 'index'
+    page = dict(parse_qsl(parts.query)).get('page')
+    if page and page != '1':
+        path = f"{path}-page-{page}"
+    if not os.path.splitext(path)[1]:
+        path += '.html'
+    return os.path.join(root, *path.split('/'))
+
+
+def listing_page(brand: str, slug: str, product_ids: List[str], page: int, pages: int) -> str:
+    links = '\n'.join(f'      <li class="product-card"><a href="/urun/{pid}">{html.escape(pid)}</a></li>'
+                      for pid in product_ids)
+    next_link = (f'<link rel="next" href="/urunler/{slug}/all?page={page + 1}">' if page < pages else '')
+    return f"""<!DOCTYPE html>
+<html lang="tr">
+<head>
+  <meta charset="utf-8">
+  <title>{html.escape(brand)} | Nurederm Kozmetik</title>
+  {next_link}
+</head>
+<body>
+  <header><a href="/"><img src="/storage/logo.png" class="logo" alt="Nurederm"></a></header>
+  <main>
+    <h1>{html.escape(brand)}</h1>
+    <ul class="product-list">
+{links}
+    </ul>
+  </main>
+</body>
+</html>
+"""
+
+
+def product_page(product: Dict, image_urls: List[str]) -> str:
+    name = html.escape(product.get('name', ''))
+    description = html.escape(product.get('description', ''))
+    images = '\n'.join(f'      <img src="{url}" alt="{name}">' for url in image_urls)
+    features = '\n'.join(f'      <li>{html.escape(feature)}</li>' for feature in product.get('features', []))
+    return f"""<!DOCTYPE html>
+<html lang="tr">
+<head>
+  <meta charset="utf-8">
+  <title>{html.escape(product.get('meta_title', ''))}</title>
+  <meta name="description" content="{html.escape(product.get('meta_description', ''))}">
+</head>
+<body>
+  <header><a href="/"><img src="/storage/logo.png" class="logo" alt="Nurederm"></a></header>
+  <main class="product-detail-page">
+    <div class="product-gallery">
+{images}
+    </div>
+    <h1 class="product-title">{name}</h1>
+    <div class="product-price"><span class="price">{html.escape(product.get('price', ''))}</span></div>
+    <div class="product-description"><p>{description}</p></div>
+    <h3>İçerik</h3>
+    <p>{html.escape(', '.join(product.get('ingredients', [])))}</p>
+    <h3>Kullanım</h3>
+    <p>{html.escape(product.get('usage_instructions', ''))}</p>
+    <ul class="product-features">
+{features}
+    </ul>
+  </main>
+</body>
+</html>
+"""
+
+
+def sample_images(image_dir: str, count: int, width: int = 320) -> List[bytes]:
+    """Downscaled copies of catalog product images; every fourth one stays a PNG"""
+    from PIL import Image
+
+    names = sorted(name for name in os.listdir(image_dir) if name.endswith(('.png', '.jpg')))
+    images = []
+    for i, name in enumerate(names[:count]):
+        with Image.open(os.path.join(image_dir, name)) as img:
+            img = img.convert('RGB')
+            img.thumbnail((width, width))
+            output = io.BytesIO()
+            if i % 4 == 3:
+                img.save(output, 'PNG', optimize=True)
+            else:
+                img.save(output, 'JPEG', quality=85)
+            images.append(output.getvalue())
+    return images
+
+
+def write_file(path: str, content) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mode = 'wb' if isinstance(content, bytes) else 'w'
+    with open(path, mode, **({} if mode == 'wb' else {'encoding': 'utf-8'})) as f:
+        f.write(content)
+
+
+def build_fixtures(out_dir: str, products_json: str, image_dir: str, brand: str = 'Theraderm',
+                   slug: str = 'theraderm', count: int = 24, image_count: int = 8,
+                   images_per_product: int = 3) -> Dict:
+    """Write a fixture site from scraped catalog data and downscaled catalog images"""
+    with open(products_json, 'r', encoding='utf-8') as f:
+        products = json.load(f)['products'][:count]
+
+    images = sample_images(image_dir, image_count)
+    image_urls = []
+    for i, content in enumerate(images):
+        extension = 'png' if content.startswith(b'\x89PNG') else 'jpg'
+        url = f"/storage/sample-{i + 1}.{extension}"
+        write_file(fixture_path(out_dir, url), content)
+        image_urls.append(url)
+
+    product_ids = [product['product_id'] for product in products]
+    for i, product in enumerate(products):
+        urls = [image_urls[(i + k) % len(image_urls)] for k in range(images_per_product)] if image_urls else []
+        write_file(fixture_path(out_dir, f"/urun/{product['product_id']}"), product_page(product, urls))
+
+    pages = max(1, -(-len(product_ids) // PRODUCTS_PER_LISTING_PAGE))
+    for page in range(1, pages + 1):
+        chunk = product_ids[(page - 1) * PRODUCTS_PER_LISTING_PAGE:page * PRODUCTS_PER_LISTING_PAGE]
+        write_file(fixture_path(out_dir, f"/urunler/{slug}/all?page={page}"),
+                   listing_page(brand, slug, chunk, page, pages))
+
+    locations = '\n'.join(f'  <url><loc>https://nurederm.com/urunler/{slug}/all?page={page}</loc></url>'
+                          for page in range(2, pages + 1))
+    write_file(fixture_path(out_dir, '/sitemap.xml'),
+               '<?xml version="1.0" encoding="UTF-8"?>\n'
+               '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+               f'{locations}\n</urlset>\n')
+
+    return {'products': len(product_ids), 'listing_pages': pages, 'images': len(image_urls)}
+
+
+def record_fixtures(out_dir: str, slug: str = 'theraderm', limit: Optional[int] = None) -> Dict:
+    """Record a brand's listing pages, product pages and images from the live site
+
+    Every response the scraper fetches is written to the fixture layout, so
+    the stand-in server replays exactly what the scraper saw.
+    """
+    from brand_adapters import get_adapter
+    from scrape_theraderm import BrandScraper
+
+    out_dir = os.path.abspath(out_dir)
+    recorded = {'responses': 0, 'bytes': 0}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            scraper = BrandScraper(get_adapter(slug), use_cache=False)
+            fetch = scraper.fetch
+
+            def recording_fetch(url):
+                status, content = fetch(url)
+                if status == 200:
+                    write_file(fixture_path(out_dir, url), content)
+                    recorded['responses'] += 1
+                    recorded['bytes'] += len(content)
+                return status, content
+
+            scraper.fetch = recording_fetch
+            for url in scraper.get_all_product_urls()[:limit]:
+                scraper.scrape_product_details(url)
+            scraper.finish_images()
+        finally:
+            os.chdir(cwd)
+
+    return recorded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or record the benchmark fixture site")
+    parser.add_argument('--record', action='store_true',
+                        help="Record pages and images from the live site instead of building them")
+    parser.add_argument('--out', default=FIXTURES_DIR, help="Fixture site directory")
+    parser.add_argument('--products-json', default='public/data/products_data.json',
+                        help="Scraped catalog used to build product pages")
+    parser.add_argument('--image-dir', default='public/products', help="Catalog images to sample from")
+    parser.add_argument('--brand', default='theraderm', help="Brand slug")
+    parser.add_argument('--count', type=int, default=24, help="Number of product pages")
+    args = parser.parse_args()
+
+    if args.record:
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = record_fixtures(args.out, args.brand, args.count)
+        print(f"📼 Recorded {stats['responses']} responses ({stats['bytes']} bytes) to {args.out}")
+    else:
+        stats = build_fixtures(args.out, args.products_json, args.image_dir, brand=args.brand.title(),
+                               slug=args.brand, count=args.count)
+        print(f"🧪 Built {stats['products']} product pages, {stats['listing_pages']} listing pages "
+              f"and {stats['images']} images in {args.out}")
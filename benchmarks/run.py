@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner
+Runs the scraper, analyzer and catalog loading benchmarks offline and writes the results,
+tagged with the git commit, to a JSON file that can be compared between
+versions
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Dict, Iterator, Tuple
+
+from benchmarks import bench_analyzer, bench_catalog, bench_scraper
+from benchmarks.fixtures import FIXTURES_DIR
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def throughput_metrics(results: Dict, prefix: str = '') -> Iterator[Tuple[str, float]]:
+    """Flatten every `*_per_sec` value into (dotted.path, value) pairs"""
+    for key, value in results.items():
+        path = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict):
+            yield from throughput_metrics(value, path)
+        elif key.endswith('_per_sec') and isinstance(value, (int, float)):
+            yield path, value
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> int:
+    """Print throughput changes against a baseline run, returning the number of regressions"""
+    before = dict(throughput_metrics(baseline['benchmarks']))
+    regressions = 0
+
+    print(f"\n📊 Compared with {baseline.get('revision', '?')} ({baseline.get('timestamp', '?')}):")
+    for path, value in throughput_metrics(results['benchmarks']):
+        if path not in before or not before[path]:
+            continue
+        change = value / before[path] - 1
+        marker = '✅'
+        if change < -tolerance:
+            marker = '❌'
+            regressions += 1
+        print(f"  {marker} {path}: {before[path]:g} → {value:g} ({change:+.1%})")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmarks")
+    parser.add_argument('--suite', choices=['all', 'scraper', 'analyzer', 'catalog'], default='all')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help="Fixture site served to the scraper")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="Latency injected by the stand-in server")
+    parser.add_argument('--error-rate', type=float, default=0.05,
+                        help="Fraction of 503 responses in the error-injection crawl")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10_000, 100_000],
+                        help="Synthetic catalog sizes for the analyzer benchmark")
+    parser.add_argument('--max-pairs', type=int, default=500_000,
+                        help="Sample a block when a catalog has more all-pairs comparisons than this")
+    parser.add_argument('--catalog', default=bench_catalog.DEFAULT_CATALOG,
+                        help="Catalog scaled up for the loading benchmark")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 100],
+                        help="Copies of the catalog loaded by the catalog benchmark")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+                        help="Results file (default: benchmarks/results/<git revision>.json)")
+    parser.add_argument('--baseline', default=None, help="Earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help="Throughput drop counted as a regression when comparing")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    results = {
+        'revision': revision,
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'benchmarks': {},
+    }
+
+    if args.suite in ('all', 'scraper'):
+        print("🕷️  Running scraper benchmarks...")
+        results['benchmarks']['scraper'] = bench_scraper.run(args.fixtures, args.latency_ms, args.error_rate)
+    if args.suite in ('all', 'analyzer'):
+        print("🔍 Running analyzer benchmarks...")
+        results['benchmarks']['analyzer'] = bench_analyzer.run(args.sizes, args.seed, args.max_pairs)
+    if args.suite in ('all', 'catalog'):
+        print("📦 Running catalog loading benchmarks...")
+        results['benchmarks']['catalog'] = bench_catalog.run(args.catalog, args.scale)
+
+    for path, value in throughput_metrics(results['benchmarks']):
+        print(f"  {path}: {value:g}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{revision}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"💾 Results saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            raise SystemExit(f"{regressions} throughput regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the NureDerm site
+Serves the benchmark fixtures with configurable latency, jitter and an
+injected error rate, so the scrapers can be measured without the network
+"""
+
+import argparse
+import mimetypes
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import FIXTURES_DIR, fixture_path
+
+# Absolute links in recorded pages and the sitemap are rewritten to the local server
+LIVE_ORIGINS = (b'https://www.nurederm.com', b'https://nurederm.com')
+TEXT_TYPES = ('text/html', 'application/xml', 'text/xml')
+
+
+class FixtureServer:
+    """Threaded HTTP server for a fixture directory, usable as a context manager
+
+    Each request sleeps `latency_ms` plus up to `jitter_ms` before
+    answering; a fraction `error_rate` of requests get a 503 instead.
+    """
+
+    def __init__(self, root: str = FIXTURES_DIR, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0, host: str = '127.0.0.1', port: int = 0):
+        self.root = root
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _roll(self):
+        """Delay and failure decision for one request"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_ms + self.random.uniform(0, self.jitter_ms)
+            fail = self.random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay / 1000, fail
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay, fail = server._roll()
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    return self.respond(503, b'Service Unavailable', 'text/plain')
+
+                path = fixture_path(server.root, self.path)
+                try:
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                except OSError:
+                    return self.respond(404, b'Not Found', 'text/plain')
+
+                content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+                if content_type in TEXT_TYPES:
+                    for origin in LIVE_ORIGINS:
+                        body = body.replace(origin, server.base_url.encode())
+                    content_type += '; charset=utf-8'
+                self.respond(200, body, content_type)
+
+            def respond(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'FixtureServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the benchmark fixtures as a stand-in NureDerm site")
+    parser.add_argument('--root', default=FIXTURES_DIR, help="Fixture site directory")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Fixed delay added to every response")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Random extra delay of up to this much")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for jitter and error injection")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.root, args.latency_ms, args.jitter_ms, args.error_rate, args.seed, port=args.port)
+    print(f"🌐 Serving {args.root} at {server.base_url} "
+          f"({args.latency_ms} ms latency, {args.error_rate:.0%} errors)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
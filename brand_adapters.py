@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Brand adapters for the NK Beauty scrapers
+Each adapter describes where a brand's products are listed, how its product
+pages are parsed and where its outputs are written
+"""
+
+from typing import Dict, List
+
+from product_extractor import ProductPageExtractor
+
+
+class BrandAdapter:
+    """Per-brand crawl configuration
+
+    Subclasses set `name` (the catalog brand), `slug` (used in the listing
+    path and output names) and, when a brand's pages need different
+    selectors, `extractor_class`.
+    """
+
+    name = ''
+    slug = ''
+    base_url = 'https://nurederm.com'
+    product_pattern = r'/urun/'
+    extractor_class = ProductPageExtractor
+
+    @property
+    def listing_prefix(self) -> str:
+        return f'/urunler/{self.slug}'
+
+    @property
+    def listing_urls(self) -> List[str]:
+        return [f'{self.base_url}{self.listing_prefix}/all']
+
+    @property
+    def data_dir(self) -> str:
+        return f'{self.slug}_data'
+
+    @property
+    def images_dir(self) -> str:
+        return f'{self.slug}_images'
+
+    @property
+    def file_prefix(self) -> str:
+        return self.slug
+
+
+class TheradermAdapter(BrandAdapter):
+    name = 'Theraderm'
+    slug = 'theraderm'
+
+
+class GenosysAdapter(BrandAdapter):
+    name = 'Genosys'
+    slug = 'genosys'
+
+
+class PHFormulaAdapter(BrandAdapter):
+    name = 'pHformula'
+    slug = 'phformula'
+
+
+class MeLineAdapter(BrandAdapter):
+    name = 'MeLine'
+    slug = 'meline'
+
+
+BRAND_ADAPTERS: Dict[str, type] = {
+    adapter.slug: adapter
+    for adapter in (TheradermAdapter, GenosysAdapter, PHFormulaAdapter, MeLineAdapter)
+}
+
+
+def get_adapter(slug: str) -> BrandAdapter:
+    """Instantiate the adapter registered under a brand slug"""
+    try:
+        return BRAND_ADAPTERS[slug.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown brand '{slug}' (known: {', '.join(sorted(BRAND_ADAPTERS))})")
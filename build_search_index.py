@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Offline product search index for the site
+Builds an inverted index over the compiled catalog with the same Turkish-aware
+normalization as normalizeText in src/lib/normalize.ts, with field-weighted
+postings for whole words and for word prefixes (search as you type), and
+writes it as small JSON shards under public/search that src/lib/search.ts
+fetches only when a query needs them
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from http_cache import atomic_write
+
+INDEX_VERSION = 1
+
+DEFAULT_CATALOG = 'src/data/products.compiled.json'
+DEFAULT_OUTPUT_DIR = 'public/search'
+
+# Weight of a word by the field it appears in
+FIELD_WEIGHTS = {'name': 5.0, 'brand': 3.0, 'tags': 2.0, 'description': 1.0}
+# Fields whose words are also indexed by prefix; description words only match whole
+PREFIX_FIELDS = ('name', 'brand', 'tags')
+# Prefixes shorter than this are not indexed; one-letter queries only match whole words
+MIN_PREFIX = 2
+# A prefix match counts this much of the word it completes to
+PREFIX_DISCOUNT = 0.5
+# Keep only the best postings of a prefix so short prefixes stay small as the catalog grows
+MAX_PREFIX_POSTINGS = 100
+# Shards over this size are split by one more leading character, up to MAX_SHARD_DEPTH
+MAX_SHARD_BYTES = 16 * 1024
+MAX_SHARD_DEPTH = 4
+# Products per docs-<n>.json block, so a result page loads a few blocks rather than the catalog
+DOCS_PER_SHARD = 128
+
+_FOLDS = str.maketrans({'ı': 'i', 'İ': 'i', 'ğ': 'g', 'Ğ': 'g', 'ü': 'u', 'Ü': 'u',
+                        'ö': 'o', 'Ö': 'o', 'ş': 's', 'Ş': 's', 'ç': 'c', 'Ç': 'c'})
+_COMBINING_MARKS = re.compile('[\u0300-\u036f]')
+
+# Posting: (product index, weight)
+Posting = Tuple[int, float]
+
+
+def normalize_text(value: str) -> str:
+    """Python twin of normalizeText: lowercase, accents and Turkish letters folded to ASCII, '&' as 've'"""
+    value = _COMBINING_MARKS.sub('', unicodedata.normalize('NFD', value.lower())).translate(_FOLDS)
+    value = re.sub(r'[^a-z0-9\s]', ' ', value.replace('&', ' ve '))
+    return re.sub(r'\s+', ' ', value).strip()
+
+
+def field_text(product: Dict, field: str) -> str:
+    value = product.get(field) or ''
+    return ' '.join(value) if isinstance(value, list) else str(value)
+
+
+def build_postings(products: List[Dict]) -> Tuple[Dict[str, List[Posting]], Dict[str, List[Posting]]]:
+    """(word postings, prefix postings), each sorted by product index
+
+    A word's weight in a product sums, over the fields it appears in, the
+    field weight times 1 + ln(occurrences), scaled by the word's inverse
+    document frequency so that rare words rank above common ones. A
+    prefix posts each product at the best weight (from PREFIX_FIELDS
+    only) of the longer words it starts.
+    """
+    raw: Dict[str, Dict[int, float]] = defaultdict(dict)
+    raw_prefixed: Dict[str, Dict[int, float]] = defaultdict(dict)
+    for index, product in enumerate(products):
+        weights = Counter()
+        prefixed = Counter()
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for word, count in Counter(normalize_text(field_text(product, field)).split()).items():
+                weights[word] += field_weight * (1 + math.log(count))
+                if field in PREFIX_FIELDS:
+                    prefixed[word] += field_weight * (1 + math.log(count))
+        for word, weight in weights.items():
+            raw[word][index] = weight
+        for word, weight in prefixed.items():
+            raw_prefixed[word][index] = weight
+
+    total = len(products)
+    idf = {word: math.log(1 + total / len(documents)) for word, documents in raw.items()}
+    terms = {word: [(index, round(weight * idf[word], 2)) for index, weight in sorted(documents.items())]
+             for word, documents in raw.items()}
+
+    best: Dict[str, Dict[int, float]] = defaultdict(dict)
+    for word, documents in raw_prefixed.items():
+        for length in range(MIN_PREFIX, len(word)):
+            prefix_postings = best[word[:length]]
+            for index, weight in documents.items():
+                weight *= idf[word]
+                if weight > prefix_postings.get(index, 0):
+                    prefix_postings[index] = weight
+    prefixes = {}
+    for prefix, documents in best.items():
+        top = sorted(documents.items(), key=lambda item: (-item[1], item[0]))[:MAX_PREFIX_POSTINGS]
+        prefixes[prefix] = sorted((index, round(weight * PREFIX_DISCOUNT, 2)) for index, weight in top)
+    return terms, prefixes
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def build_shards(terms: Dict[str, List[Posting]], prefixes: Dict[str, List[Posting]]) -> Dict[str, bytes]:
+    """Encoded shards keyed by the leading characters every key in them shares
+
+    A shard that grows past MAX_SHARD_BYTES is split by one more leading
+    character; keys no longer than the shard key stay behind. A key is
+    therefore always in the shard with the longest shard key it starts
+    with, which is how the client finds it.
+    """
+    shards = {}
+
+    def encode(keys: List[str]) -> bytes:
+        return _encode({'terms': {key: terms[key] for key in keys if key in terms},
+                        'prefixes': {key: prefixes[key] for key in keys if key in prefixes}})
+
+    def place(shard_key: str, keys: List[str]) -> None:
+        content = encode(keys)
+        if len(content) <= MAX_SHARD_BYTES or len(shard_key) >= MAX_SHARD_DEPTH:
+            shards[shard_key] = content
+            return
+        depth = len(shard_key) + 1
+        children = defaultdict(list)
+        remaining = []
+        for key in keys:
+            (children[key[:depth]] if len(key) >= depth else remaining).append(key)
+        if remaining:
+            shards[shard_key] = encode(remaining)
+        for child_key, child_keys in sorted(children.items()):
+            place(child_key, child_keys)
+
+    by_first = defaultdict(list)
+    for key in sorted(set(terms) | set(prefixes)):
+        by_first[key[0]].append(key)
+    for shard_key, keys in sorted(by_first.items()):
+        place(shard_key, keys)
+    return shards
+
+
+def search_documents(products: List[Dict]) -> List[Dict]:
+    """What the client needs to show a hit, in catalog order so postings can refer to it by index"""
+    return [{
+        'slug': product.get('slug', ''),
+        'name': product.get('name', ''),
+        'brand': product.get('brand', ''),
+        'category': product.get('category', ''),
+        'image': product.get('image', ''),
+    } for product in products]
+
+
+def write_index(products: List[Dict], output_dir: str) -> Dict:
+    """Write the shards, documents and manifest, removing shards of earlier builds; returns the manifest"""
+    terms, prefixes = build_postings(products)
+    files = {f"shard-{key}.json": content for key, content in build_shards(terms, prefixes).items()}
+    documents = search_documents(products)
+    for block, start in enumerate(range(0, len(documents), DOCS_PER_SHARD)):
+        files[f"docs-{block}.json"] = _encode(documents[start:start + DOCS_PER_SHARD])
+
+    digest = hashlib.blake2b(digest_size=8)
+    for name, content in sorted(files.items()):
+        digest.update(name.encode('utf-8') + b'\0' + content)
+    manifest = {
+        'version': f"{INDEX_VERSION}-{digest.hexdigest()}",
+        'documents': len(documents),
+        'docsPerShard': DOCS_PER_SHARD,
+        'minPrefix': MIN_PREFIX,
+        'shards': sorted(name[len('shard-'):-len('.json')] for name in files if name.startswith('shard-')),
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith(('shard-', 'docs-')) and name not in files:
+            os.remove(os.path.join(output_dir, name))
+    for name, content in files.items():
+        atomic_write(os.path.join(output_dir, name), content)
+    atomic_write(os.path.join(output_dir, 'manifest.json'),
+                 (json.dumps(manifest, indent=2) + '\n').encode('utf-8'))
+
+    manifest['terms'] = len(terms)
+    manifest['prefixes'] = len(prefixes)
+    manifest['largest_shard'] = max((len(content) for content in files.values()), default=0)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the sharded product search index for the site")
+    parser.add_argument('--catalog', default=DEFAULT_CATALOG, help="Compiled catalog from compile_catalog.py")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help="Directory served as /search")
+    args = parser.parse_args()
+
+    with open(args.catalog, 'r', encoding='utf-8') as f:
+        products = json.load(f)['products']
+    manifest = write_index(products, args.output)
+    print(f"🔎 Indexed {manifest['documents']} products: {manifest['terms']} words, {manifest['prefixes']} prefixes")
+    print(f"📦 {len(manifest['shards'])} shards, largest file {manifest['largest_shard'] / 1024:.1f} KB")
+    print(f"✅ Search index saved to: {args.output} (version {manifest['version']})")
+
+
+if __name__ == "__main__":
+    main()
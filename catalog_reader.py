@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Streaming catalog reader
+Parses the products array of a catalog file one product at a time, keeping
+only the requested fields in compact records and re-reading heavy fields
+(descriptions, ingredients, images) from the file when they are asked for
+"""
+
+import codecs
+import json
+import os
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Fields the duplicate tools compare on; everything else stays on disk
+ANALYSIS_FIELDS = ('product_id', 'slug', 'name', 'brand', 'size', 'url')
+# Fields pointing at local image files: the site's image/gallery and the scraper's image_paths
+IMAGE_FIELDS = ('image', 'gallery', 'image_paths')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif', '.avif')
+
+CHUNK_SIZE = 1 << 16
+
+_MISSING = object()
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+# Characters that can continue a JSON number
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+class CatalogSource:
+    """A catalog file that records read their lazy fields back from"""
+
+    __slots__ = ('path',)
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read(self, offset: int, length: int) -> Dict:
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length).decode('utf-8'))
+
+
+class ProductRecord(Mapping):
+    """Read-only product with its projected fields in slots and every other field read on demand
+
+    Records behave like the product dicts they replace: `record.get()`,
+    `record['name']`, `'name' in record`. Projected fields come straight
+    from the slots; any other field re-parses this product from the file,
+    so nothing outside the projection is kept in memory. `to_dict()`
+    loads the full product once.
+    """
+
+    __slots__ = ('_source', '_offset', '_length')
+    _fields: Tuple[str, ...] = ()
+
+    def _load(self) -> Dict:
+        return self._source.read(self._offset, self._length)
+
+    def __getitem__(self, key: str):
+        if key in self._fields:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        return self._load()[key]
+
+    def get(self, key: str, default=None):
+        if key in self._fields:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        return self._load().get(key, default)
+
+    def __contains__(self, key) -> bool:
+        if key in self._fields:
+            return getattr(self, key) is not _MISSING
+        return key in self._load()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def to_dict(self) -> Dict:
+        return self._load()
+
+    def __reduce__(self):
+        # Record classes are built per projection, so pickle the projection instead;
+        # the _MISSING sentinel does not survive pickling, so only present fields are sent
+        values = [(field, getattr(self, field)) for field in self._fields
+                  if getattr(self, field) is not _MISSING]
+        return _rebuild_record, (self._fields, values, self._source.path, self._offset, self._length)
+
+    def __repr__(self) -> str:
+        shown = ', '.join(f"{field}={getattr(self, field)!r}" for field in self._fields
+                          if getattr(self, field) is not _MISSING)
+        return f"ProductRecord({shown})"
+
+
+_record_classes: Dict[Tuple[str, ...], type] = {}
+
+
+def record_class(fields: Sequence[str]) -> type:
+    """ProductRecord subclass with one slot per projected field, shared by every record of that projection"""
+    fields = tuple(fields)
+    cls = _record_classes.get(fields)
+    if cls is None:
+        cls = type('ProductRecord', (ProductRecord,), {'__slots__': fields, '_fields': fields})
+        _record_classes[fields] = cls
+    return cls
+
+
+def _rebuild_record(fields: Tuple[str, ...], values: List[Tuple[str, object]],
+                    path: str, offset: int, length: int) -> ProductRecord:
+    record = record_class(fields).__new__(record_class(fields))
+    for field in fields:
+        setattr(record, field, _MISSING)
+    for field, value in values:
+        setattr(record, field, value)
+    record._source = CatalogSource(path)
+    record._offset = offset
+    record._length = length
+    return record
+
+
+def _stream_elements(path: str, chunk_size: int = CHUNK_SIZE,
+                     extras: Optional[Dict] = None) -> Iterator[Tuple[object, int, int]]:
+    """(value, byte offset, byte length) of every element of the catalog's products array
+
+    The file is either a bare array or an object with a "products" key;
+    the other top-level values (summaries) are parsed and skipped, or
+    collected into `extras` when it is given (complete once the generator
+    is exhausted). Only the unparsed tail of the file is buffered, so
+    memory is bounded by the largest single product.
+    """
+    with open(path, 'rb') as f:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        position = 0
+        # File byte offset of buffer[mark], advanced as parsing moves on
+        mark = 0
+        mark_bytes = 0
+        eof = False
+
+        def byte_offset(index: int) -> int:
+            nonlocal mark, mark_bytes
+            mark_bytes += len(buffer[mark:index].encode('utf-8'))
+            mark = index
+            return mark_bytes
+
+        def drop_parsed() -> None:
+            """Forget the parsed part of the buffer"""
+            nonlocal buffer, position, mark
+            byte_offset(position)
+            buffer = buffer[position:]
+            position = mark = 0
+
+        def fill() -> bool:
+            nonlocal buffer, eof
+            if eof:
+                return False
+            data = f.read(chunk_size)
+            eof = not data
+            # The incremental decoder holds back a character split across chunks
+            text = decoder.decode(data, final=eof)
+            if not text:
+                return not eof and fill()
+            drop_parsed()
+            buffer += text
+            return True
+
+        def skip(chars: str = _WHITESPACE) -> Optional[str]:
+            """Advance past `chars`, returning the next character or None at the end of the file"""
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in chars:
+                    position += 1
+                if position < len(buffer):
+                    return buffer[position]
+                if not fill():
+                    return None
+
+        def decode() -> Tuple[object, int, int]:
+            """Parse the JSON value at the current position, reading more of the file as needed"""
+            nonlocal position
+            while True:
+                try:
+                    value, end = _DECODER.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if fill():
+                        continue
+                    raise
+                # A number cut by a chunk boundary ('1.' of '1.5') decodes as its head;
+                # it is only complete once something other than number characters follows
+                if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                        and all(char in _NUMBER_CHARS for char in buffer[end:]) and fill()):
+                    continue
+                offset = byte_offset(position)
+                length = byte_offset(end) - offset
+                position = end
+                return value, offset, length
+
+        def object_members() -> bool:
+            """Parse top-level members up to the products array, returning False if there is none"""
+            nonlocal position
+            while True:
+                char = skip(_WHITESPACE + ',')
+                if char == '}' or char is None:
+                    return False
+                key, _, _ = decode()
+                if skip() != ':':
+                    raise ValueError(f"{path}: expected ':' after key {key!r}")
+                position += 1
+                skip()
+                if key == 'products':
+                    return True
+                value, _, _ = decode()
+                if extras is not None:
+                    extras[key] = value
+
+        first = skip(_WHITESPACE + '\ufeff')
+        if first is None:
+            return
+        if first == '{':
+            position += 1
+            if not object_members():
+                return
+        elif first != '[':
+            raise ValueError(f"{path}: expected a catalog object or products array")
+
+        if skip() != '[':
+            raise ValueError(f"{path}: products is not an array")
+        position += 1
+        while True:
+            char = skip(_WHITESPACE + ',')
+            if char == ']':
+                # Values after the array only matter to callers collecting them
+                if first == '{' and extras is not None:
+                    position += 1
+                    object_members()
+                return
+            if char is None:
+                raise ValueError(f"{path}: products array is not closed")
+            yield decode()
+
+            # Drop what has been parsed so the buffer only holds the unread tail
+            if position > chunk_size:
+                drop_parsed()
+
+
+def iter_catalog(path: str, fields: Optional[Sequence[str]] = None,
+                 chunk_size: int = CHUNK_SIZE, extras: Optional[Dict] = None) -> Iterator:
+    """Stream the products of a catalog file
+
+    Without `fields` every product is yielded as a plain dict. With
+    `fields` each becomes a ProductRecord keeping only those fields, with
+    everything else read back from the file on access. The catalog's other
+    top-level values are stored in `extras`, if given.
+    """
+    if fields is None:
+        for product, _, _ in _stream_elements(path, chunk_size, extras):
+            yield product
+        return
+
+    cls = record_class(fields)
+    fields = cls._fields
+    source = CatalogSource(path)
+    for product, offset, length in _stream_elements(path, chunk_size, extras):
+        record = cls.__new__(cls)
+        for field in fields:
+            value = product.get(field, _MISSING)
+            # Brands and sizes repeat across thousands of products; keep one copy of each
+            if isinstance(value, str) and len(value) <= 32:
+                value = sys.intern(value)
+            setattr(record, field, value)
+        record._source = source
+        record._offset = offset
+        record._length = length
+        yield record
+
+
+def image_names(product: Mapping) -> List[str]:
+    """File names of the local images a product references, in order, without repeats"""
+    names = []
+    for field in IMAGE_FIELDS:
+        values = product.get(field)
+        for value in (values if isinstance(values, list) else [values]):
+            if isinstance(value, str) and value:
+                name = os.path.basename(value)
+                if name not in names:
+                    names.append(name)
+    return names
+
+
+def full_product(product: Mapping) -> Mapping:
+    """The whole product behind a record in one read (plain dicts pass through), for code reading many lazy fields"""
+    return product.to_dict() if isinstance(product, ProductRecord) else product
+
+
+def load_catalog(path: str, fields: Optional[Sequence[str]] = None) -> List:
+    """Every product of a catalog file, as dicts or projected records (see iter_catalog)"""
+    return list(iter_catalog(path, fields))
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Catalog coverage statistics
+Streams each catalog once and counts, per catalog and per brand, how many
+products fill each field, which have ids, and which reference local images
+that actually exist. Results are cached under a key built from the input
+file hashes, so an unchanged tree is reported without re-reading anything
+"""
+
+import hashlib
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from catalog_reader import IMAGE_EXTENSIONS, image_names, iter_catalog
+from dedup_utils import brand_key
+from http_cache import atomic_write
+
+# Bump whenever the statistics change shape so cached results are recomputed
+STATS_VERSION = 1
+
+NO_BRAND = '(no brand)'
+
+
+def file_digest(path: str) -> str:
+    """BLAKE2b of a file's contents"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def list_images(images_dir: str) -> Dict[str, int]:
+    """Size in bytes of every image file in images_dir (empty if it does not exist)"""
+    if not images_dir or not os.path.isdir(images_dir):
+        return {}
+    with os.scandir(images_dir) as entries:
+        return {entry.name: entry.stat().st_size for entry in entries
+                if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS)
+                and not entry.name.startswith('.')}
+
+
+def _is_filled(value) -> bool:
+    if isinstance(value, str):
+        return bool(value.strip())
+    return value is not None and value != [] and value != {}
+
+
+class CatalogStats:
+    """Coverage counters for one catalog, fed one product at a time"""
+
+    def __init__(self, path: str, images: Dict[str, int]):
+        self.path = path
+        self.images = images
+        self.products = 0
+        self.fields = Counter()
+        self.ids = Counter()
+        self.missing_ids = 0
+        self.brand_names: Dict[str, str] = {}
+        self.brand_products = Counter()
+        self.brand_fields: Dict[str, Counter] = defaultdict(Counter)
+        self.brand_with_images = Counter()
+        self.brand_with_local_images = Counter()
+        self.references = 0
+        self.resolved = 0
+        self.referenced: Dict[str, int] = Counter()
+        self.missing_images = Counter()
+
+    def add(self, product: Dict) -> None:
+        self.products += 1
+        brand = (product.get('brand') or '').strip()
+        key = brand_key(brand)
+        # Spellings of one brand are counted together under the first one seen
+        self.brand_names.setdefault(key, brand or NO_BRAND)
+        self.brand_products[key] += 1
+
+        for field, value in product.items():
+            if _is_filled(value):
+                self.fields[field] += 1
+                self.brand_fields[key][field] += 1
+
+        product_id = product.get('product_id') or product.get('slug')
+        if product_id:
+            self.ids[product_id] += 1
+        else:
+            self.missing_ids += 1
+
+        names = image_names(product)
+        if names:
+            self.brand_with_images[key] += 1
+        found = [name for name in names if name in self.images]
+        if found:
+            self.brand_with_local_images[key] += 1
+        self.references += len(names)
+        self.resolved += len(found)
+        for name in found:
+            self.referenced[name] += 1
+        for name in names:
+            if name not in self.images:
+                self.missing_images[name] += 1
+
+    def to_dict(self) -> Dict:
+        brands = {}
+        for key, count in sorted(self.brand_products.items(), key=lambda item: (-item[1], self.brand_names[item[0]])):
+            brands[self.brand_names[key]] = {
+                'products': count,
+                'with_images': self.brand_with_images[key],
+                'with_local_images': self.brand_with_local_images[key],
+                'fields': dict(sorted(self.brand_fields[key].items())),
+            }
+        return {
+            'path': self.path,
+            'products': self.products,
+            'ids': {
+                'unique': len(self.ids),
+                'duplicated': sum(1 for count in self.ids.values() if count > 1),
+                'missing': self.missing_ids,
+            },
+            'fields': dict(sorted(self.fields.items(), key=lambda item: (-item[1], item[0]))),
+            'brands': brands,
+            'images': {
+                'products_with_images': sum(self.brand_with_images.values()),
+                'products_with_local_images': sum(self.brand_with_local_images.values()),
+                'references': self.references,
+                'resolved': self.resolved,
+                'missing': sorted(self.missing_images),
+            },
+        }
+
+
+def compute_stats(catalog_paths: List[str], images_dir: str, images: Optional[Dict[str, int]] = None) -> Dict:
+    """Statistics of every catalog plus image and id coverage across them, in one pass per catalog"""
+    started_at = time.perf_counter()
+    if images is None:
+        images = list_images(images_dir)
+
+    catalogs = []
+    referenced = set()
+    catalogs_by_id: Dict[str, int] = Counter()
+    for path in catalog_paths:
+        stats = CatalogStats(path, images)
+        for product in iter_catalog(path):
+            stats.add(product)
+        catalogs.append(stats.to_dict())
+        referenced.update(stats.referenced)
+        for product_id in stats.ids:
+            catalogs_by_id[product_id] += 1
+
+    unreferenced = sorted(set(images) - referenced)
+    return {
+        'stats_version': STATS_VERSION,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'images_dir': images_dir,
+        'images': {
+            'files': len(images),
+            'bytes': sum(images.values()),
+            'referenced': len(referenced),
+            'unreferenced': len(unreferenced),
+            'unreferenced_bytes': sum(images[name] for name in unreferenced),
+            'unreferenced_files': unreferenced,
+        },
+        'shared_ids': sum(1 for count in catalogs_by_id.values() if count > 1),
+        'catalogs': catalogs,
+        'seconds': round(time.perf_counter() - started_at, 3),
+    }
+
+
+def cache_key(catalog_paths: List[str], images_dir: str, images: Dict[str, int]) -> str:
+    """Hash of the catalog contents and the image file names and sizes, which is all the statistics depend on"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{STATS_VERSION}\x1f{images_dir}".encode('utf-8'))
+    for path in catalog_paths:
+        digest.update(f"\x1e{path}\x1f{file_digest(path)}".encode('utf-8'))
+    for name, size in sorted(images.items()):
+        digest.update(f"\x1d{name}\x1f{size}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def cached_stats(catalog_paths: List[str], images_dir: str, cache_path: Optional[str]) -> Tuple[Dict, bool]:
+    """(statistics, whether they came from the cache); the cache holds the last result and its key"""
+    images = list_images(images_dir)
+    if not cache_path:
+        return compute_stats(catalog_paths, images_dir, images), False
+
+    key = cache_key(catalog_paths, images_dir, images)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached['stats'], True
+    except (OSError, ValueError, KeyError):
+        pass
+
+    stats = compute_stats(catalog_paths, images_dir, images)
+    atomic_write(cache_path, json.dumps({'key': key, 'stats': stats}, ensure_ascii=False).encode('utf-8'))
+    return stats, False
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Build-time catalog compiler for the site
+Enriches catalog products that lack the site's fields (slug, summary, tags,
+image, gallery), applies the category groups of src/data/catalog.config.json
+and writes src/data/products.compiled.json with the lookup tables
+src/lib/products.ts would otherwise rebuild on every load: slug -> index,
+brand -> indices, category group -> indices and, from related_products.py,
+product -> indices of its related products
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import unicodedata
+from typing import Dict, List
+
+from catalog_reader import IMAGE_EXTENSIONS, iter_catalog
+from http_cache import atomic_write
+from related_products import nearest_neighbours
+
+# Bump whenever the compiled layout changes
+COMPILED_VERSION = 2
+
+DEFAULT_SOURCE = 'src/data/products.enriched.json'
+DEFAULT_CONFIG = 'src/data/catalog.config.json'
+DEFAULT_OUTPUT = 'src/data/products.compiled.json'
+DEFAULT_IMAGES_DIR = 'public/products'
+IMAGE_URL_PREFIX = '/products/'
+
+# Letters NFKD leaves alone that still have an obvious ASCII spelling
+_TRANSLITERATIONS = str.maketrans({'ı': 'i', 'α': 'a', 'β': 'b', 'ß': 'ss', 'ø': 'o', 'æ': 'ae'})
+
+
+def slugify(text: str) -> str:
+    """URL slug of a product name: 'HR³ Matrix Scalp Shampoo α' -> 'hr3-matrix-scalp-shampoo-a'"""
+    text = unicodedata.normalize('NFKD', text.lower().translate(_TRANSLITERATIONS))
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', '-', text).strip('-')
+
+
+def image_slug(name: str) -> str:
+    # Downloaded image files drop the dots of names ('C.C Cream' -> cc-cream-1.png)
+    return slugify(name.replace('.', ''))
+
+
+def summarize(product: Dict) -> str:
+    """First line of the description that is not just the product name"""
+    name = re.sub(r'\s+', '', product.get('name', '')).casefold()
+    for line in (product.get('description') or '').split('\n'):
+        line = line.strip()
+        if line and re.sub(r'\s+', '', line).casefold() != name:
+            return line
+    return ''
+
+
+def index_images(images_dir: str) -> Dict[str, List[str]]:
+    """Image URLs of public/products keyed by the slug they were saved under, in number order"""
+    numbered: Dict[str, List] = {}
+    if os.path.isdir(images_dir):
+        for name in os.listdir(images_dir):
+            match = re.fullmatch(r'(.+)-(\d+)(\.[a-z]+)', name.lower())
+            if match and match.group(3) in IMAGE_EXTENSIONS:
+                numbered.setdefault(match.group(1), []).append((int(match.group(2)), name))
+    return {slug: [IMAGE_URL_PREFIX + name for _, name in sorted(files)] for slug, files in numbered.items()}
+
+
+def enrich_product(product: Dict, images: Dict[str, List[str]]) -> Dict:
+    """Product with the site's fields filled in where missing; fields already present are kept"""
+    enriched = dict(product)
+    if not enriched.get('slug'):
+        enriched['slug'] = slugify(product.get('name', ''))
+    if 'summary' not in enriched:
+        enriched['summary'] = summarize(product)
+    if 'tags' not in enriched:
+        enriched['tags'] = [tag for tag in (product.get('brand'), product.get('category')) if tag]
+    if 'gallery' not in enriched:
+        enriched['gallery'] = images.get(enriched['slug']) or images.get(image_slug(product.get('name', '')), [])
+    if 'image' not in enriched:
+        enriched['image'] = enriched['gallery'][0] if enriched['gallery'] else ''
+    return enriched
+
+
+def load_config(path: str) -> Dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compile_products(products: List[Dict], config: Dict) -> Dict:
+    """Site products with grouped categories, plus the lookup tables over them"""
+    groups = config.get('categoryGroups', {})
+    fallback = config.get('fallbackCategory', '')
+
+    compiled = []
+    by_slug: Dict[str, int] = {}
+    by_brand: Dict[str, List[int]] = {}
+    by_category: Dict[str, List[int]] = {}
+    for index, product in enumerate(products):
+        original_category = product.get('category', '')
+        category = groups.get(original_category, fallback)
+        # Grouped category and brand first, then the product's own tags without the raw category
+        tags = [category, product.get('brand')] + [tag for tag in product.get('tags', []) if tag != original_category]
+        entry = dict(product, category=category, originalCategory=original_category,
+                     tags=list(dict.fromkeys(tag for tag in tags if tag)))
+        compiled.append(entry)
+
+        if entry['slug'] in by_slug:
+            raise ValueError(f"Duplicate slug {entry['slug']!r} ({product.get('name')!r})")
+        by_slug[entry['slug']] = index
+        by_brand.setdefault(entry.get('brand', ''), []).append(index)
+        by_category.setdefault(category, []).append(index)
+
+    # Configured brands first in their order, then the rest alphabetically
+    brand_order = config.get('brandOrder', [])
+    brands = [brand for brand in brand_order if brand in by_brand]
+    brands += sorted(brand for brand in by_brand if brand not in brand_order)
+
+    return {
+        'version': COMPILED_VERSION,
+        'products': compiled,
+        'brands': brands,
+        'categories': sorted(by_category),
+        'bySlug': by_slug,
+        'byBrand': {brand: by_brand[brand] for brand in brands},
+        'byCategory': {category: by_category[category] for category in sorted(by_category)},
+        'related': nearest_neighbours(compiled),
+    }
+
+
+def render_json(data) -> bytes:
+    return (json.dumps(data, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the site catalog and its lookup tables")
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help="Catalog to compile: the enriched catalog, or a scraped and deduplicated one")
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help="Category groups and brand order")
+    parser.add_argument('--images', default=DEFAULT_IMAGES_DIR, help="Product images for missing galleries")
+    parser.add_argument('--enriched', help="Also save the enriched catalog here")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Compiled catalog for src/lib/products.ts")
+    parser.add_argument('--check', action='store_true',
+                        help="Only check that the compiled catalog is up to date (exit 1 if not)")
+    args = parser.parse_args()
+
+    images = index_images(args.images)
+    products = [enrich_product(product, images) for product in iter_catalog(args.source)]
+    compiled = render_json(compile_products(products, load_config(args.config)))
+
+    if args.check:
+        with open(args.output, 'rb') as f:
+            up_to_date = f.read() == compiled
+        print(f"{'✅' if up_to_date else '❌'} {args.output} is {'up to date' if up_to_date else 'stale'}")
+        sys.exit(0 if up_to_date else 1)
+
+    print(f"📦 Compiled {len(products)} products from {args.source}")
+    without_images = [product['slug'] for product in products if not product.get('gallery')]
+    if without_images:
+        print(f"⚠️ {len(without_images)} products have no images: {', '.join(without_images[:5])}")
+    if args.enriched:
+        # The enriched catalog keeps the source's own categories
+        atomic_write(args.enriched, (json.dumps(products, indent=2, ensure_ascii=False)).encode('utf-8'))
+        print(f"📄 Enriched catalog saved to: {args.enriched}")
+    atomic_write(args.output, compiled)
+    print(f"✅ Compiled catalog saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Content fingerprints for near-duplicate products
+64-bit SimHash signatures over word shingles of the description and
+ingredients, looked up by Hamming distance through permuted block tables
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+FINGERPRINT_BITS = 64
+_MASK = (1 << FINGERPRINT_BITS) - 1
+_COMBINING_MARKS = re.compile('[\u0300-\u036f]')
+
+
+def content_text(product: dict) -> str:
+    """Description and ingredients of a product, lowercased without accents or punctuation"""
+    ingredients = product.get('ingredients', '') or ''
+    if isinstance(ingredients, list):
+        ingredients = ' '.join(str(item) for item in ingredients)
+    text = f"{product.get('description', '') or ''} {ingredients}"
+    text = _COMBINING_MARKS.sub('', unicodedata.normalize('NFD', text.lower()))
+    return re.sub(r'\s+', ' ', re.sub(r'[^\w\s]', ' ', text)).strip()
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+# Bit-sliced counting: every hash bit gets its own LANE_BITS-wide lane of one big
+# integer, so summing spread hashes counts all 64 bit positions in one addition
+LANE_BITS = 24
+_LANE_MASK = (1 << LANE_BITS) - 1
+# spread(v) is spread(v >> 1) moved up one lane with v's lowest bit in lane 0
+_SPREAD_16 = [0, 1]
+for _value in range(2, 1 << 16):
+    _SPREAD_16.append(_SPREAD_16[_value >> 1] << LANE_BITS | _value & 1)
+_SHIFT_16 = 16 * LANE_BITS
+
+
+def _spread(value: int) -> int:
+    table = _SPREAD_16
+    return (table[value & 0xFFFF] | table[value >> 16 & 0xFFFF] << _SHIFT_16
+            | table[value >> 32 & 0xFFFF] << 2 * _SHIFT_16 | table[value >> 48] << 3 * _SHIFT_16)
+
+
+@lru_cache(maxsize=1 << 16)
+def _spread_shingle(shingle: str) -> int:
+    # Catalog copy repeats a lot of boilerplate, so shingles recur across products
+    return _spread(_feature_hash(shingle))
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """SimHash of the word shingles of a text, each weighted by how often it occurs"""
+    words = text.split()
+    if len(words) <= shingle_size:
+        shingles = Counter([' '.join(words)])
+    else:
+        shingles = Counter(' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1))
+
+    # A bit is set when the shingles with it set outweigh those without
+    lanes = sum(count * _spread_shingle(shingle) for shingle, count in shingles.items())
+    total = sum(shingles.values())
+    fingerprint = 0
+    for bit in range(FINGERPRINT_BITS):
+        if 2 * (lanes >> (bit * LANE_BITS) & _LANE_MASK) > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class SimHashIndex:
+    """Near-duplicate lookup for 64-bit fingerprints within `max_distance` bits
+
+    The fingerprint is cut into max_distance + 1 blocks. Two fingerprints
+    differing in at most max_distance bits agree on at least one whole
+    block, so each table keys fingerprints by one block (the fingerprint
+    rotated to bring that block to the top, as in the permuted tables of
+    Manku et al.) and only fingerprints sharing a key are compared. Every
+    true match is found; unrelated texts rarely share a block.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        blocks = max_distance + 1
+        bounds = [round(FINGERPRINT_BITS * i / blocks) for i in range(blocks + 1)]
+        # (rotation, width) bringing each block to the top bits of a permuted fingerprint
+        self.permutations = [(FINGERPRINT_BITS - bounds[i + 1], bounds[i + 1] - bounds[i]) for i in range(blocks)]
+        self.tables: List[Dict[int, List[Hashable]]] = [defaultdict(list) for _ in range(blocks)]
+        self.fingerprints: Dict[Hashable, int] = {}
+
+    @staticmethod
+    def _rotate(fingerprint: int, shift: int) -> int:
+        return ((fingerprint << shift) | (fingerprint >> (FINGERPRINT_BITS - shift))) & _MASK if shift else fingerprint
+
+    def _keys(self, fingerprint: int) -> List[int]:
+        return [self._rotate(fingerprint, shift) >> (FINGERPRINT_BITS - width)
+                for shift, width in self.permutations]
+
+    def add(self, key: Hashable, fingerprint: int) -> None:
+        self.fingerprints[key] = fingerprint
+        for table, block in zip(self.tables, self._keys(fingerprint)):
+            table[block].append(key)
+
+    def add_all(self, items: Iterable[Tuple[Hashable, int]]) -> 'SimHashIndex':
+        for key, fingerprint in items:
+            self.add(key, fingerprint)
+        return self
+
+    def query(self, fingerprint: int, exclude: Optional[Hashable] = None) -> List[Tuple[Hashable, int]]:
+        """(key, distance) of every indexed fingerprint within max_distance, sorted by key"""
+        found = {}
+        for table, block in zip(self.tables, self._keys(fingerprint)):
+            for key in table.get(block, ()):
+                if key != exclude and key not in found:
+                    found[key] = hamming_distance(fingerprint, self.fingerprints[key])
+        return sorted((key, distance) for key, distance in found.items() if distance <= self.max_distance)
+
+    def near_pairs(self) -> Iterator[Tuple[Hashable, Hashable, int]]:
+        """(smaller, larger, distance) for every pair within max_distance, in sorted order"""
+        for key in sorted(self.fingerprints):
+            for other, distance in self.query(self.fingerprints[key], exclude=key):
+                if other > key:
+                    yield key, other, distance
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Catalog refresh for NK Beauty
+Crawls every brand adapter concurrently over one pooled HTTP client, with
+shared global and per-host limits, parse and image worker pools, and an
+overall deadline
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from brand_adapters import BRAND_ADAPTERS, get_adapter
+from crawl_telemetry import CrawlTelemetry
+from scrape_theraderm import BrandScraper, HostLimits, open_client_session
+
+
+class CatalogCrawler:
+    """Runs one BrandScraper per adapter against shared connection and worker pools
+
+    Brands on the same host share its per-host semaphore and token bucket,
+    so adding brands never raises the request rate against a site. A brand
+    whose crawl fails (a listing still unreachable after its retries) is
+    reported as failed without stopping the others. When the deadline
+    passes the remaining work is cancelled; every product stored so far is
+    still compacted and `--resume` picks up the rest next time.
+    """
+
+    def __init__(self, brands, max_connections=16, max_per_host=4, rate=2.0, deadline=None,
+                 use_cache=True, offline=False, image_workers=None, parse_workers=None, resume=False,
+                 max_retries=3, timeout=30, event_log=None, telemetry_file='catalog_telemetry.json'):
+        self.adapters = [get_adapter(slug) for slug in brands]
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.deadline = deadline
+        self.timeout = timeout
+        self.image_workers = image_workers
+        self.parse_workers = parse_workers
+        self.telemetry_file = telemetry_file
+        self.scraper_options = {
+            'max_per_host': max_per_host, 'rate': rate, 'use_cache': use_cache, 'offline': offline,
+            'resume': resume, 'max_retries': max_retries, 'timeout': timeout,
+        }
+
+        self.telemetry = CrawlTelemetry(event_log)
+        self.host_limits = HostLimits(max_per_host, rate)
+        self.scrapers = []
+        self.timed_out = False
+        # Brand name -> error that ended its crawl
+        self.failed = {}
+
+    async def crawl_brand(self, scraper, http):
+        """Crawl one brand, recording an error instead of letting it end the other brands' crawls"""
+        try:
+            await scraper.run_shared(http)
+        except Exception as e:
+            self.failed[scraper.adapter.name] = f"{type(e).__name__}: {e}"
+            print(f"❌ {scraper.adapter.name} crawl failed: {self.failed[scraper.adapter.name]}")
+
+    async def crawl(self, image_executor, parse_pool):
+        """Crawl all brands concurrently within the deadline"""
+        self.scrapers = [
+            BrandScraper(adapter, telemetry=self.telemetry, host_limits=self.host_limits,
+                         image_executor=image_executor, parse_pool=parse_pool, **self.scraper_options)
+            for adapter in self.adapters
+        ]
+
+        async with open_client_session(self.telemetry, self.max_per_host, limit=self.max_connections,
+                                       timeout=self.timeout) as http:
+            crawls = asyncio.gather(*[self.crawl_brand(scraper, http) for scraper in self.scrapers])
+            try:
+                await asyncio.wait_for(crawls, timeout=self.deadline)
+            except asyncio.TimeoutError:
+                self.timed_out = True
+                print(f"⏰ Deadline of {self.deadline}s reached, stopping the crawl")
+
+    def run(self):
+        """Refresh every brand and write per-brand outputs plus the shared telemetry"""
+        print(f"🚀 Starting catalog refresh: {', '.join(adapter.name for adapter in self.adapters)} "
+              f"({self.max_connections} connections, {self.max_per_host} per host)")
+
+        started_at = time.monotonic()
+        summaries = {}
+        with ProcessPoolExecutor(max_workers=self.image_workers) as image_executor, \
+                ProcessPoolExecutor(max_workers=self.parse_workers) as parse_pool:
+            try:
+                asyncio.run(self.crawl(image_executor, parse_pool))
+            finally:
+                for scraper in self.scrapers:
+                    print(f"\n📁 Finishing {scraper.adapter.name}...")
+                    summaries[scraper.adapter.name] = scraper.finish_crawl()
+
+        self.report(summaries, time.monotonic() - started_at)
+        return summaries
+
+    def report(self, summaries, elapsed):
+        data = self.telemetry.save(self.telemetry_file)
+        self.telemetry.close()
+
+        print(f"\n🎉 Catalog refresh {'stopped at the deadline' if self.timed_out else 'completed'} "
+              f"in {elapsed:.1f}s")
+        for scraper in self.scrapers:
+            summary = summaries.get(scraper.adapter.name)
+            count = summary['total_products'] if summary else 0
+            failure = f" (failed: {self.failed[scraper.adapter.name]})" if scraper.adapter.name in self.failed else ""
+            print(f"📊 {scraper.adapter.name}: {count} products -> {scraper.data_dir}{failure}")
+        if self.failed:
+            print(f"⚠️ {len(self.failed)} of {len(self.scrapers)} brands failed: {', '.join(sorted(self.failed))}")
+        print(f"🌐 Requests: {data['requests']} ({data['retries']} retries, {data['errors']} errors, "
+              f"{data['cache_hits']} cache hits)")
+        print(f"📈 Telemetry saved to {os.path.abspath(self.telemetry_file)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl every brand's products from NureDerm in one job")
+    parser.add_argument('--brands', nargs='+', default=sorted(BRAND_ADAPTERS),
+                        help="Brand slugs to crawl (default: all)")
+    parser.add_argument('--max-connections', type=int, default=16,
+                        help="Maximum open connections across all hosts")
+    parser.add_argument('--max-per-host', type=int, default=4,
+                        help="Maximum in-flight requests per host, shared by all brands")
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help="Maximum requests per second per host, shared by all brands")
+    parser.add_argument('--deadline', type=float, default=None,
+                        help="Stop crawling after this many seconds and save what was scraped")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Bypass the on-disk HTTP caches")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve every request from the HTTP caches without touching the network")
+    parser.add_argument('--image-workers', type=int, default=None,
+                        help="Number of processes converting images (default: CPU count)")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="Number of processes parsing product pages (default: CPU count)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip products already recorded in each brand's crawl checkpoint")
+    parser.add_argument('--max-retries', type=int, default=3,
+                        help="Retries for failed requests, 429 and 5xx responses")
+    parser.add_argument('--event-log', default=None,
+                        help="Append a JSON-lines event per request, retry, parse and image to this file")
+    args = parser.parse_args()
+
+    crawler = CatalogCrawler(args.brands, max_connections=args.max_connections, max_per_host=args.max_per_host,
+                             rate=args.rate, deadline=args.deadline, use_cache=not args.no_cache,
+                             offline=args.offline, image_workers=args.image_workers,
+                             parse_workers=args.parse_workers, resume=args.resume,
+                             max_retries=args.max_retries, event_log=args.event_log)
+    crawler.run()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Streaming product storage for the NK Beauty scrapers
+Appends every scraped product to a JSONL file as soon as it is done and
+checkpoints finished URLs, so a crashed crawl can resume where it stopped
+"""
+
+import json
+import os
+from typing import Dict, Iterator, Optional, Set
+
+
+class ProductStore:
+    """Append-only product log with a URL checkpoint
+
+    `theraderm_products.jsonl` receives one product per line and
+    `crawl_checkpoint.txt` one finished URL per line, both flushed after
+    every product. `compact` turns the log into the regular
+    `theraderm_products.json` / `theraderm_summary.json` outputs.
+    """
+
+    def __init__(self, data_dir: str = 'theraderm_data', prefix: str = 'theraderm', resume: bool = False):
+        self.data_dir = data_dir
+        self.prefix = prefix
+        self.jsonl_path = os.path.join(data_dir, f'{prefix}_products.jsonl')
+        self.checkpoint_path = os.path.join(data_dir, 'crawl_checkpoint.txt')
+        self.products_path = os.path.join(data_dir, f'{prefix}_products.json')
+        self.summary_path = os.path.join(data_dir, f'{prefix}_summary.json')
+        self.done_urls: Set[str] = set()
+        self.appended = 0
+
+        os.makedirs(data_dir, exist_ok=True)
+        if resume:
+            self.done_urls = self._load_checkpoint()
+            self._terminate_last_line(self.jsonl_path)
+            self._terminate_last_line(self.checkpoint_path)
+        else:
+            # Fresh crawl - start both files over
+            open(self.jsonl_path, 'w').close()
+            open(self.checkpoint_path, 'w').close()
+
+        self._jsonl = open(self.jsonl_path, 'a', encoding='utf-8')
+        self._checkpoint = open(self.checkpoint_path, 'a', encoding='utf-8')
+
+    @staticmethod
+    def _terminate_last_line(path: str) -> None:
+        """Make sure a line cut off by a crash does not swallow the next append"""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    def _load_checkpoint(self) -> Set[str]:
+        try:
+            with open(self.checkpoint_path, 'r', encoding='utf-8') as f:
+                return {line.strip() for line in f if line.strip()}
+        except OSError:
+            return set()
+
+    def is_done(self, url: str) -> bool:
+        return url in self.done_urls
+
+    def append(self, product: Dict) -> None:
+        """Write a product to the log, then mark its URL finished"""
+        self._jsonl.write(json.dumps(product, ensure_ascii=False) + '\n')
+        self._jsonl.flush()
+
+        self._checkpoint.write(product['url'] + '\n')
+        self._checkpoint.flush()
+
+        self.done_urls.add(product['url'])
+        self.appended += 1
+
+    def close(self) -> None:
+        self._jsonl.close()
+        self._checkpoint.close()
+
+    def iter_products(self) -> Iterator[Dict]:
+        """Stream products from the log, skipping a truncated last line"""
+        with open(self.jsonl_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def compact(self, failed_images: Optional[Set[str]] = None, extra_summary: Optional[Dict] = None) -> Dict:
+        """Write the products JSON array and summary from the log
+
+        Products re-scraped after a resume appear twice in the log; the last
+        copy wins. Only URLs are held in memory, products are streamed.
+        """
+        if not self._jsonl.closed:
+            self._jsonl.flush()
+        failed_images = failed_images or set()
+
+        last_line = {}
+        for line_number, product in enumerate(self.iter_products()):
+            last_line[product['url']] = line_number
+
+        summary = {
+            'total_products': 0,
+            'products_with_images': 0,
+            'products_with_descriptions': 0,
+            'products_with_ingredients': 0,
+            'product_names': []
+        }
+
+        tmp_path = self.products_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for line_number, product in enumerate(self.iter_products()):
+                if last_line[product['url']] != line_number:
+                    continue
+
+                product['downloaded_images'] = [
+                    path for path in product.get('downloaded_images', []) if path not in failed_images
+                ]
+
+                if summary['total_products']:
+                    f.write(',')
+                f.write('\n  ' + json.dumps(product, ensure_ascii=False, indent=2).replace('\n', '\n  '))
+
+                summary['total_products'] += 1
+                summary['products_with_images'] += bool(product.get('downloaded_images'))
+                summary['products_with_descriptions'] += bool(product.get('description'))
+                summary['products_with_ingredients'] += bool(product.get('ingredients'))
+                if product.get('name'):
+                    summary['product_names'].append(product['name'])
+            f.write('\n]' if summary['total_products'] else ']')
+        os.replace(tmp_path, self.products_path)
+
+        summary.update(extra_summary or {})
+        with open(self.summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        return summary
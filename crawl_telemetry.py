@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Crawl telemetry for the NK Beauty scrapers
+Collects per-request latency (DNS, connect, TTFB, total), response sizes,
+parse and image timings and retry counts into histograms, with an optional
+JSON-lines event log
+"""
+
+import json
+import math
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# Upper bounds of the histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, math.inf)
+SIZE_BUCKETS_BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, math.inf)
+
+
+class Histogram:
+    """Fixed-bucket histogram with exact count/sum/min/max and bucket-estimated percentiles"""
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of observations"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'mean': round(self.total / self.count, 3),
+            'min': round(self.min, 3),
+            'max': round(self.max, 3),
+            'p50': round(self.percentile(0.50), 3),
+            'p90': round(self.percentile(0.90), 3),
+            'p99': round(self.percentile(0.99), 3),
+            'buckets': {
+                ('+inf' if math.isinf(bound) else f'<={bound:g}'): count
+                for bound, count in zip(self.bounds, self.counts)
+            },
+        }
+
+
+class CrawlTelemetry:
+    """Histograms and counters for one crawl
+
+    Latency histograms are in milliseconds. DNS and connect times are only
+    available from the aiohttp client (see `trace_config`); the requests
+    client reports TTFB and total time.
+    """
+
+    HISTOGRAMS = {
+        'dns_ms': LATENCY_BUCKETS_MS,
+        'connect_ms': LATENCY_BUCKETS_MS,
+        'ttfb_ms': LATENCY_BUCKETS_MS,
+        'total_ms': LATENCY_BUCKETS_MS,
+        'response_bytes': SIZE_BUCKETS_BYTES,
+        'parse_ms': LATENCY_BUCKETS_MS,
+        'image_ms': LATENCY_BUCKETS_MS,
+    }
+
+    def __init__(self, event_log_path: Optional[str] = None):
+        self.histograms = {name: Histogram(bounds) for name, bounds in self.HISTOGRAMS.items()}
+        self.statuses = Counter()
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._event_log = open(event_log_path, 'a', encoding='utf-8') if event_log_path else None
+
+    def event(self, event_type: str, **fields) -> None:
+        """Append an event to the JSON-lines log, if enabled"""
+        if self._event_log is None:
+            return
+        record = {'ts': round(time.time(), 3), 'event': event_type, **fields}
+        with self._lock:
+            self._event_log.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            self.histograms[name].observe(value)
+
+    def record_request(self, url: str, status: int, timings: Dict[str, Optional[float]],
+                       size: int, retries: int = 0) -> None:
+        """Record one completed request; timings maps histogram names (dns_ms, ...) to values"""
+        with self._lock:
+            self.requests += 1
+            self.statuses[str(status)] += 1
+            self.histograms['response_bytes'].observe(size)
+            for name, value in timings.items():
+                if value is not None:
+                    self.histograms[name].observe(value)
+        self.event('request', url=url, status=status, bytes=size, retries=retries,
+                   **{name: round(value, 3) for name, value in timings.items() if value is not None})
+
+    def record_retry(self, url: str, attempt: int, reason: str) -> None:
+        with self._lock:
+            self.retries += 1
+        self.event('retry', url=url, attempt=attempt, reason=reason)
+
+    def record_error(self, url: str, reason: str) -> None:
+        with self._lock:
+            self.errors += 1
+        self.event('error', url=url, reason=reason)
+
+    def record_cache_hit(self, url: str) -> None:
+        with self._lock:
+            self.cache_hits += 1
+        self.event('cache_hit', url=url)
+
+    def trace_config(self):
+        """aiohttp TraceConfig filling the `timings` dict passed as trace_request_ctx"""
+        import aiohttp
+
+        def now():
+            return time.perf_counter()
+
+        async def on_request_start(session, ctx, params):
+            ctx.trace_request_ctx['_start'] = now()
+
+        async def on_dns_start(session, ctx, params):
+            ctx.trace_request_ctx['_dns'] = now()
+
+        async def on_dns_end(session, ctx, params):
+            timings = ctx.trace_request_ctx
+            timings['dns_ms'] = (now() - timings.pop('_dns')) * 1000
+
+        async def on_connect_start(session, ctx, params):
+            ctx.trace_request_ctx['_connect'] = now()
+
+        async def on_connect_end(session, ctx, params):
+            timings = ctx.trace_request_ctx
+            timings['connect_ms'] = (now() - timings.pop('_connect')) * 1000
+
+        async def on_request_end(session, ctx, params):
+            # Fired once the response headers have arrived
+            timings = ctx.trace_request_ctx
+            timings['ttfb_ms'] = (now() - timings['_start']) * 1000
+
+        config = aiohttp.TraceConfig()
+        config.on_request_start.append(on_request_start)
+        config.on_dns_resolvehost_start.append(on_dns_start)
+        config.on_dns_resolvehost_end.append(on_dns_end)
+        config.on_connection_create_start.append(on_connect_start)
+        config.on_connection_create_end.append(on_connect_end)
+        config.on_request_end.append(on_request_end)
+        return config
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at)),
+                'duration_s': round(time.time() - self.started_at, 3),
+                'requests': self.requests,
+                'retries': self.retries,
+                'errors': self.errors,
+                'cache_hits': self.cache_hits,
+                'statuses': dict(self.statuses),
+                'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+            }
+
+    def save(self, path: str) -> Dict:
+        data = self.to_dict()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return data
+
+    def close(self) -> None:
+        if self._event_log is not None:
+            self._event_log.close()
+            self._event_log = None
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Persistent dedup index for incremental duplicate detection
+Keeps normalized features, MinHash band buckets and cluster assignments in
+a SQLite file, so a post-scrape run only compares new or changed products
+against what is already indexed
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set, Tuple
+
+from analyze_duplicates import ProductDuplicateAnalyzer
+from dedup_utils import UnionFind, brand_key
+from duplicate_clusters import DuplicateClusterer
+from product_features import FEATURES_VERSION, ProductFeatures, feature_key
+from similarity_index import MinHashLSH
+
+# Bump whenever the schema or the matching rules change so old indexes are rebuilt
+INDEX_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS products (
+    key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    brand_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    clean_normalized TEXT NOT NULL,
+    size TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    cluster TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_name ON products (brand_key, normalized);
+CREATE INDEX IF NOT EXISTS products_cluster ON products (cluster);
+CREATE TABLE IF NOT EXISTS buckets (brand_key TEXT NOT NULL, bucket TEXT NOT NULL, key TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS buckets_lookup ON buckets (brand_key, bucket);
+CREATE INDEX IF NOT EXISTS buckets_key ON buckets (key);
+CREATE TABLE IF NOT EXISTS matches (
+    key1 TEXT NOT NULL,
+    key2 TEXT NOT NULL,
+    type TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (key1, key2)
+);
+CREATE INDEX IF NOT EXISTS matches_key2 ON matches (key2);
+"""
+
+# Match types that put two products in one cluster; 'variant' pairs are only reported
+MERGING_MATCHES = ('exact', 'similar')
+
+
+def product_key(product: dict, taken: Optional[Set[str]] = None) -> str:
+    """Stable identity of a product across runs: product_id, slug, URL or, failing those, its name
+
+    Catalogs do reuse product ids for different products; a key already in
+    `taken` is extended with the product's URL or name so the later product
+    is still indexed. '' means the product has no usable identity (or is a
+    repeat of one already taken).
+    """
+    key = ''
+    for field in ('product_id', 'slug', 'url', 'name'):
+        value = (product.get(field, '') or '').strip()
+        if value:
+            key = value
+            break
+    if key and taken is not None and key in taken:
+        fallback = (product.get('url', '') or product.get('name', '') or '').strip()
+        key = f"{key}\x1f{fallback}" if fallback and fallback != key else ''
+        if key in taken:
+            key = ''
+    return key
+
+
+class DedupIndex:
+    """Duplicate index of one catalog, updated in place
+
+    Each product is stored under product_key() with a hash of the fields
+    its features derive from. update() skips products whose hash is
+    unchanged, re-indexes changed ones and compares every new or changed
+    product against the index only:
+    - the same normalized name within the brand ('exact')
+    - names sharing a MinHash band bucket within the brand, or every name
+      of brands smaller than the analyzer's LSH_MIN_NAMES, scored with
+      SequenceMatcher ('similar' or 'variant', as in DuplicateClusterer)
+
+    Exact and similar matches merge clusters; a changed or removed product
+    re-derives its old cluster from the stored matches, so work stays
+    proportional to the delta and the clusters it touches.
+    """
+
+    def __init__(self, path: str, analyzer: Optional[ProductDuplicateAnalyzer] = None):
+        self.path = path
+        self.analyzer = analyzer or ProductDuplicateAnalyzer('')
+        # Incremental matching scores with SequenceMatcher; a TF-IDF threshold would be on the wrong scale
+        if self.analyzer.scorer != 'sequence':
+            raise ValueError(f"The dedup index scores with SequenceMatcher, not '{self.analyzer.scorer}'")
+        self.lsh = MinHashLSH(**self.analyzer.lsh_params)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self._check_settings()
+
+    def _settings(self) -> str:
+        return json.dumps({
+            'index_version': INDEX_VERSION,
+            'features_version': FEATURES_VERSION,
+            'scorer': self.analyzer.scorer,
+            'threshold': self.analyzer.similar_threshold,
+            'lsh': [self.lsh.bands, self.lsh.rows, self.lsh.shingle_size],
+        }, sort_keys=True)
+
+    def _check_settings(self) -> None:
+        """Start the index over if it was built with other settings"""
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        settings = self._settings()
+        if row and row[0] == settings:
+            return
+        if row:
+            print(f"♻️ Index settings changed, rebuilding {self.path}")
+        with self.connection:
+            for table in ('products', 'buckets', 'matches', 'meta'):
+                self.connection.execute(f"DELETE FROM {table}")
+            self.connection.execute("INSERT INTO meta (key, value) VALUES ('settings', ?)", (settings,))
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'DedupIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    @staticmethod
+    def content_hash(product: dict) -> str:
+        return hashlib.sha1(f"{feature_key(product)}\x1f{brand_key(product.get('brand', ''))}".encode('utf-8')).hexdigest()
+
+    def bucket_keys(self, clean_normalized: str) -> List[str]:
+        """Band buckets of a size-less normalized name"""
+        signature = self.lsh.signature(clean_normalized)
+        rows = self.lsh.rows
+        return [f"{band}:" + ','.join(map(str, signature[band * rows:(band + 1) * rows]))
+                for band in range(self.lsh.bands)]
+
+    def _features(self, row: Tuple) -> ProductFeatures:
+        key, name, normalized, clean_normalized, size, tokens = row
+        return ProductFeatures(name, normalized, clean_normalized, size, tuple(tokens.split()), key)
+
+    def _candidates(self, key: str, brand: str, buckets: List[str]) -> List[ProductFeatures]:
+        """Indexed products of the brand worth scoring against a new name"""
+        columns = "p.key, p.name, p.normalized, p.clean_normalized, p.size, p.tokens"
+        count = self.connection.execute("SELECT COUNT(*) FROM products WHERE brand_key = ?", (brand,)).fetchone()[0]
+        if count < self.analyzer.LSH_MIN_NAMES:
+            rows = self.connection.execute(
+                f"SELECT {columns} FROM products p WHERE p.brand_key = ? AND p.key != ? AND p.name != ''",
+                (brand, key))
+        else:
+            placeholders = ','.join('?' * len(buckets))
+            rows = self.connection.execute(
+                f"SELECT {columns} FROM products p WHERE p.key IN ("
+                f"SELECT b.key FROM buckets b WHERE b.brand_key = ? AND b.bucket IN ({placeholders})"
+                f") AND p.key != ?",
+                (brand, *buckets, key))
+        return [self._features(row) for row in rows]
+
+    def _merge(self, key1: str, key2: str) -> None:
+        """Relabel the smaller of the two products' clusters to the larger one"""
+        clusters = [self.connection.execute("SELECT cluster FROM products WHERE key = ?", (key,)).fetchone()[0]
+                    for key in (key1, key2)]
+        if clusters[0] == clusters[1]:
+            return
+        sizes = [self.connection.execute("SELECT COUNT(*) FROM products WHERE cluster = ?", (cluster,)).fetchone()[0]
+                 for cluster in clusters]
+        keep, drop = clusters if sizes[0] >= sizes[1] else clusters[::-1]
+        self.connection.execute("UPDATE products SET cluster = ? WHERE cluster = ?", (keep, drop))
+
+    def _recluster(self, cluster: str) -> None:
+        """Rebuild one cluster from the merging matches left between its members"""
+        members = [row[0] for row in self.connection.execute(
+            "SELECT key FROM products WHERE cluster = ? ORDER BY key", (cluster,))]
+        if not members:
+            return
+        positions = {key: position for position, key in enumerate(members)}
+        sets = UnionFind(len(members))
+        # Select members through the cluster column, so large clusters do not bind one parameter per key
+        for key1, key2 in self.connection.execute(
+                "SELECT key1, key2 FROM matches WHERE type IN ('exact', 'similar') "
+                "AND key1 IN (SELECT key FROM products WHERE cluster = ?) "
+                "AND key2 IN (SELECT key FROM products WHERE cluster = ?)", (cluster, cluster)):
+            sets.union(positions[key1], positions[key2])
+        for group in sets.groups():
+            keys = [members[position] for position in group]
+            self.connection.executemany("UPDATE products SET cluster = ? WHERE key = ?",
+                                        [(keys[0], key) for key in keys])
+
+    def remove(self, key: str) -> None:
+        """Drop a product and its matches, splitting its cluster if it held it together"""
+        row = self.connection.execute("SELECT cluster FROM products WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return
+        self.connection.execute("DELETE FROM products WHERE key = ?", (key,))
+        self.connection.execute("DELETE FROM buckets WHERE key = ?", (key,))
+        self.connection.execute("DELETE FROM matches WHERE key1 = ? OR key2 = ?", (key, key))
+        self._recluster(row[0])
+
+    def _insert(self, key: str, product: dict, content_hash: str) -> List[Dict]:
+        """Index one product and return its matches against the products already indexed"""
+        analyzer = self.analyzer
+        features = analyzer.extract_features(product)
+        brand = brand_key(product.get('brand', ''))
+        buckets = self.bucket_keys(features.clean_normalized) if features.name else []
+
+        self.connection.execute(
+            "INSERT INTO products (key, content_hash, brand_key, name, normalized, clean_normalized, size, tokens, "
+            "cluster) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, content_hash, brand, features.name, features.normalized, features.clean_normalized,
+             features.size, ' '.join(features.tokens), key))
+        if not features.name:
+            return []
+
+        # The new name is the second sequence, which SequenceMatcher indexes once for every candidate
+        matcher = SequenceMatcher(None, '', features.clean_normalized)
+        threshold = analyzer.similar_threshold
+        scores: Dict[str, float] = {}
+        matches = []
+        for other in self._candidates(key, brand, buckets):
+            if other.normalized == features.normalized:
+                match_type, score = 'exact', 1.0
+            else:
+                score = scores.get(other.clean_normalized)
+                if score is None:
+                    matcher.set_seq1(other.clean_normalized)
+                    score = 0.0
+                    if matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold:
+                        score = matcher.ratio()
+                    scores[other.clean_normalized] = score
+                if score < threshold:
+                    continue
+                match_type = 'similar' if DuplicateClusterer.same_product(other, features) else 'variant'
+            matches.append({'product': key, 'match': other.product_id, 'type': match_type,
+                            'score': round(score, 4), 'name': features.name, 'match_name': other.name})
+
+        self.connection.executemany("INSERT INTO buckets (brand_key, bucket, key) VALUES (?, ?, ?)",
+                                    [(brand, bucket, key) for bucket in buckets])
+        for match in matches:
+            key1, key2 = sorted((match['product'], match['match']))
+            self.connection.execute("INSERT OR REPLACE INTO matches (key1, key2, type, score) VALUES (?, ?, ?, ?)",
+                                    (key1, key2, match['type'], match['score']))
+            if match['type'] in MERGING_MATCHES:
+                self._merge(key1, key2)
+        return matches
+
+    def update(self, products: List[dict], prune: bool = False) -> Dict:
+        """Bring the index up to date with a catalog, comparing only new and changed products
+
+        With `prune`, indexed products missing from `products` are removed;
+        leave it off when `products` is only the newly scraped delta.
+        """
+        started_at = time.perf_counter()
+        stored = dict(self.connection.execute("SELECT key, content_hash FROM products"))
+        counts = {'new': 0, 'changed': 0, 'unchanged': 0, 'removed': 0, 'skipped': 0}
+        matches = []
+        seen: Set[str] = set()
+
+        with self.connection:
+            for product in products:
+                key = product_key(product, seen)
+                if not key:
+                    counts['skipped'] += 1
+                    continue
+                seen.add(key)
+                content_hash = self.content_hash(product)
+                if stored.get(key) == content_hash:
+                    counts['unchanged'] += 1
+                    continue
+                if key in stored:
+                    self.remove(key)
+                    counts['changed'] += 1
+                else:
+                    counts['new'] += 1
+                matches.extend(self._insert(key, product, content_hash))
+
+            if prune:
+                for key in stored.keys() - seen:
+                    self.remove(key)
+                    counts['removed'] += 1
+
+        counts['matches'] = matches
+        counts['seconds'] = round(time.perf_counter() - started_at, 3)
+        return counts
+
+    def clusters(self) -> List[List[str]]:
+        """Product keys of every cluster with more than one member"""
+        groups: Dict[str, List[str]] = {}
+        for cluster, key in self.connection.execute(
+                "SELECT cluster, key FROM products WHERE cluster IN "
+                "(SELECT cluster FROM products GROUP BY cluster HAVING COUNT(*) > 1) ORDER BY cluster, key"):
+            groups.setdefault(cluster, []).append(key)
+        return list(groups.values())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the dedup tools
+Union-find over product positions and the brand comparison key, kept apart
+from the analyzer so lightweight tools can use them without loading it
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import List
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with path halving and union by size"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets of a and b, returning False if they were already one set"""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return True
+
+    def groups(self) -> List[List[int]]:
+        """Members of every set, each sorted, ordered by their first member"""
+        members = defaultdict(list)
+        for item in range(len(self.parent)):
+            members[self.find(item)].append(item)
+        return sorted(members.values())
+
+
+def brand_key(brand: str) -> str:
+    """Comparison key for a brand name: 'GENOSYS', 'Genosys' and 'Me Line' / 'MeLine' collapse together"""
+    if not brand:
+        return ""
+    brand = unicodedata.normalize('NFKD', brand.casefold())
+    brand = ''.join(c for c in brand if unicodedata.category(c) != 'Mn')
+    return re.sub(r'[^a-z0-9]', '', brand)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Duplicate clustering across catalog files
+Loads several catalogs (scraped products_data.json, the site's
+products.enriched.json, ...), merges every duplicate match into groups with
+union-find and writes one canonical record per group
+"""
+
+import argparse
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from analyze_duplicates import ProductDuplicateAnalyzer
+from catalog_reader import load_catalog
+from dedup_utils import UnionFind, brand_key
+
+
+class DuplicateClusterer:
+    """Groups duplicate products from any number of catalogs
+
+    Matches are the analyzer's own detectors, applied in near-linear time:
+    - the same product_id (or slug, for the enriched catalog) in two catalogs
+    - the same normalized name within a brand
+    - similar names within a brand (LSH candidates) that differ in
+      spacing alone, unless that would merge two entries of one catalog
+
+    Merging is transitive, so other similar names are not merged: names
+    that each carry a word the other lacks ('AGE 1 Solution' / 'AGE 2
+    Solution') or differ in size are variants, and a name that only adds
+    words to another is as often a different product ('HYDRA Gel Mask' /
+    'SOS Hydra Gel Mask 50 ml') as the same one. Those pairs only join
+    clusters into review families: one group to look at instead of every
+    pair of a product line.
+
+    Brands are compared by brand_key(). Records without a brand take the
+    brand of whatever they were matched to by id, so the brand-less scraped
+    catalog still joins the enriched one; the rest are compared among
+    themselves.
+    """
+
+    def __init__(self, analyzer: Optional[ProductDuplicateAnalyzer] = None):
+        self.analyzer = analyzer or ProductDuplicateAnalyzer('')
+        self.records: List[dict] = []
+        self.sources: List[str] = []
+        self.match_counts = defaultdict(int)
+        self.families: Optional[UnionFind] = None
+        self._cluster_sources: Dict[int, Set[str]] = {}
+
+    def add_catalog(self, path: str, products: Optional[List[dict]] = None) -> int:
+        """Add a catalog's products (read from `path` unless given), returning how many were added"""
+        if products is None:
+            products = load_catalog(path)
+        for product in products:
+            record = dict(product)
+            # The enriched catalog identifies products by slug only
+            if not record.get('product_id') and record.get('slug'):
+                record['product_id'] = record['slug']
+            self.records.append(record)
+            self.sources.append(path)
+        print(f"📦 {path}: {len(products)} products")
+        return len(products)
+
+    def _union(self, sets: UnionFind, a: int, b: int, match: str) -> None:
+        self.families.union(a, b)
+        root_a, root_b = sets.find(a), sets.find(b)
+        if sets.union(a, b):
+            self.match_counts[match] += 1
+            merged = self._cluster_sources.pop(root_a) | self._cluster_sources.pop(root_b)
+            self._cluster_sources[sets.find(a)] = merged
+
+    def _shares_catalog(self, sets: UnionFind, a: int, b: int) -> bool:
+        """Whether the clusters of a and b both hold records of one catalog"""
+        root_a, root_b = sets.find(a), sets.find(b)
+        return root_a != root_b and bool(self._cluster_sources[root_a] & self._cluster_sources[root_b])
+
+    @staticmethod
+    def same_product(features1, features2) -> bool:
+        """Whether two similar names describe one product rather than two variants of a line"""
+        if features1.size and features2.size and features1.size != features2.size:
+            return False
+        return features1.clean_normalized.replace(' ', '') == features2.clean_normalized.replace(' ', '')
+
+    @staticmethod
+    def name_subset(features1, features2) -> bool:
+        """Whether one name only adds words to the other"""
+        tokens1, tokens2 = set(features1.tokens), set(features2.tokens)
+        return tokens1 <= tokens2 or tokens2 <= tokens1
+
+    def cluster(self) -> List[List[int]]:
+        """Record positions of every cluster, singletons included"""
+        records = self.records
+        sets = UnionFind(len(records))
+        self.families = UnionFind(len(records))
+        self.match_counts = defaultdict(int)
+        # Catalogs with a record in each cluster, by cluster root
+        self._cluster_sources: Dict[int, Set[str]] = {position: {source} for position, source in enumerate(self.sources)}
+        features = self.analyzer.features_for(records)
+
+        # Same product_id in different catalogs. Within one catalog a repeated id is
+        # an id conflict between different products (FIX_ID_CONFLICT), so only the
+        # first record of an id in each catalog takes part
+        by_id: Dict[str, int] = {}
+        seen_ids: Set[Tuple[str, str]] = set()
+        for position, product_features in enumerate(features):
+            product_id = product_features.product_id
+            if not product_id or (product_id, self.sources[position]) in seen_ids:
+                continue
+            seen_ids.add((product_id, self.sources[position]))
+            if product_id in by_id:
+                self._union(sets, by_id[product_id], position, 'id')
+            else:
+                by_id[product_id] = position
+
+        # Brand of each id group, so brand-less records join their matches' brand
+        group_brand: Dict[int, str] = {}
+        for position, record in enumerate(records):
+            key = brand_key(record.get('brand', ''))
+            if key:
+                group_brand.setdefault(sets.find(position), key)
+        blocks: Dict[str, List[int]] = defaultdict(list)
+        for position in range(len(records)):
+            key = brand_key(records[position].get('brand', '')) or group_brand.get(sets.find(position), '')
+            blocks[key].append(position)
+
+        for positions in blocks.values():
+            self._cluster_block(sets, positions, features)
+
+        return sets.groups()
+
+    def _cluster_block(self, sets: UnionFind, positions: List[int], features: List) -> None:
+        """Exact and similar name matches among one brand's records"""
+        analyzer = self.analyzer
+        block_features = [features[position] for position in positions]
+
+        by_name: Dict[str, int] = {}
+        for position, product_features in zip(positions, block_features):
+            normalized = product_features.normalized
+            if normalized:
+                if normalized in by_name:
+                    self._union(sets, by_name[normalized], position, 'exact')
+                else:
+                    by_name[normalized] = position
+
+        descriptions = ([self.records[position].get('description', '') or '' for position in positions]
+                        if analyzer.use_descriptions else None)
+        for i, j, _ in analyzer.similar_name_pairs(block_features, analyzer.similar_threshold,
+                                                   analyzer.similar_method, descriptions):
+            # Distinct entries of one catalog are distinct products, so a similar name
+            # never merges clusters that both have a record from the same catalog
+            if (self.same_product(block_features[i], block_features[j])
+                    and not self._shares_catalog(sets, positions[i], positions[j])):
+                self._union(sets, positions[i], positions[j], 'similar')
+            elif self.families.union(positions[i], positions[j]):
+                kind = 'subset' if self.name_subset(block_features[i], block_features[j]) else 'variant'
+                self.match_counts[kind] += 1
+
+    def canonical_record(self, members: List[int]) -> dict:
+        """The most complete member, with fields it lacks filled from the others in completeness order
+
+        Ties go to the catalog added first.
+        """
+        ranked = sorted(members, key=lambda position: -self.analyzer.calculate_completeness_score(self.records[position]))
+        canonical = dict(self.records[ranked[0]])
+        for position in ranked[1:]:
+            for field, value in self.records[position].items():
+                if value and not canonical.get(field):
+                    canonical[field] = value
+
+        canonical['cluster'] = {
+            'size': len(members),
+            'members': [
+                {
+                    'source': self.sources[position],
+                    'product_id': self.records[position].get('product_id', ''),
+                    'name': self.records[position].get('name', ''),
+                    'brand': self.records[position].get('brand', ''),
+                }
+                for position in members
+            ],
+        }
+        return canonical
+
+    def build(self) -> Dict:
+        """Cluster every added record and return the canonical catalog with summary counts"""
+        started_at = time.perf_counter()
+        clusters = self.cluster()
+        canonical = [self.canonical_record(members) for members in clusters]
+
+        # Clusters linked by variant matches, listed by canonical product_id for review
+        family_clusters: Dict[int, List[int]] = defaultdict(list)
+        for index, members in enumerate(clusters):
+            family_clusters[self.families.find(members[0])].append(index)
+        review_families = [[canonical[index].get('product_id', '') or canonical[index].get('name', '')
+                            for index in indexes]
+                           for indexes in family_clusters.values() if len(indexes) > 1]
+        seconds = time.perf_counter() - started_at
+
+        return {
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'sources': sorted(set(self.sources), key=self.sources.index),
+            'total_records': len(self.records),
+            'total_clusters': len(clusters),
+            'duplicate_clusters': sum(1 for members in clusters if len(members) > 1),
+            'matches': dict(self.match_counts),
+            'seconds': round(seconds, 3),
+            'review_families': review_families,
+            'products': canonical,
+        }
+
+
+def main():
+    """Cluster duplicates across catalogs and write the canonical catalog"""
+    parser = argparse.ArgumentParser(description="Merge duplicate products across catalog files")
+    parser.add_argument('catalogs', nargs='+',
+                        help="Catalog JSON files ({\"products\": [...]} or a list), most trusted first")
+    parser.add_argument('--output', default='duplicate_clusters.json', help="Canonical catalog output")
+    parser.add_argument('--method', choices=['lsh', 'all-pairs'], default='lsh',
+                        help="Candidate generation for similar names")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Similarity at which names count as the same product (default: 0.85)")
+    args = parser.parse_args()
+
+    clusterer = DuplicateClusterer(ProductDuplicateAnalyzer('', similar_method=args.method,
+                                                            similar_threshold=args.threshold))
+    for path in args.catalogs:
+        clusterer.add_catalog(path)
+
+    print("🔗 Clustering duplicates...")
+    result = clusterer.build()
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ {result['total_records']} records → {result['total_clusters']} products "
+          f"({result['duplicate_clusters']} merged groups) in {result['seconds']}s")
+    print(f"   Matches: {', '.join(f'{match} {count}' for match, count in sorted(result['matches'].items())) or 'none'}")
+    print(f"👁️ {len(result['review_families'])} families of variants to review")
+    print(f"📄 Canonical catalog saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
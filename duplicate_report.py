@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Duplicate analysis results and renderers
+The analyzer builds one AnalysisResult; the text report, detailed JSON and
+JSONL pair stream are all rendered from it without re-running detection
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, IO, List
+
+ACTION_DESCRIPTIONS = {
+    'REMOVE_PRODUCT1': '❌ Remove first product',
+    'REMOVE_PRODUCT2': '❌ Remove second product',
+    'MERGE_OR_REMOVE': '🔄 Merge or remove duplicate',
+    'KEEP_BOTH': '✅ Keep both (different variants)',
+    'FIX_ID_CONFLICT': '🔧 Fix ID conflict',
+    'REVIEW_NEEDED': '👁️ Manual review needed'
+}
+
+
+@dataclass
+class DuplicatePair:
+    """Two products flagged by one detector ('exact', 'similar', 'id_conflicts' or 'content')"""
+    type: str
+    product1: dict
+    product2: dict
+    reason: str
+
+
+@dataclass
+class BrandAnalysis:
+    """Everything found for one brand, with the cleanup estimate computed once"""
+    brand: str
+    product_count: int
+    exact: List[DuplicatePair]
+    similar: List[DuplicatePair]
+    id_conflicts: List[DuplicatePair]
+    content: List[DuplicatePair]
+    recommendations: List[Dict]
+    estimated_after: int = field(init=False)
+
+    def __post_init__(self):
+        # Removals count fully, merge-or-remove pairs are expected to go half the time
+        removals = sum(1 for rec in self.recommendations if rec['action'] in ('REMOVE_PRODUCT1', 'REMOVE_PRODUCT2'))
+        partial_removals = sum(0.5 for rec in self.recommendations if rec['action'] == 'MERGE_OR_REMOVE')
+        self.estimated_after = max(self.product_count - removals - int(partial_removals), 0)
+
+    @property
+    def pairs(self) -> List[DuplicatePair]:
+        return self.exact + self.similar + self.id_conflicts + self.content
+
+    @property
+    def duplicates_found(self) -> int:
+        return len(self.exact) + len(self.similar) + len(self.id_conflicts) + len(self.content)
+
+
+@dataclass
+class AnalysisResult:
+    """Duplicate analysis of the target brands of one catalog"""
+    analysis_timestamp: str
+    total_products: int
+    target_brands: List[str]
+    brand_counts: Dict[str, int]
+    brands: Dict[str, BrandAnalysis]
+
+    @property
+    def total_current(self) -> int:
+        return sum(self.brand_counts.get(brand, 0) for brand in self.target_brands)
+
+    @property
+    def total_after(self) -> int:
+        return sum(self.brands[brand].estimated_after for brand in self.target_brands if brand in self.brands)
+
+
+def render_text_report(result: AnalysisResult) -> str:
+    """Human-readable report: per-brand findings, summary and cleanup actions"""
+    report = []
+    report.append("PRODUCT DUPLICATE ANALYSIS REPORT")
+    report.append("=" * 50)
+    report.append("")
+
+    for brand in result.target_brands:
+        analysis = result.brands.get(brand)
+        if analysis is None:
+            continue
+
+        report.append(f"{brand.upper()} DUPLICATES ({analysis.product_count} products):")
+        report.append("-" * 40)
+
+        if not analysis.duplicates_found:
+            report.append("No duplicates found.")
+        else:
+            for title, pairs in [("EXACT DUPLICATES", analysis.exact), ("SIMILAR DUPLICATES", analysis.similar),
+                                 ("ID CONFLICTS", analysis.id_conflicts), ("CONTENT DUPLICATES", analysis.content)]:
+                if pairs:
+                    report.append(f"\n{title}:")
+                    for pair in pairs:
+                        report.append(f"  • {pair.product1.get('name', 'N/A')} vs {pair.product2.get('name', 'N/A')}")
+                        report.append(f"    Reason: {pair.reason}")
+
+            report.append("\nRECOMMENDATIONS:")
+            for rec in analysis.recommendations:
+                action_desc = ACTION_DESCRIPTIONS.get(rec['action'], rec['action'])
+                report.append(f"  • {rec['product1']['name']} vs {rec['product2']['name']}")
+                report.append(f"    Action: {action_desc}")
+                if rec.get('reason_detail'):
+                    report.append(f"    Detail: {rec['reason_detail']}")
+
+        report.append(f"\nEstimated count after cleanup: {analysis.estimated_after}")
+        report.append("")
+
+    # Summary
+    report.append("SUMMARY:")
+    report.append("-" * 20)
+    for brand in result.target_brands:
+        current = result.brand_counts.get(brand, 0)
+        estimated_after = result.brands[brand].estimated_after if brand in result.brands else current
+        report.append(f"• {brand}: {current} → {estimated_after}")
+
+    report.append(f"\nTotal: {result.total_current} → ~{result.total_after}")
+    report.append(f"Expected reduction: ~{result.total_current - result.total_after} products")
+
+    # Detailed recommendations section
+    report.append("\n" + "="*50)
+    report.append("DETAILED RECOMMENDATIONS FOR CLEANUP:")
+    report.append("="*50)
+
+    for brand in result.target_brands:
+        if brand in result.brands and result.brands[brand].recommendations:
+            report.append(f"\n{brand.upper()} CLEANUP ACTIONS:")
+            report.append("-" * 30)
+
+            for i, rec in enumerate(result.brands[brand].recommendations, 1):
+                report.append(f"\n{i}. DUPLICATE PAIR:")
+                report.append(f"   Product A: {rec['product1']['name']} (ID: {rec['product1']['id']})")
+                report.append(f"   Product B: {rec['product2']['name']} (ID: {rec['product2']['id']})")
+                report.append(f"   Issue: {rec['reason']}")
+                report.append(f"   Recommended Action: {rec['action']}")
+                if rec.get('reason_detail'):
+                    report.append(f"   Details: {rec['reason_detail']}")
+
+    return "\n".join(report)
+
+
+def render_detailed_json(result: AnalysisResult) -> Dict:
+    """Per-brand counts and recommendations for further processing"""
+    return {
+        'analysis_timestamp': result.analysis_timestamp,
+        'total_products': result.total_products,
+        'brands': {
+            brand: {
+                'current_count': analysis.product_count,
+                'duplicates_found': analysis.duplicates_found,
+                'recommendations': analysis.recommendations
+            }
+            for brand, analysis in result.brands.items()
+        }
+    }
+
+
+def write_pairs_jsonl(result: AnalysisResult, stream: IO[str]) -> int:
+    """Write one JSON line per recommendation (a flagged pair with its action), returning the count"""
+    written = 0
+    for brand, analysis in result.brands.items():
+        for rec in analysis.recommendations:
+            stream.write(json.dumps({'brand': brand, **rec}, ensure_ascii=False) + '\n')
+            written += 1
+    return written
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Persistent conditional HTTP cache for the NK Beauty scrapers
+Stores response bodies on disk keyed by URL together with their ETag and
+Last-Modified validators, so re-crawls only transfer pages that changed
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Write bytes to path via a temporary file so readers never see a partial file"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        # mkstemp creates 0600 files; keep outputs readable like a plain open() would
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class HTTPCache:
+    """On-disk response cache speaking HTTP conditional requests
+
+    Each URL maps to a `<sha256>.json` metadata file and a `<sha256>.body`
+    file. Fetchers call `conditional_headers` before a request and `update`
+    after it; a 304 answer is then served from disk. In offline mode every
+    request is answered from disk and nothing touches the network.
+    """
+
+    def __init__(self, cache_dir: str = 'theraderm_data/http_cache', offline: bool = False):
+        self.cache_dir = cache_dir
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+
+    def load_meta(self, url: str) -> Optional[Dict]:
+        """Return the stored metadata for a URL, if any"""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_body(self, url: str) -> Optional[bytes]:
+        """Return the stored body for a URL, if any"""
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def get(self, url: str) -> Optional[Tuple[int, bytes]]:
+        """Serve a URL straight from disk (used in offline mode)"""
+        if self.load_meta(url) is None:
+            self.misses += 1
+            return None
+        body = self.load_body(url)
+        if body is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return 200, body
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers from the stored validators"""
+        meta = self.load_meta(url)
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def update(self, url: str, status: int, headers, body: bytes) -> Tuple[int, bytes]:
+        """Record a network response and return the effective (status, body)
+
+        A 304 is turned into a 200 with the cached body; a 200 replaces the
+        cache entry. Other statuses are passed through untouched.
+        """
+        if status == 304:
+            cached = self.load_body(url)
+            if cached is not None:
+                self.hits += 1
+                self.revalidated += 1
+                return 200, cached
+            # Validators without a body - nothing to serve
+            self.misses += 1
+            return status, body
+
+        self.misses += 1
+        if status == 200:
+            self.store(url, headers, body)
+        return status, body
+
+    def store(self, url: str, headers, body: bytes) -> None:
+        """Persist a 200 response body and its validators"""
+        meta_path, body_path = self._paths(url)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_type': headers.get('Content-Type'),
+            'size': len(body),
+            'fetched_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        atomic_write(body_path, body)
+        atomic_write(meta_path, json.dumps(meta, ensure_ascii=False, indent=2).encode('utf-8'))
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Perceptual-hash image deduplication for the site's product images
+Hashes every image in public/products in a process pool (aHash, dHash,
+pHash), caches the hashes by path, size and mtime, groups near-identical
+images through a BK-tree and reports which products reference each group,
+plus the files no product references at all
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from PIL import Image, ImageChops, UnidentifiedImageError
+
+from catalog_reader import IMAGE_EXTENSIONS, IMAGE_FIELDS, image_names, iter_catalog
+from dedup_utils import UnionFind
+from http_cache import atomic_write
+
+# Bump whenever hashing changes so cached hashes are recomputed
+HASH_VERSION = 1
+
+HASH_SIZE = 8
+# Grayscale thumbnail compared pixel by pixel to confirm hash matches
+THUMBNAIL_SIZE = 64
+# A pixel counts as changed beyond this difference (of 255)
+PIXEL_TOLERANCE = 24
+_DCT_SIZE = 32
+# cos(pi * (2n + 1) * k / 2N) for the HASH_SIZE lowest frequencies of a 32-point DCT-II
+_DCT = [[math.cos(math.pi * (2 * n + 1) * k / (2 * _DCT_SIZE)) for n in range(_DCT_SIZE)] for k in range(HASH_SIZE)]
+
+
+def _grayscale(img: Image.Image) -> Image.Image:
+    """Luminance of an image, with transparent areas laid on white like the site shows them"""
+    if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info:
+        rgba = img.convert('RGBA')
+        background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+        background.alpha_composite(rgba)
+        img = background
+    return img.convert('L')
+
+
+def _bits(values, threshold) -> int:
+    result = 0
+    for value in values:
+        result = (result << 1) | (value > threshold)
+    return result
+
+
+def average_hash(gray: Image.Image) -> int:
+    pixels = gray.resize((HASH_SIZE, HASH_SIZE), Image.BOX).tobytes()
+    return _bits(pixels, sum(pixels) / len(pixels))
+
+
+def difference_hash(gray: Image.Image) -> int:
+    pixels = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.BOX).tobytes()
+    width = HASH_SIZE + 1
+    result = 0
+    for y in range(HASH_SIZE):
+        row = pixels[y * width:(y + 1) * width]
+        for x in range(HASH_SIZE):
+            result = (result << 1) | (row[x] > row[x + 1])
+    return result
+
+
+def perceptual_hash(gray: Image.Image) -> int:
+    """pHash: lowest 8x8 DCT frequencies of a 32x32 thumbnail against their median"""
+    pixels = gray.resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS).tobytes()
+    rows = [pixels[y * _DCT_SIZE:(y + 1) * _DCT_SIZE] for y in range(_DCT_SIZE)]
+    # Separable 2D DCT, keeping only the low frequencies
+    row_dct = [[sum(p * c for p, c in zip(row, basis)) for basis in _DCT] for row in rows]
+    coefficients = [sum(_DCT[u][y] * row_dct[y][v] for y in range(_DCT_SIZE))
+                    for u in range(HASH_SIZE) for v in range(HASH_SIZE)]
+    median = sorted(coefficients)[len(coefficients) // 2]
+    return _bits(coefficients, median)
+
+
+def hash_image(path: str) -> Dict:
+    """Content digest and perceptual hashes of one image file (runs in a worker process)"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    entry = {'sha1': hashlib.sha1(content).hexdigest()}
+    with Image.open(path) as img:
+        width, height = img.size
+        # JPEG decoding can downscale on the fly; 1/8 scale shifts thumbnail pixels, 1/4 does not
+        img.draft('RGB', (4 * THUMBNAIL_SIZE, 4 * THUMBNAIL_SIZE))
+        gray = _grayscale(img)
+    entry.update({
+        'width': width,
+        'height': height,
+        'ahash': f"{average_hash(gray):016x}",
+        'dhash': f"{difference_hash(gray):016x}",
+        'phash': f"{perceptual_hash(gray):016x}",
+        'thumbnail': base64.b64encode(gray.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.BOX).tobytes()).decode('ascii'),
+    })
+    return entry
+
+
+def try_hash_image(path: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """(hashes, None), or (None, error) for a truncated or unreadable file (runs in a worker process)"""
+    try:
+        return hash_image(path), None
+    except (OSError, UnidentifiedImageError) as e:
+        return None, str(e) or type(e).__name__
+
+
+def changed_share(thumbnail1: str, thumbnail2: str) -> float:
+    """Share of thumbnail pixels differing by more than PIXEL_TOLERANCE"""
+    size = (THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+    images = [Image.frombytes('L', size, base64.b64decode(thumbnail)) for thumbnail in (thumbnail1, thumbnail2)]
+    histogram = ImageChops.difference(*images).histogram()
+    return sum(histogram[PIXEL_TOLERANCE + 1:]) / (THUMBNAIL_SIZE * THUMBNAIL_SIZE)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes with Hamming distance
+
+    Every child edge is labelled with its distance to the parent, so a
+    search within radius r only descends edges labelled d - r .. d + r.
+    """
+
+    def __init__(self):
+        self.root: Optional[list] = None
+
+    def add(self, key, value: int) -> None:
+        node = [value, [key], {}]
+        if self.root is None:
+            self.root = node
+            return
+        current = self.root
+        while True:
+            distance = hamming_distance(value, current[0])
+            if distance == 0:
+                current[1].append(key)
+                return
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, value: int, radius: int) -> Iterator[Tuple[object, int]]:
+        """(key, distance) of every stored hash within `radius` bits"""
+        if self.root is None:
+            return
+        stack = [self.root]
+        while stack:
+            node_value, keys, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= radius:
+                for key in keys:
+                    yield key, distance
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+
+
+class ImageHashCache:
+    """Hashes by image path, reused while the file's size and mtime are unchanged"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.hits = 0
+        self.misses = 0
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == HASH_VERSION:
+                    self.entries = data.get('images', {})
+            except (OSError, ValueError):
+                pass
+
+    def get(self, path: str, stat: os.stat_result) -> Optional[Dict]:
+        entry = self.entries.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, path: str, stat: os.stat_result, entry: Dict) -> Dict:
+        entry = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        self.entries[path] = entry
+        return entry
+
+    def save(self, keep: List[str]) -> None:
+        """Write the cache, dropping images that no longer exist"""
+        if not self.path:
+            return
+        images = {path: self.entries[path] for path in sorted(keep) if path in self.entries}
+        atomic_write(self.path, json.dumps({'version': HASH_VERSION, 'images': images},
+                                           separators=(',', ':')).encode('utf-8'))
+
+
+class ImageDeduplicator:
+    """Finds byte-identical and near-identical images in one directory
+
+    Candidates come from a BK-tree over pHash: images whose pHash and dHash
+    both lie within `max_distance` bits. Packshots of one product line
+    (same bottle, different label) hash within a few bits of each other, so
+    a candidate only counts as a duplicate when at most `max_changed` of
+    its thumbnail pixels differ. Re-encoded or resized copies differ in
+    none; different labels change around 1%.
+    """
+
+    def __init__(self, images_dir: str = 'public/products', cache_path: Optional[str] = None,
+                 max_distance: int = 6, max_changed: float = 0.002, workers: Optional[int] = None):
+        self.images_dir = images_dir
+        self.cache = ImageHashCache(cache_path)
+        self.max_distance = max_distance
+        self.max_changed = max_changed
+        self.workers = workers
+        self.candidates = 0
+        self.hashes: Dict[str, Dict] = {}
+        # Images that could not be read, with the error; retried on the next run
+        self.failed: Dict[str, str] = {}
+
+    def image_files(self) -> List[str]:
+        return sorted(name for name in os.listdir(self.images_dir)
+                      if name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith('.'))
+
+    def hash_all(self) -> Dict[str, Dict]:
+        """Hashes of every image, computing only those missing from the cache in a process pool"""
+        names = self.image_files()
+        stats = {name: os.stat(os.path.join(self.images_dir, name)) for name in names}
+        pending = []
+        for name in names:
+            entry = self.cache.get(name, stats[name])
+            if entry is None:
+                pending.append(name)
+            else:
+                self.hashes[name] = entry
+
+        try:
+            if pending:
+                print(f"🖼️ Hashing {len(pending)} images ({len(names) - len(pending)} cached)...")
+                paths = [os.path.join(self.images_dir, name) for name in pending]
+                if self.workers == 1:
+                    self._store(pending, stats, map(try_hash_image, paths))
+                else:
+                    with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                        self._store(pending, stats, pool.map(try_hash_image, paths, chunksize=8))
+        finally:
+            # Hashes computed so far are kept even if the run is interrupted
+            self.cache.save(names)
+        return self.hashes
+
+    def _store(self, names: List[str], stats: Dict, results) -> None:
+        for name, (entry, error) in zip(names, results):
+            if entry is None:
+                print(f"⚠️ Could not hash {name}: {error}")
+                self.failed[name] = error
+                continue
+            self.hashes[name] = self.cache.put(name, stats[name], entry)
+
+    def groups(self) -> List[List[str]]:
+        """Images of every group of two or more byte-identical or near-identical images"""
+        names = sorted(self.hashes)
+        positions = {name: position for position, name in enumerate(names)}
+        sets = UnionFind(len(names))
+
+        by_digest: Dict[str, int] = {}
+        tree = BKTree()
+        self.candidates = 0
+        for name in names:
+            entry = self.hashes[name]
+            position = positions[name]
+            if entry['sha1'] in by_digest:
+                sets.union(by_digest[entry['sha1']], position)
+                continue
+            by_digest[entry['sha1']] = position
+
+            dhash = int(entry['dhash'], 16)
+            for other, _ in tree.search(int(entry['phash'], 16), self.max_distance):
+                other_entry = self.hashes[other]
+                if hamming_distance(dhash, int(other_entry['dhash'], 16)) > self.max_distance:
+                    continue
+                self.candidates += 1
+                if changed_share(entry['thumbnail'], other_entry['thumbnail']) <= self.max_changed:
+                    sets.union(positions[other], position)
+            tree.add(name, int(entry['phash'], 16))
+
+        return [[names[position] for position in group] for group in sets.groups() if len(group) > 1]
+
+
+def image_references(catalog_paths: List[str]) -> Dict[str, List[str]]:
+    """Products referencing each image file name, from the image fields of the given catalogs"""
+    references: Dict[str, List[str]] = {}
+    for path in catalog_paths:
+        for product in iter_catalog(path, ('slug', 'product_id', 'name') + IMAGE_FIELDS):
+            product_id = product.get('slug') or product.get('product_id') or product.get('name', '')
+            for name in image_names(product):
+                products = references.setdefault(name, [])
+                if product_id not in products:
+                    products.append(product_id)
+    return references
+
+
+def build_report(deduplicator: ImageDeduplicator, references: Dict[str, List[str]]) -> Dict:
+    """Duplicate image groups with the image to keep, the bytes the others take and who uses them
+
+    With references, images no product uses and references to missing
+    files are listed too.
+    """
+    groups = []
+    for names in deduplicator.groups():
+        entries = [deduplicator.hashes[name] for name in names]
+        # Keep the largest rendition, the first name on ties
+        keep = max(range(len(names)), key=lambda i: (entries[i]['width'] * entries[i]['height'], -i))
+        groups.append({
+            'keep': names[keep],
+            'identical': len({entry['sha1'] for entry in entries}) == 1,
+            'redundant_bytes': sum(entry['size'] for i, entry in enumerate(entries) if i != keep),
+            'images': [
+                {
+                    'file': name,
+                    'bytes': entry['size'],
+                    'size': f"{entry['width']}x{entry['height']}",
+                    'products': references.get(name, []),
+                }
+                for name, entry in zip(names, entries)
+            ],
+        })
+    groups.sort(key=lambda group: -group['redundant_bytes'])
+
+    unreferenced = []
+    missing = []
+    if references:
+        unreferenced = [{'file': name, 'bytes': entry['size']} for name, entry in sorted(deduplicator.hashes.items())
+                        if name not in references]
+        missing = [{'file': name, 'products': products} for name, products in sorted(references.items())
+                   if name not in deduplicator.hashes and name not in deduplicator.failed]
+
+    return {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'images_dir': deduplicator.images_dir,
+        'total_images': len(deduplicator.hashes),
+        'total_bytes': sum(entry['size'] for entry in deduplicator.hashes.values()),
+        'max_distance': deduplicator.max_distance,
+        'max_changed': deduplicator.max_changed,
+        'candidate_pairs': deduplicator.candidates,
+        'duplicate_groups': len(groups),
+        'redundant_images': sum(len(group['images']) - 1 for group in groups),
+        'redundant_bytes': sum(group['redundant_bytes'] for group in groups),
+        'unreferenced_images': len(unreferenced),
+        'unreferenced_bytes': sum(image['bytes'] for image in unreferenced),
+        'unreadable_images': len(deduplicator.failed),
+        'groups': groups,
+        'unreferenced': unreferenced,
+        'missing': missing,
+        'unreadable': [{'file': name, 'error': error, 'products': references.get(name, [])}
+                       for name, error in sorted(deduplicator.failed.items())],
+    }
+
+
+def main():
+    """Hash the product images and report duplicate groups"""
+    parser = argparse.ArgumentParser(description="Find duplicate product images")
+    parser.add_argument('--images', default='public/products', help="Image directory")
+    parser.add_argument('--catalog', nargs='*', default=['src/data/products.enriched.json'],
+                        help="Catalogs whose image/gallery/image_paths fields reference the images")
+    parser.add_argument('--cache', default='image_hash_cache.json', help="Hash cache file ('' disables)")
+    parser.add_argument('--max-distance', type=int, default=6,
+                        help="Max pHash and dHash bits apart for candidate pairs")
+    parser.add_argument('--max-changed', type=float, default=0.002,
+                        help="Max share of changed thumbnail pixels for a candidate to count as a duplicate")
+    parser.add_argument('--workers', type=int, default=None, help="Hashing processes (1 hashes in this process)")
+    parser.add_argument('--output', default='image_duplicates.json', help="Report output")
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    deduplicator = ImageDeduplicator(args.images, args.cache or None, args.max_distance, args.max_changed,
+                                     args.workers)
+    deduplicator.hash_all()
+    report = build_report(deduplicator, image_references(args.catalog))
+    report['seconds'] = round(time.perf_counter() - started_at, 3)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"✅ {report['total_images']} images, {report['duplicate_groups']} duplicate groups, "
+          f"{report['redundant_images']} redundant images ({report['redundant_bytes'] / 1024 / 1024:.1f} MB) "
+          f"in {report['seconds']}s")
+    print(f"   {report['candidate_pairs']} hash candidates checked pixel by pixel")
+    print(f"   Hash cache: {deduplicator.cache.hits} hits, {deduplicator.cache.misses} misses")
+    for image in report['unreadable']:
+        print(f"  ⚠️ Unreadable {image['file']}: {image['error']}")
+    for group in report['groups'][:10]:
+        products = sorted({product for image in group['images'] for product in image['products']})
+        print(f"  • keep {group['keep']}: {len(group['images']) - 1} redundant "
+              f"({group['redundant_bytes'] / 1024:.0f} KB), used by {', '.join(products) or 'no product'}")
+    if args.catalog:
+        print(f"🗑️ {report['unreferenced_images']} images no product references "
+              f"({report['unreferenced_bytes'] / 1024 / 1024:.1f} MB)")
+        for image in report['missing']:
+            print(f"  ⚠️ Missing {image['file']} (used by {', '.join(image['products'])})")
+    print(f"📄 Report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
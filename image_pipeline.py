@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Image processing stage for the NK Beauty scrapers
+Worker-process functions that decode images straight from memory, encode
+the JPEG master plus resized WebP/AVIF derivatives and write each output
+file exactly once
+"""
+
+import io
+import time
+from typing import Dict, List, Optional
+
+from PIL import Image, features
+
+from http_cache import atomic_write
+
+# Images smaller than this in either dimension are tracking pixels or spacers
+MIN_DIMENSION = 16
+
+DERIVATIVE_WIDTHS = (320, 640, 1024)
+
+# Pillow save() arguments per derivative format
+DERIVATIVE_OPTIONS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+    'avif': {'format': 'AVIF', 'quality': 60},
+}
+
+
+def sniff_image_format(content: bytes) -> Optional[str]:
+    """Identify an image payload from its magic bytes, None for anything else"""
+    if not content:
+        return None
+    if content.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if content.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if content[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if content[:4] == b'RIFF' and content[8:12] == b'WEBP':
+        return 'webp'
+    if content[4:8] == b'ftyp' and content[8:12] in (b'avif', b'avis'):
+        return 'avif'
+    return None
+
+
+def available_derivative_formats() -> List[str]:
+    """Derivative formats this Pillow build can encode"""
+    return [fmt for fmt in DERIVATIVE_OPTIONS if features.check(fmt)]
+
+
+def derivative_widths(source_width: int, widths=DERIVATIVE_WIDTHS) -> List[int]:
+    """Target widths for a source image, never upscaling"""
+    targets = [width for width in widths if width <= source_width]
+    return targets or [source_width]
+
+
+def _flatten(img: Image.Image) -> Image.Image:
+    """RGB(A) copy of an image with EXIF/ICC/text metadata left behind"""
+    mode = 'RGBA' if img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info else 'RGB'
+    flat = img.convert(mode)
+    flat.info = {}
+    return flat
+
+
+def write_variants(img: Image.Image, base_path: str, formats: List[str],
+                   widths=DERIVATIVE_WIDTHS) -> Dict[str, Dict[int, str]]:
+    """Write resized, metadata-free variants as `{base_path}-{width}.{format}`"""
+    flat = _flatten(img)
+    variants: Dict[str, Dict[int, str]] = {fmt: {} for fmt in formats}
+
+    for width in derivative_widths(flat.width, widths):
+        height = max(1, round(flat.height * width / flat.width))
+        resized = flat if width == flat.width else flat.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            output = io.BytesIO()
+            resized.save(output, **DERIVATIVE_OPTIONS[fmt])
+            path = f"{base_path}-{width}.{fmt}"
+            atomic_write(path, output.getvalue())
+            variants[fmt][width] = path
+
+    return variants
+
+
+def process_image(content: bytes, base_path: str, formats: List[str],
+                  widths=DERIVATIVE_WIDTHS, quality: int = 95) -> Dict:
+    """Validate image bytes and write the JPEG master plus derivatives (runs in a worker process)
+
+    Raises ValueError for payloads that are not usable product images.
+    """
+    started_at = time.perf_counter()
+    if sniff_image_format(content) is None:
+        raise ValueError("not an image payload")
+
+    with Image.open(io.BytesIO(content)) as img:
+        img.load()
+        width, height = img.size
+        if width < MIN_DIMENSION or height < MIN_DIMENSION:
+            raise ValueError(f"image too small ({width}x{height})")
+
+        jpeg_path = f"{base_path}.jpg"
+        if img.format == 'JPEG':
+            atomic_write(jpeg_path, content)
+        else:
+            output = io.BytesIO()
+            img.convert('RGB').save(output, 'JPEG', quality=quality)
+            atomic_write(jpeg_path, output.getvalue())
+        derivatives = write_variants(img, base_path, formats, widths)
+
+    return {
+        'path': jpeg_path,
+        'width': width,
+        'height': height,
+        'bytes': len(content),
+        'derivatives': {fmt: {str(w): path for w, path in sizes.items()} for fmt, sizes in derivatives.items()},
+        'seconds': time.perf_counter() - started_at,
+    }
+
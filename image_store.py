@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Content-addressed image store for the NK Beauty scrapers
+Stores every image once under its SHA-256, records which products use it
+and generates resized WebP/AVIF derivatives in worker processes
+"""
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from http_cache import atomic_write
+from image_pipeline import DERIVATIVE_WIDTHS, available_derivative_formats, process_image, sniff_image_format
+
+
+class ImageStore:
+    """Image objects named by content hash plus a product manifest
+
+    Layout under `root`:
+        objects/<sha256>.jpg              JPEG master
+        objects/<sha256>-<width>.<fmt>    derivatives (webp, avif)
+        manifest.json                     {"products": {product_id: [sha256, ...]},
+                                           "images": {sha256: {...metadata}}}
+
+    `add` returns as soon as the bytes are hashed; decoding and encoding run
+    in a process pool. Identical bytes are processed once no matter how many
+    products reference them. Zero-byte, non-image and tracking-pixel
+    payloads are rejected. Call `close` to wait for pending work.
+
+    Pass `executor` to share one pool between several stores; it is then
+    left running on `close`.
+    """
+
+    def __init__(self, root: str = 'theraderm_images', max_workers: Optional[int] = None,
+                 widths=DERIVATIVE_WIDTHS, formats: Optional[List[str]] = None, telemetry=None,
+                 executor=None):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        self.max_workers = max_workers
+        self.widths = widths
+        self.formats = available_derivative_formats() if formats is None else formats
+        self.telemetry = telemetry
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        manifest = self._load_manifest()
+        self.products: Dict[str, List[str]] = manifest.get('products', {})
+        self.images: Dict[str, Dict] = manifest.get('images', {})
+
+        self.failed: Set[str] = set()
+        self.rejected = 0
+        self.skipped = 0
+        self.written = 0
+        self._pending: Set[str] = set()
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._futures = set()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, f"{digest}.jpg")
+
+    def _link(self, product_id: str, digest: str) -> None:
+        digests = self.products.setdefault(product_id, [])
+        if digest not in digests:
+            digests.append(digest)
+
+    def add(self, product_id: str, content: bytes, source_url: str = '') -> Optional[str]:
+        """Store image bytes for a product, returning the JPEG master path or None if rejected"""
+        if sniff_image_format(content) is None:
+            self.rejected += 1
+            print(f"Rejected image {source_url or product_id}: "
+                  f"{'empty payload' if not content else 'not an image'}")
+            return None
+
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.object_path(digest)
+
+        with self._lock:
+            self._link(product_id, digest)
+            if digest in self._pending or (digest in self.images and os.path.exists(path)):
+                self.skipped += 1
+                return path
+            self._pending.add(digest)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+        future = self._executor.submit(
+            process_image, content, os.path.join(self.objects_dir, digest), self.formats, self.widths
+        )
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(lambda f: self._finish(f, digest, source_url))
+        return path
+
+    def _finish(self, future, digest: str, source_url: str) -> None:
+        with self._lock:
+            self._futures.discard(future)
+            self._idle.notify_all()
+            self._pending.discard(digest)
+            try:
+                metadata = future.result()
+            except Exception as e:
+                print(f"Rejected image {source_url or digest}: {e}")
+                self.rejected += 1
+                self.failed.add(self.object_path(digest))
+                for digests in self.products.values():
+                    if digest in digests:
+                        digests.remove(digest)
+                return
+            seconds = metadata.pop('seconds')
+            metadata['source_url'] = source_url
+            self.images[digest] = metadata
+            self.written += 1
+
+        if self.telemetry is not None:
+            self.telemetry.observe('image_ms', seconds * 1000)
+            self.telemetry.event('image', url=source_url, sha256=digest, image_ms=round(seconds * 1000, 3))
+
+    def close(self) -> Set[str]:
+        """Wait for pending images, persist the manifest and return the master paths that failed"""
+        if self._owns_executor:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        else:
+            # Futures leave the set in their done callback, once their metadata is recorded
+            with self._idle:
+                self._idle.wait_for(lambda: not self._futures)
+
+        with self._lock:
+            manifest = {
+                'products': {pid: digests for pid, digests in self.products.items() if digests},
+                'images': self.images,
+            }
+            atomic_write(self.manifest_path,
+                         json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+            return set(self.failed)
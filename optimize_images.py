@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Image build for the site
+Turns the packshots in public/products into resized, metadata-free WebP
+(and, on request, AVIF) variants at fixed breakpoints in a process pool
+(image_pipeline.write_variants) and records each source's hash, dimensions
+and variant paths in a manifest, so a rebuild only re-encodes the sources
+that are new or changed. Also writes src/data/product-images.json, the
+table src/components/ProductImage.tsx uses to serve the variants
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from catalog_reader import IMAGE_EXTENSIONS
+from catalog_stats import file_digest
+from http_cache import atomic_write
+from image_pipeline import DERIVATIVE_OPTIONS, DERIVATIVE_WIDTHS, available_derivative_formats, write_variants
+
+# Bump whenever variant encoding changes so every source is rebuilt
+BUILD_VERSION = 1
+
+DEFAULT_SOURCE_DIR = 'public/products'
+DEFAULT_OUTPUT_DIR = 'public/optimized/products'
+DEFAULT_TABLE = 'src/data/product-images.json'
+PUBLIC_DIR = 'public'
+MANIFEST_NAME = 'manifest.json'
+# Format the site's image loader serves; every current browser decodes it
+SERVED_FORMAT = 'webp'
+# Characters of the source digest in variant names, so changed images get new URLs
+DIGEST_PREFIX = 8
+
+
+def public_url(path: str, public_dir: str = PUBLIC_DIR) -> str:
+    return '/' + os.path.relpath(path, public_dir).replace(os.sep, '/')
+
+
+def render_table(table: Dict) -> bytes:
+    """Loader table as JSON with one image per line: small in the bundle, readable in diffs"""
+    lines = [json.dumps(url) + ': ' + json.dumps(value, separators=(',', ':'))
+             for url, value in table['images'].items()]
+    header = ', '.join(f"{json.dumps(key)}: {json.dumps(value, separators=(',', ':'))}"
+                       for key, value in table.items() if key != 'images')
+    return ('{' + header + ', "images": {\n' + ',\n'.join(lines) + '\n}}\n').encode('utf-8')
+
+
+def build_settings(formats: List[str], widths) -> Dict:
+    """Everything that shapes the variants; a change invalidates the whole manifest"""
+    return {
+        'version': BUILD_VERSION,
+        'formats': list(formats),
+        'widths': list(widths),
+        'options': {fmt: DERIVATIVE_OPTIONS[fmt] for fmt in formats},
+    }
+
+
+def optimize_image(source_path: str, base_path: str, formats: List[str], widths) -> Dict:
+    """Write the variants of one source image (runs in a worker process)"""
+    started_at = time.perf_counter()
+    with Image.open(source_path) as img:
+        img.load()
+        width, height = img.size
+        variants = write_variants(img, base_path, formats, widths)
+    return {
+        'width': width,
+        'height': height,
+        'variants': {fmt: {str(w): path for w, path in sizes.items()} for fmt, sizes in variants.items()},
+        'seconds': time.perf_counter() - started_at,
+    }
+
+
+class ImageBuild:
+    """Incremental variant build of one directory of source images
+
+    Layout under `output_dir`:
+        <stem>-<digest>-<width>.<fmt>    variants (digest: first characters of the source hash)
+        manifest.json                    {"settings": {...},
+                                          "images": {source name: {digest, bytes, width,
+                                                                   height, variants}}}
+
+    Every source is hashed (cheap next to decoding); one whose hash matches
+    its manifest entry and whose variants all exist is not re-encoded.
+    Variants no longer listed in the manifest are deleted after the build.
+    """
+
+    def __init__(self, source_dir: str = DEFAULT_SOURCE_DIR, output_dir: str = DEFAULT_OUTPUT_DIR,
+                 formats: Optional[List[str]] = None, widths=DERIVATIVE_WIDTHS,
+                 max_workers: Optional[int] = None, public_dir: str = PUBLIC_DIR):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.public_dir = public_dir
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.formats = [SERVED_FORMAT] if formats is None else formats
+        self.widths = widths
+        self.max_workers = max_workers
+        self.settings = build_settings(self.formats, widths)
+
+        manifest = self._load_manifest()
+        # Entries built with other settings are stale; their files are cleaned up like any other
+        self.images: Dict[str, Dict] = manifest.get('images', {}) if manifest.get('settings') == self.settings else {}
+
+        self.skipped = 0
+        self.encoded = 0
+        self.failed: List[str] = []
+        self.removed = 0
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def sources(self) -> List[str]:
+        if not os.path.isdir(self.source_dir):
+            return []
+        return sorted(name for name in os.listdir(self.source_dir)
+                      if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+                      and os.path.isfile(os.path.join(self.source_dir, name)))
+
+    def _variant_paths(self, entry: Dict) -> List[str]:
+        return [os.path.join(self.public_dir, url.lstrip('/'))
+                for sizes in entry.get('variants', {}).values() for url in sizes.values()]
+
+    def _is_current(self, entry: Optional[Dict], digest: str) -> bool:
+        return (entry is not None and entry.get('digest') == digest
+                and all(os.path.exists(path) for path in self._variant_paths(entry)))
+
+    def plan(self) -> List[Tuple[str, str, int]]:
+        """(source name, digest, size) of every source that needs encoding; drops entries of deleted sources"""
+        names = self.sources()
+        for name in set(self.images) - set(names):
+            del self.images[name]
+
+        pending = []
+        for name in names:
+            path = os.path.join(self.source_dir, name)
+            digest = file_digest(path)
+            if self._is_current(self.images.get(name), digest):
+                self.skipped += 1
+                continue
+            self.images.pop(name, None)
+            pending.append((name, digest, os.path.getsize(path)))
+        return pending
+
+    def run(self) -> Dict[str, Dict]:
+        """Encode new and changed sources, save the manifest and remove stale variants"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        pending = self.plan()
+
+        if pending:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {}
+                for name, digest, size in pending:
+                    stem = os.path.splitext(name)[0]
+                    base_path = os.path.join(self.output_dir, f"{stem}-{digest[:DIGEST_PREFIX]}")
+                    future = executor.submit(optimize_image, os.path.join(self.source_dir, name),
+                                             base_path, self.formats, self.widths)
+                    futures[future] = (name, digest, size)
+                for future in as_completed(futures):
+                    name, digest, size = futures[future]
+                    try:
+                        metadata = future.result()
+                    except Exception as e:
+                        print(f"⚠️ Could not optimize {name}: {e}")
+                        self.failed.append(name)
+                        continue
+                    metadata.pop('seconds')
+                    metadata['variants'] = {fmt: {width: public_url(path, self.public_dir)
+                                                  for width, path in sizes.items()}
+                                            for fmt, sizes in metadata['variants'].items()}
+                    self.images[name] = dict(digest=digest, bytes=size, **metadata)
+                    self.encoded += 1
+
+        manifest = {'settings': self.settings, 'images': dict(sorted(self.images.items()))}
+        atomic_write(self.manifest_path,
+                     (json.dumps(manifest, indent=2, ensure_ascii=False) + '\n').encode('utf-8'))
+        self._remove_stale()
+        return self.images
+
+    def _remove_stale(self) -> None:
+        keep = {os.path.normpath(path) for entry in self.images.values() for path in self._variant_paths(entry)}
+        keep.add(os.path.normpath(self.manifest_path))
+        for name in os.listdir(self.output_dir):
+            path = os.path.join(self.output_dir, name)
+            if os.path.isfile(path) and os.path.normpath(path) not in keep:
+                os.remove(path)
+                self.removed += 1
+
+    def loader_table(self, source_url_prefix: str = '/products/') -> Dict:
+        """Source URL -> variant URL without '-<width>.<fmt>' for SERVED_FORMAT, or
+        [that URL, widths] for the few sources too narrow for every breakpoint"""
+        images = {}
+        for name, entry in sorted(self.images.items()):
+            sizes = entry['variants'].get(SERVED_FORMAT)
+            if not sizes:
+                continue
+            widths = sorted(int(width) for width in sizes)
+            suffix = f"-{widths[0]}.{SERVED_FORMAT}"
+            base = sizes[str(widths[0])][:-len(suffix)]
+            images[source_url_prefix + name] = base if widths == list(self.widths) else [base, widths]
+        return {'format': SERVED_FORMAT, 'widths': list(self.widths), 'images': images}
+
+    def variant_bytes(self) -> Dict[str, int]:
+        """Total size of the largest variant of every image, per format"""
+        totals = {fmt: 0 for fmt in self.formats}
+        for entry in self.images.values():
+            for fmt, sizes in entry['variants'].items():
+                largest = sizes[str(max(int(width) for width in sizes))]
+                totals[fmt] = totals.get(fmt, 0) + os.path.getsize(os.path.join(self.public_dir, largest.lstrip('/')))
+        return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build resized WebP/AVIF variants of the product images")
+    parser.add_argument('--source', default=DEFAULT_SOURCE_DIR, help="Directory of source images")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help="Directory for the variants and manifest")
+    parser.add_argument('--table', default=DEFAULT_TABLE, help="Variant table for the site's image loader")
+    parser.add_argument('--formats', nargs='+', choices=list(DERIVATIVE_OPTIONS),
+                        help=f"Variant formats (default: {SERVED_FORMAT}, the one the site serves)")
+    parser.add_argument('--widths', nargs='+', type=int, default=list(DERIVATIVE_WIDTHS), help="Breakpoints in pixels")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    unsupported = sorted(set(args.formats or []) - set(available_derivative_formats()))
+    if unsupported:
+        parser.error(f"this Pillow build cannot encode {', '.join(unsupported)}")
+
+    started_at = time.perf_counter()
+    build = ImageBuild(args.source, args.output, args.formats, tuple(sorted(args.widths)), args.workers)
+    print(f"🖼️ Optimizing {args.source} -> {args.output} ({', '.join(build.formats)} at {build.widths})")
+    images = build.run()
+    print(f"✅ {build.encoded} encoded, {build.skipped} unchanged, {len(build.failed)} failed, "
+          f"{build.removed} stale files removed in {time.perf_counter() - started_at:.1f}s")
+
+    source_bytes = sum(entry['bytes'] for entry in images.values())
+    for fmt, size in build.variant_bytes().items():
+        print(f"📦 Largest {fmt} variants: {size / 1024 / 1024:.1f} MB "
+              f"(sources {source_bytes / 1024 / 1024:.1f} MB)")
+
+    atomic_write(args.table, render_table(build.loader_table()))
+    print(f"📄 Loader table saved to: {args.table}")
+
+
+if __name__ == "__main__":
+    main()
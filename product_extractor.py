@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Single-pass product page extractor for the NK Beauty scrapers
+Collects every product field in one walk over an lxml tree instead of
+re-scanning a BeautifulSoup tree once per selector and keyword
+"""
+
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+from lxml import etree, html
+
+
+def clean_text(text: str) -> str:
+    """Clean and normalize text"""
+    if not text:
+        return ""
+    return re.sub(r'\s+', ' ', text.strip())
+
+
+def _tag(tag: str):
+    return lambda el, classes, class_attr: el.tag == tag
+
+
+def _class(name: str):
+    return lambda el, classes, class_attr: name in classes
+
+
+def _class_contains(fragment: str):
+    return lambda el, classes, class_attr: fragment in class_attr
+
+
+_UTF8_PARSER = html.HTMLParser(encoding='utf-8')
+_DEFAULT_PARSER = html.HTMLParser()
+
+
+class ProductPageExtractor:
+    """Extracts name, description, ingredients, usage, price, images and features in one traversal
+
+    Selector lists keep the priority order of the original CSS selectors:
+    the first element (in document order) matching the highest-priority
+    selector wins. Keyword sections take the text of the element that
+    follows the one containing the keyword.
+    """
+
+    NAME_SELECTORS = [_tag('h1'), _class('product-title'), _class('product-name'), _tag('title')]
+    DESCRIPTION_SELECTORS = [
+        _class('product-description'),
+        _class('description'),
+        _class('product-detail'),
+        _class('content'),
+        _class_contains('description'),
+        _class_contains('detail'),
+    ]
+    PRICE_SELECTORS = [_class('price'), _class('product-price'), _class_contains('price')]
+
+    INGREDIENTS_KEYWORDS = ['ingredients', 'içerik', 'kompozisyon', 'formula']
+    USAGE_KEYWORDS = ['kullanım', 'usage', 'directions', 'application', 'how to use']
+
+    IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp']
+    IMAGE_SKIP = ['logo', 'icon', 'favicon']
+
+    SIZE_PATTERN = re.compile(r'(\d+)\s*(ml|g|oz|gram)', re.IGNORECASE)
+
+    def __init__(self):
+        keywords = self.INGREDIENTS_KEYWORDS + self.USAGE_KEYWORDS
+        self.keywords = keywords
+        self.keyword_pattern = re.compile(
+            '|'.join(f'(?P<k{i}>{re.escape(keyword)})' for i, keyword in enumerate(keywords)),
+            re.IGNORECASE
+        )
+
+    @staticmethod
+    def _parser_for(content: bytes):
+        """Pages are served as UTF-8 without always declaring it; let lxml sniff anything else"""
+        if isinstance(content, bytes):
+            try:
+                content.decode('utf-8')
+                return _UTF8_PARSER
+            except UnicodeDecodeError:
+                pass
+        return _DEFAULT_PARSER
+
+    def _match_keywords(self, text: str, parent, found: List) -> None:
+        for match in self.keyword_pattern.finditer(text):
+            index = int(match.lastgroup[1:])
+            if found[index] is None:
+                found[index] = parent
+
+    @staticmethod
+    def _match_first(selectors, found: List, el, classes, class_attr) -> None:
+        for i, selector in enumerate(selectors):
+            if found[i] is None and selector(el, classes, class_attr):
+                found[i] = el
+
+    @staticmethod
+    def _following_element(el):
+        """Next sibling element, falling back to the next element in document order"""
+        sibling = el.getnext()
+        while sibling is not None and not isinstance(sibling.tag, str):
+            sibling = sibling.getnext()
+        if sibling is not None:
+            return sibling
+
+        for child in el.iterdescendants():
+            if isinstance(child.tag, str):
+                return child
+
+        node = el
+        while node is not None:
+            following = node.getnext()
+            while following is not None:
+                if isinstance(following.tag, str):
+                    return following
+                following = following.getnext()
+            node = node.getparent()
+        return None
+
+    def _section_text(self, found: List, offset: int, count: int) -> str:
+        for parent in found[offset:offset + count]:
+            if parent is None:
+                continue
+            next_elem = self._following_element(parent)
+            if next_elem is not None:
+                return clean_text(next_elem.text_content())
+        return ""
+
+    @staticmethod
+    def _first_text(found: List) -> Optional[str]:
+        for el in found:
+            if el is not None:
+                return clean_text(el.text_content())
+        return None
+
+    def extract(self, content: bytes, product_url: str) -> Dict:
+        """Extract product information from a product page's HTML"""
+        product = {
+            'url': product_url,
+            'name': '',
+            'description': '',
+            'ingredients': '',
+            'usage': '',
+            'features': [],
+            'size': '',
+            'price': '',
+            'images': [],
+            'specifications': {}
+        }
+
+        if not content or not content.strip():
+            return product
+        root = html.fromstring(content, parser=self._parser_for(content))
+
+        names = [None] * len(self.NAME_SELECTORS)
+        descriptions = [None] * len(self.DESCRIPTION_SELECTORS)
+        prices = [None] * len(self.PRICE_SELECTORS)
+        keyword_parents = [None] * len(self.keywords)
+        lists = []
+        open_lists = []
+
+        for event, el in etree.iterwalk(root, events=('start', 'end')):
+            is_element = isinstance(el.tag, str)
+
+            if event == 'end':
+                if is_element and el.tag in ('ul', 'ol'):
+                    open_lists.pop()
+                if el.tail:
+                    parent = el.getparent()
+                    if parent is not None:
+                        self._match_keywords(el.tail, parent, keyword_parents)
+                continue
+
+            if not is_element:
+                continue
+
+            class_attr = el.get('class', '')
+            classes = class_attr.split()
+
+            self._match_first(self.NAME_SELECTORS, names, el, classes, class_attr)
+            self._match_first(self.DESCRIPTION_SELECTORS, descriptions, el, classes, class_attr)
+            self._match_first(self.PRICE_SELECTORS, prices, el, classes, class_attr)
+
+            if el.text:
+                self._match_keywords(el.text, el, keyword_parents)
+
+            tag = el.tag
+            if tag in ('ul', 'ol'):
+                items = []
+                lists.append(items)
+                open_lists.append(items)
+            elif tag == 'li':
+                for items in open_lists:
+                    items.append(el)
+            elif tag == 'img':
+                src = el.get('src') or el.get('data-src')
+                if src:
+                    lowered = src.lower()
+                    if any(ext in lowered for ext in self.IMAGE_EXTENSIONS):
+                        # Skip logos and icons
+                        if not any(skip in lowered for skip in self.IMAGE_SKIP):
+                            product['images'].append(src)
+
+        product['name'] = self._first_text(names) or ''
+        product['description'] = self._first_text(descriptions) or ''
+
+        ingredients_count = len(self.INGREDIENTS_KEYWORDS)
+        product['ingredients'] = self._section_text(keyword_parents, 0, ingredients_count)
+        product['usage'] = self._section_text(keyword_parents, ingredients_count, len(self.USAGE_KEYWORDS))
+
+        # Extract size/volume from name
+        size_match = self.SIZE_PATTERN.search(product['name'])
+        if size_match:
+            product['size'] = f"{size_match.group(1)} {size_match.group(2).lower()}"
+
+        for price_elem in prices:
+            if price_elem is not None:
+                price_text = clean_text(price_elem.text_content())
+                if '₺' in price_text or 'TL' in price_text:
+                    product['price'] = price_text
+                    break
+
+        # Features from lists or bullet points, nested items count for every enclosing list
+        texts = {}
+        for items in lists:
+            for li in items:
+                if li not in texts:
+                    texts[li] = clean_text(li.text_content())
+                if texts[li]:
+                    product['features'].append(texts[li])
+
+        return product
+
+
+# One extractor per class and process; adapters may supply their own subclass
+_extractors: Dict[type, ProductPageExtractor] = {}
+
+
+def parse_product_html(content: bytes, product_url: str,
+                       extractor_class: type = ProductPageExtractor) -> Tuple[Dict, float]:
+    """Parse a product page, returning (product, parse_seconds); picklable for process pools"""
+    started_at = time.perf_counter()
+    extractor = _extractors.get(extractor_class)
+    if extractor is None:
+        extractor = _extractors[extractor_class] = extractor_class()
+    product = extractor.extract(content, product_url)
+    return product, time.perf_counter() - started_at
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Per-product features for the duplicate analyzer
+Normalized names, sizes and tokens are computed once per product and can
+be persisted keyed by a hash of the fields they derive from
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from http_cache import atomic_write
+
+# Bump whenever normalization changes so persisted features are recomputed
+FEATURES_VERSION = 1
+
+
+class ProductFeatures:
+    """Comparison features of one product
+
+    `normalized` is the whole name as used for exact matching;
+    `clean_normalized` drops the size and is what similarity detectors
+    compare. Products without a name have empty features.
+    """
+
+    __slots__ = ('name', 'normalized', 'clean_normalized', 'size', 'tokens', 'product_id')
+
+    def __init__(self, name: str, normalized: str, clean_normalized: str, size: str,
+                 tokens: Tuple[str, ...], product_id: str):
+        self.name = name
+        self.normalized = normalized
+        self.clean_normalized = clean_normalized
+        self.size = size
+        self.tokens = tokens
+        self.product_id = product_id
+
+    def to_list(self) -> List:
+        return [self.name, self.normalized, self.clean_normalized, self.size, list(self.tokens), self.product_id]
+
+    @classmethod
+    def from_list(cls, values: List) -> 'ProductFeatures':
+        name, normalized, clean_normalized, size, tokens, product_id = values
+        return cls(name, normalized, clean_normalized, size, tuple(tokens), product_id)
+
+
+def feature_key(product: dict) -> str:
+    """Hash of the product fields features are derived from"""
+    source = '\x1f'.join([str(FEATURES_VERSION), product.get('name', '') or '', product.get('size', '') or '',
+                          product.get('product_id', '') or ''])
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+class FeatureCache:
+    """Features by product hash, kept in memory and optionally in a JSON file"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[str, ProductFeatures] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != FEATURES_VERSION:
+            return
+        self.entries = {key: ProductFeatures.from_list(values) for key, values in data.get('features', {}).items()}
+
+    def get(self, key: str) -> Optional[ProductFeatures]:
+        features = self.entries.get(key)
+        if features is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return features
+
+    def put(self, key: str, features: ProductFeatures) -> None:
+        self.entries[key] = features
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache file if anything was added since it was loaded"""
+        if not self.path or not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {'version': FEATURES_VERSION,
+                'features': {key: features.to_list() for key, features in self.entries.items()}}
+        atomic_write(self.path, json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        self._dirty = False
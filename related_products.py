@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Related products for the site
+Embeds every product as a field-weighted word TF-IDF vector (name, tags,
+description; compiled tags start with the category group and brand) and
+finds each product's nearest neighbours by cosine similarity plus a bonus
+for a shared category or brand, one block of rows at a time, for
+compile_catalog.py to store
+
+Requires numpy and scipy (pip install numpy scipy).
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from build_search_index import normalize_text
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+    sparse = None
+
+# How much a word counts by the field it comes from
+FIELD_WEIGHTS = {'name': 3.0, 'tags': 1.0, 'description': 1.0}
+# Added to the cosine similarity of two products with the same value of the field
+MATCH_BONUS = {'category': 0.2, 'originalCategory': 0.2, 'brand': 0.05}
+# Neighbours kept per product; the site shows four
+DEFAULT_NEIGHBOURS = 8
+# Similarity cells computed per block, bounding memory whatever the catalog size
+BLOCK_CELLS = 1 << 22
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Related products need numpy and scipy: pip install numpy scipy")
+
+
+def product_terms(product: Dict) -> Dict[str, float]:
+    """Field-weighted word counts of a product"""
+    counts: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = product.get(field) or ''
+        text = ' '.join(value) if isinstance(value, list) else str(value)
+        for word in normalize_text(text).split():
+            if len(word) > 1:
+                counts[word] = counts.get(word, 0.0) + weight
+    return counts
+
+
+def vectorize(products: Sequence[Dict]):
+    """L2-normalized TF-IDF matrix (CSR, one row per product) with sublinear term weights"""
+    _require_numpy()
+    vocabulary: Dict[str, int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    values: List[float] = []
+    for product in products:
+        for word, count in product_terms(product).items():
+            indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            values.append(1 + np.log(count))
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+         np.asarray(indptr, dtype=np.int64)),
+        shape=(len(products), max(len(vocabulary), 1)),
+    )
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + len(products)) / (1 + document_frequency)) + 1
+    matrix = matrix.multiply(idf.astype(np.float32)).tocsr()
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags((1 / norms).astype(np.float32)) @ matrix
+
+
+def match_features(products: Sequence[Dict]):
+    """One column per (field, value) of MATCH_BONUS, scaled so that the dot product
+    of two rows is the sum of the bonuses the products share"""
+    columns: Dict[Tuple[str, str], int] = {}
+    indptr = [0]
+    indices: List[int] = []
+    values: List[float] = []
+    for product in products:
+        for field, bonus in MATCH_BONUS.items():
+            value = product.get(field)
+            if value:
+                indices.append(columns.setdefault((field, value), len(columns)))
+                values.append(np.sqrt(bonus))
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.asarray(values, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+         np.asarray(indptr, dtype=np.int64)),
+        shape=(len(products), max(len(columns), 1)),
+    )
+
+
+def nearest_neighbours(products: Sequence[Dict], k: int = DEFAULT_NEIGHBOURS) -> List[List[int]]:
+    """Indices of each product's k most similar other products, best first
+
+    Similarity is the cosine of the TF-IDF vectors plus MATCH_BONUS for
+    each field the products share. Products sharing neither a word nor a
+    bonus field with a product are never its neighbours, so a list can be
+    shorter than k.
+    """
+    _require_numpy()
+    total = len(products)
+    if total < 2:
+        return [[] for _ in products]
+    # Text and bonus columns side by side: one product of rows gives cosine plus bonuses
+    matrix = sparse.hstack([vectorize(products), match_features(products)], format='csr')
+    transposed = matrix.T.tocsc()
+    k = min(k, total - 1)
+    block_size = max(1, BLOCK_CELLS // total)
+
+    neighbours: List[List[int]] = []
+    for start in range(0, total, block_size):
+        similarity = (matrix[start:start + block_size] @ transposed).toarray()
+        rows = np.arange(similarity.shape[0])
+        similarity[rows, rows + start] = -1
+        # Top k per row without sorting whole rows, then order those k stably
+        candidates = np.sort(np.argpartition(-similarity, k - 1, axis=1)[:, :k], axis=1)
+        scores = np.take_along_axis(similarity, candidates, axis=1)
+        order = np.argsort(-scores, axis=1, kind='stable')
+        ranked = np.take_along_axis(candidates, order, axis=1)
+        ranked_scores = np.take_along_axis(scores, order, axis=1)
+        for row, row_scores in zip(ranked, ranked_scores):
+            neighbours.append([int(index) for index, score in zip(row, row_scores) if score > 1e-6])
+    return neighbours
@@ -1,57 +1,225 @@
 #!/usr/bin/env python3
 """
 Theraderm Product Scraper for NK Beauty
-Scrapes all Theraderm products from NureDerm website
+Scrapes all Theraderm products from NureDerm website; `BrandScraper` runs
+the same crawl for any brand described by a `brand_adapters.BrandAdapter`
 """
 
 import requests
-from bs4 import BeautifulSoup
-import json
+import argparse
+import asyncio
 import os
 import time
 import re
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urljoin, urlparse
-from PIL import Image
 import io
 
-class TheradermpScraper:
-    def __init__(self):
-        self.base_url = "https://nurederm.com"
+from brand_adapters import BrandAdapter, TheradermAdapter
+from crawl_store import ProductStore
+from crawl_telemetry import CrawlTelemetry, Histogram
+from http_cache import HTTPCache
+from image_store import ImageStore
+from product_extractor import parse_product_html
+from url_frontier import URLFrontier
+
+
+def product_id_from_url(url):
+    """Product id used across the catalog: the last segment of the product URL"""
+    return urlparse(url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` requests per second with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimits:
+    """Per-host concurrency and rate limits, shared by every scraper crawling through one client"""
+
+    def __init__(self, max_per_host=4, rate=2.0):
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self._semaphores = {}
+        self._buckets = {}
+
+    def get(self, url):
+        """Get the (semaphore, token bucket) pair throttling requests to a URL's host"""
+        host = urlparse(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+            self._buckets[host] = TokenBucket(self.rate, capacity=self.max_per_host)
+        return self._semaphores[host], self._buckets[host]
+
+
+def open_client_session(telemetry, limit_per_host=4, limit=100, timeout=30):
+    """Pooled aiohttp session: at most `limit` connections overall and `limit_per_host` per host"""
+    import aiohttp
+
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout),
+                                 headers={'User-Agent': USER_AGENT},
+                                 trace_configs=[telemetry.trace_config()])
+
+
+class BrandScraper:
+    """Crawls one brand's listing and product pages as described by its adapter
+
+    `telemetry`, `host_limits`, `image_executor` and `parse_pool` may be
+    shared between scrapers (see crawl_brands.py); shared telemetry is
+    saved by its owner rather than by each brand.
+    """
+
+    def __init__(self, adapter: BrandAdapter = None, max_per_host=4, rate=2.0, use_cache=True, offline=False,
+                 image_workers=None, parse_workers=None, resume=False, max_retries=3, timeout=30,
+                 event_log=None, telemetry=None, host_limits=None, image_executor=None, parse_pool=None):
+        self.adapter = adapter or TheradermAdapter()
+        self.base_url = self.adapter.base_url
+        self.data_dir = self.adapter.data_dir
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+            'User-Agent': USER_AGENT
         })
-        self.products = []
+        # Products stream to <brand>_data/<brand>_products.jsonl as they finish
+        self.resume = resume
+        self.store = None
+        self.scraped_count = 0
+
+        # Async crawl limits: in-flight requests and requests/second per host
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self.host_limits = host_limits or HostLimits(max_per_host, rate)
 
         # Create directories
-        os.makedirs('theraderm_images', exist_ok=True)
-        os.makedirs('theraderm_data', exist_ok=True)
+        os.makedirs(self.adapter.images_dir, exist_ok=True)
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        # Conditional HTTP cache so re-crawls only transfer changed pages
+        self.cache = (HTTPCache(os.path.join(self.data_dir, 'http_cache'), offline=offline)
+                      if use_cache or offline else None)
+
+        # Request latency, sizes, retries and stage timings
+        self.owns_telemetry = telemetry is None
+        self.telemetry = telemetry or CrawlTelemetry(event_log)
+        self.parse_ms = Histogram()
+        self.max_retries = max_retries
+        self.timeout = timeout
+
+        # Content-addressed images; conversion runs in worker processes while the crawl continues
+        self.images = ImageStore(self.adapter.images_dir, max_workers=image_workers, telemetry=self.telemetry,
+                                 executor=image_executor)
+
+        # Worker pool parsing pages in async mode
+        self.parse_workers = parse_workers
+        self._parse_pool = parse_pool
+
+    def retry_delay(self, attempt):
+        """Exponential backoff before retry number `attempt` (1-based)"""
+        return 0.5 * 2 ** (attempt - 1)
+
+    def fetch(self, url):
+        """GET a URL through the HTTP cache with retries, returning (status, body)"""
+        if self.cache is not None and self.cache.offline:
+            cached = self.cache.get(url)
+            if cached:
+                self.telemetry.record_cache_hit(url)
+            return cached or (504, b'')
+
+        headers = self.cache.conditional_headers(url) if self.cache is not None else {}
+
+        for attempt in range(self.max_retries + 1):
+            started_at = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+                content = response.content
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    self.telemetry.record_error(url, str(e))
+                    raise
+                self.telemetry.record_retry(url, attempt + 1, str(e))
+                time.sleep(self.retry_delay(attempt + 1))
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                self.telemetry.record_retry(url, attempt + 1, f"HTTP {response.status_code}")
+                time.sleep(self.retry_delay(attempt + 1))
+                continue
+            break
+
+        # requests measures `elapsed` up to the parsed response headers
+        self.telemetry.record_request(url, response.status_code, {
+            'ttfb_ms': response.elapsed.total_seconds() * 1000,
+            'total_ms': (time.perf_counter() - started_at) * 1000,
+        }, len(content), retries=attempt)
+
+        if self.cache is None:
+            return response.status_code, content
+        return self.cache.update(url, response.status_code, response.headers, content)
+
+    def new_frontier(self):
+        """URL frontier seeded with the adapter's listing pages"""
+        frontier = URLFrontier(self.base_url, self.adapter.listing_prefix, self.adapter.product_pattern)
+        for listing_url in self.adapter.listing_urls:
+            frontier.add_listing(listing_url)
+        return frontier
 
     def get_all_product_urls(self):
-        """Get all product URLs from the main category page"""
-        print("Fetching main category page...")
+        """Get all product URLs from the sitemap and the paginated category listing"""
+        print(f"Fetching {self.adapter.name} category page...")
 
-        url = f"{self.base_url}/urunler/theraderm/all"
-        response = self.session.get(url)
+        frontier = self.new_frontier()
 
-        if response.status_code != 200:
-            print(f"Failed to fetch main page: {response.status_code}")
-            return []
+        found = frontier.discover_sitemap(self.fetch)
+        if found:
+            print(f"Found {found} extra listing pages in sitemap.xml")
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        product_urls = []
+        product_urls = frontier.crawl_listings(self.fetch)
 
-        # Look for product links
-        product_links = soup.find_all('a', href=re.compile(r'/urun/'))
+        print(f"Found {len(product_urls)} {self.adapter.name} product URLs")
+        return product_urls
 
-        for link in product_links:
-            href = link.get('href')
-            if href and '/urun/' in href:
-                full_url = urljoin(self.base_url, href)
-                if full_url not in product_urls:
-                    product_urls.append(full_url)
+    async def get_all_product_urls_async(self, http):
+        """Async counterpart of get_all_product_urls"""
+        print(f"Fetching {self.adapter.name} category page...")
 
-        print(f"Found {len(product_urls)} product URLs")
+        frontier = self.new_frontier()
+
+        async def fetch(url):
+            return await self.fetch_async(http, url)
+
+        found = await frontier.discover_sitemap_async(fetch)
+        if found:
+            print(f"Found {found} extra {self.adapter.name} listing pages in sitemap.xml")
+
+        product_urls = await frontier.crawl_listings_async(fetch)
+
+        print(f"Found {len(product_urls)} {self.adapter.name} product URLs")
         return product_urls
 
     def clean_text(self, text):
@@ -60,7 +228,22 @@ class TheradermpScraper:
             return ""
         return re.sub(r'\s+', ' ', text.strip())
 
-    def download_image(self, img_url, product_name):
+    def save_image(self, content, product_id, img_url=''):
+        """Hand image bytes to the image store and return the stored JPG path"""
+        filename = self.images.add(product_id, content, img_url)
+
+        if filename:
+            print(f"✓ Downloaded: {filename}")
+        return filename
+
+    def finish_images(self):
+        """Wait for queued image conversions and return the paths that failed to convert"""
+        failed = self.images.close()
+        print(f"🖼️  Images: {self.images.written} written, {self.images.skipped} already stored, "
+              f"{self.images.rejected} rejected")
+        return failed
+
+    def download_image(self, img_url, product_name, product_id):
         """Download and save product image"""
         try:
             if not img_url:
@@ -70,147 +253,50 @@ class TheradermpScraper:
             img_url = urljoin(self.base_url, img_url)
 
             print(f"Downloading image for {product_name}...")
-            response = self.session.get(img_url, stream=True)
-
-            if response.status_code == 200:
-                # Create safe filename
-                safe_name = re.sub(r'[^\w\-_\.]', '_', product_name.lower())
-                filename = f"theraderm_images/{safe_name}.jpg"
-
-                # Save image
-                with open(filename, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-
-                # Convert to JPG if needed
-                try:
-                    with Image.open(filename) as img:
-                        if img.format != 'JPEG':
-                            rgb_img = img.convert('RGB')
-                            rgb_img.save(filename, 'JPEG', quality=95)
-                except Exception as e:
-                    print(f"Error converting image for {product_name}: {e}")
-
-                print(f"✓ Downloaded: {filename}")
-                return filename
+            status, content = self.fetch(img_url)
+
+            if status == 200:
+                return self.save_image(content, product_id, img_url)
             else:
-                print(f"Failed to download image for {product_name}: {response.status_code}")
+                print(f"Failed to download image for {product_name}: {status}")
                 return None
 
         except Exception as e:
             print(f"Error downloading image for {product_name}: {e}")
             return None
 
+    def record_parse(self, product_url, parse_seconds):
+        self.parse_ms.observe(parse_seconds * 1000)
+        self.telemetry.observe('parse_ms', parse_seconds * 1000)
+        self.telemetry.event('parse', url=product_url, parse_ms=round(parse_seconds * 1000, 3))
+
+    def parse_product_page(self, content, product_url):
+        """Extract product information from a product page's HTML"""
+        product, parse_seconds = parse_product_html(content, product_url, self.adapter.extractor_class)
+        return self.finish_parse(product, product_url, parse_seconds)
+
+    def finish_parse(self, product, product_url, parse_seconds):
+        self.record_parse(product_url, parse_seconds)
+        product['product_id'] = product_id_from_url(product_url)
+        product['brand'] = self.adapter.name
+        return product
+
     def scrape_product_details(self, product_url):
         """Scrape detailed information from individual product page"""
         try:
             print(f"Scraping: {product_url}")
-            response = self.session.get(product_url)
+            status, content = self.fetch(product_url)
 
-            if response.status_code != 200:
-                print(f"Failed to fetch {product_url}: {response.status_code}")
+            if status != 200:
+                print(f"Failed to fetch {product_url}: {status}")
                 return None
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Extract product information
-            product = {
-                'url': product_url,
-                'name': '',
-                'description': '',
-                'ingredients': '',
-                'usage': '',
-                'features': [],
-                'size': '',
-                'price': '',
-                'images': [],
-                'specifications': {}
-            }
-
-            # Product name
-            name_selectors = ['h1', '.product-title', '.product-name', 'title']
-            for selector in name_selectors:
-                name_elem = soup.select_one(selector)
-                if name_elem:
-                    product['name'] = self.clean_text(name_elem.get_text())
-                    break
-
-            # Description
-            desc_selectors = [
-                '.product-description',
-                '.description',
-                '.product-detail',
-                '.content',
-                '[class*="description"]',
-                '[class*="detail"]'
-            ]
-
-            for selector in desc_selectors:
-                desc_elem = soup.select_one(selector)
-                if desc_elem:
-                    product['description'] = self.clean_text(desc_elem.get_text())
-                    break
-
-            # Look for ingredients
-            ingredients_keywords = ['ingredients', 'içerik', 'kompozisyon', 'formula']
-            for keyword in ingredients_keywords:
-                elem = soup.find(text=re.compile(keyword, re.IGNORECASE))
-                if elem:
-                    parent = elem.parent if elem.parent else elem
-                    next_elem = parent.find_next_sibling() or parent.find_next()
-                    if next_elem:
-                        product['ingredients'] = self.clean_text(next_elem.get_text())
-                        break
-
-            # Look for usage instructions
-            usage_keywords = ['kullanım', 'usage', 'directions', 'application', 'how to use']
-            for keyword in usage_keywords:
-                elem = soup.find(text=re.compile(keyword, re.IGNORECASE))
-                if elem:
-                    parent = elem.parent if elem.parent else elem
-                    next_elem = parent.find_next_sibling() or parent.find_next()
-                    if next_elem:
-                        product['usage'] = self.clean_text(next_elem.get_text())
-                        break
-
-            # Extract all images
-            img_elements = soup.find_all('img')
-            for img in img_elements:
-                src = img.get('src') or img.get('data-src')
-                if src and any(ext in src.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
-                    # Skip logos and icons
-                    if not any(skip in src.lower() for skip in ['logo', 'icon', 'favicon']):
-                        product['images'].append(src)
-
-            # Extract size/volume from name or content
-            size_pattern = r'(\d+)\s*(ml|g|oz|gram)'
-            size_match = re.search(size_pattern, product['name'], re.IGNORECASE)
-            if size_match:
-                product['size'] = f"{size_match.group(1)} {size_match.group(2).lower()}"
-
-            # Look for price
-            price_selectors = ['.price', '.product-price', '[class*="price"]']
-            for selector in price_selectors:
-                price_elem = soup.select_one(selector)
-                if price_elem:
-                    price_text = self.clean_text(price_elem.get_text())
-                    if '₺' in price_text or 'TL' in price_text:
-                        product['price'] = price_text
-                        break
-
-            # Extract features from lists or bullet points
-            feature_lists = soup.find_all(['ul', 'ol'])
-            for ul in feature_lists:
-                items = ul.find_all('li')
-                if items:
-                    features = [self.clean_text(li.get_text()) for li in items if self.clean_text(li.get_text())]
-                    if features:
-                        product['features'].extend(features)
+            product = self.parse_product_page(content, product_url)
 
             # Download images
             downloaded_images = []
             for img_url in product['images'][:3]:  # Download first 3 images
-                downloaded_path = self.download_image(img_url, product['name'])
+                downloaded_path = self.download_image(img_url, product['name'], product['product_id'])
                 if downloaded_path:
                     downloaded_images.append(downloaded_path)
 
@@ -222,15 +308,178 @@ class TheradermpScraper:
             print(f"Error scraping {product_url}: {e}")
             return None
 
+    async def fetch_async(self, http, url):
+        """Fetch a URL within the per-host concurrency and rate limits, returning (status, body)"""
+        import aiohttp
+
+        if self.cache is not None and self.cache.offline:
+            cached = self.cache.get(url)
+            if cached:
+                self.telemetry.record_cache_hit(url)
+            return cached or (504, b'')
+
+        request_headers = self.cache.conditional_headers(url) if self.cache is not None else {}
+
+        semaphore, bucket = self.host_limits.get(url)
+        for attempt in range(self.max_retries + 1):
+            timings = {}
+            try:
+                async with semaphore:
+                    await bucket.acquire()
+                    started_at = time.perf_counter()
+                    async with http.get(url, headers=request_headers, trace_request_ctx=timings) as response:
+                        status, headers, body = response.status, response.headers, await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    self.telemetry.record_error(url, str(e) or type(e).__name__)
+                    raise
+                self.telemetry.record_retry(url, attempt + 1, str(e) or type(e).__name__)
+                await asyncio.sleep(self.retry_delay(attempt + 1))
+                continue
+
+            if status in RETRY_STATUSES and attempt < self.max_retries:
+                self.telemetry.record_retry(url, attempt + 1, f"HTTP {status}")
+                await asyncio.sleep(self.retry_delay(attempt + 1))
+                continue
+            break
+
+        self.telemetry.record_request(url, status, {
+            'dns_ms': timings.get('dns_ms'),
+            'connect_ms': timings.get('connect_ms'),
+            'ttfb_ms': timings.get('ttfb_ms'),
+            'total_ms': (time.perf_counter() - started_at) * 1000,
+        }, len(body), retries=attempt)
+
+        if self.cache is None:
+            return status, body
+        return self.cache.update(url, status, headers, body)
+
+    async def download_image_async(self, http, img_url, product_name, product_id):
+        """Async counterpart of download_image"""
+        try:
+            if not img_url:
+                return None
+
+            img_url = urljoin(self.base_url, img_url)
+
+            print(f"Downloading image for {product_name}...")
+            status, content = await self.fetch_async(http, img_url)
+
+            if status == 200:
+                return self.save_image(content, product_id, img_url)
+            else:
+                print(f"Failed to download image for {product_name}: {status}")
+                return None
+
+        except Exception as e:
+            print(f"Error downloading image for {product_name}: {e}")
+            return None
+
+    async def parse_product_page_async(self, content, product_url):
+        """Parse a product page in the worker pool, off the event loop"""
+        loop = asyncio.get_running_loop()
+        product, parse_seconds = await loop.run_in_executor(
+            self._parse_pool, parse_product_html, content, product_url, self.adapter.extractor_class
+        )
+        return self.finish_parse(product, product_url, parse_seconds)
+
+    async def scrape_product_details_async(self, http, product_url):
+        """Async counterpart of scrape_product_details, returning the same product dict"""
+        try:
+            print(f"Scraping: {product_url}")
+            status, content = await self.fetch_async(http, product_url)
+
+            if status != 200:
+                print(f"Failed to fetch {product_url}: {status}")
+                return None
+
+            product = await self.parse_product_page_async(content, product_url)
+
+            downloaded_images = await asyncio.gather(*[
+                self.download_image_async(http, img_url, product['name'], product['product_id'])
+                for img_url in product['images'][:3]  # Download first 3 images
+            ])
+            product['downloaded_images'] = [path for path in downloaded_images if path]
+
+            return product
+
+        except Exception as e:
+            print(f"Error scraping {product_url}: {e}")
+            return None
+
+    def record_product(self, product_data, url):
+        """Stream a finished product to the store"""
+        if product_data:
+            self.store.append(product_data)
+            self.scraped_count += 1
+            print(f"✓ Successfully scraped: {product_data['name']}")
+        else:
+            print(f"❌ Failed to scrape: {url}")
+
+    async def crawl_with(self, http, product_urls):
+        """Scrape product pages concurrently over an open session, storing each product as it finishes"""
+        async def scrape_and_record(url):
+            self.record_product(await self.scrape_product_details_async(http, url), url)
+
+        await asyncio.gather(*[scrape_and_record(url) for url in product_urls])
+
+    async def crawl_async(self, product_urls):
+        """Scrape product pages concurrently in a session and parse pool of this scraper's own"""
+        with ProcessPoolExecutor(max_workers=self.parse_workers) as self._parse_pool:
+            async with open_client_session(self.telemetry, self.max_per_host, timeout=self.timeout) as http:
+                await self.crawl_with(http, product_urls)
+
+    async def run_shared(self, http):
+        """Discover and scrape this brand over a session and pools owned by the caller
+
+        The caller finishes the crawl with `finish_crawl`, also when this
+        coroutine was cancelled part-way; everything stored so far is kept.
+        """
+        product_urls = self.open_store(await self.get_all_product_urls_async(http))
+        if product_urls is None:
+            return
+
+        print(f"📦 {self.adapter.name}: {len(product_urls)} products to scrape")
+        await self.crawl_with(http, product_urls)
+
+    def start_crawl(self):
+        """Discover product URLs and open the product store, returning the URLs still to scrape"""
+        return self.open_store(self.get_all_product_urls())
+
+    def open_store(self, product_urls):
+        """Open the product store, returning the discovered URLs not scraped yet"""
+        if not product_urls:
+            print(f"❌ No {self.adapter.name} product URLs found!")
+            return None
+
+        self.store = ProductStore(self.data_dir, prefix=self.adapter.file_prefix, resume=self.resume)
+        pending_urls = [url for url in product_urls if not self.store.is_done(url)]
+
+        if self.resume:
+            print(f"⏩ Resuming: {len(product_urls) - len(pending_urls)} products already scraped")
+
+        return pending_urls
+
+    def finish_crawl(self):
+        """Flush images, compact the JSONL log into the JSON outputs and print statistics"""
+        failed_images = self.finish_images()
+        if self.store is None:
+            return None
+        self.store.close()
+        summary = self.save_data(failed_images)
+        if self.owns_telemetry:
+            self.save_telemetry()
+            self.report_stats()
+        return summary
+
     def run(self):
         """Main scraping process"""
-        print("🚀 Starting Theraderm Product Scraping...")
+        print(f"🚀 Starting {self.adapter.name} Product Scraping...")
 
         # Get all product URLs
-        product_urls = self.get_all_product_urls()
+        product_urls = self.start_crawl()
 
-        if not product_urls:
-            print("❌ No product URLs found!")
+        if product_urls is None:
             return
 
         print(f"📦 Found {len(product_urls)} products to scrape")
@@ -239,46 +488,128 @@ class TheradermpScraper:
         for i, url in enumerate(product_urls, 1):
             print(f"\n[{i}/{len(product_urls)}] Processing product...")
 
-            product_data = self.scrape_product_details(url)
-            if product_data:
-                self.products.append(product_data)
-                print(f"✓ Successfully scraped: {product_data['name']}")
-            else:
-                print(f"❌ Failed to scrape: {url}")
+            self.record_product(self.scrape_product_details(url), url)
 
             # Be respectful to the server
             time.sleep(1)
 
         # Save all data
-        self.save_data()
+        summary = self.finish_crawl()
 
         print(f"\n🎉 Scraping completed!")
-        print(f"📊 Successfully scraped {len(self.products)} products")
-        print(f"💾 Data saved to theraderm_data/theraderm_products.json")
+        print(f"📊 Successfully scraped {self.scraped_count} products")
+        print(f"💾 Data saved to {self.store.products_path}")
+
+        return summary
+
+    def run_async(self):
+        """Scraping process using the asyncio crawl engine"""
+        print(f"🚀 Starting {self.adapter.name} Product Scraping (async)...")
+
+        product_urls = self.start_crawl()
+
+        if product_urls is None:
+            return
 
-        return self.products
+        print(f"📦 Found {len(product_urls)} products to scrape "
+              f"({self.max_per_host} in flight, {self.rate} req/s per host)")
 
-    def save_data(self):
-        """Save scraped data to JSON file"""
-        output_file = 'theraderm_data/theraderm_products.json'
+        started_at = time.monotonic()
+        asyncio.run(self.crawl_async(product_urls))
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(self.products, f, ensure_ascii=False, indent=2)
+        summary = self.finish_crawl()
 
-        print(f"💾 Saved {len(self.products)} products to {output_file}")
+        print(f"\n🎉 Scraping completed in {time.monotonic() - started_at:.1f}s!")
+        print(f"📊 Successfully scraped {self.scraped_count} products")
+        print(f"💾 Data saved to {self.store.products_path}")
 
-        # Also save a summary
-        summary = {
-            'total_products': len(self.products),
-            'products_with_images': sum(1 for p in self.products if p.get('downloaded_images')),
-            'products_with_descriptions': sum(1 for p in self.products if p.get('description')),
-            'products_with_ingredients': sum(1 for p in self.products if p.get('ingredients')),
-            'product_names': [p['name'] for p in self.products if p.get('name')]
+        return summary
+
+    def parse_time_stats(self):
+        """Summarize per-page parse times in milliseconds"""
+        parse_ms = self.parse_ms
+        if not parse_ms.count:
+            return {}
+        return {
+            'pages': parse_ms.count,
+            'mean_ms': round(parse_ms.total / parse_ms.count, 2),
+            'p90_ms': round(parse_ms.percentile(0.90), 2),
+            'max_ms': round(parse_ms.max, 2),
         }
 
-        with open('theraderm_data/theraderm_summary.json', 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+    def report_stats(self):
+        """Print HTTP cache, request and stage timing statistics"""
+        if self.cache is not None:
+            print(f"🗄️  HTTP cache: {self.cache.hits} hits "
+                  f"({self.cache.revalidated} revalidated), {self.cache.misses} misses")
+
+        histograms = self.telemetry.histograms
+        total_ms, ttfb_ms = histograms['total_ms'], histograms['ttfb_ms']
+        if total_ms.count:
+            print(f"🌐 Requests: {self.telemetry.requests} "
+                  f"({self.telemetry.retries} retries, {self.telemetry.errors} errors), "
+                  f"TTFB p50 {ttfb_ms.percentile(0.5):.0f} ms, total p90 {total_ms.percentile(0.9):.0f} ms")
+
+        parse_time = self.parse_time_stats()
+        if parse_time:
+            print(f"⏱️  Parse time: {parse_time['mean_ms']} ms mean, "
+                  f"{parse_time['p90_ms']} ms p90 over {parse_time['pages']} pages")
+
+        image_ms = histograms['image_ms']
+        if image_ms.count:
+            print(f"🖼️  Image time: {image_ms.total / image_ms.count:.0f} ms mean over {image_ms.count} images")
+
+    def save_telemetry(self):
+        """Write request and stage histograms next to the summary"""
+        telemetry_file = os.path.join(self.data_dir, f'{self.adapter.file_prefix}_telemetry.json')
+        self.telemetry.save(telemetry_file)
+        self.telemetry.close()
+        print(f"📈 Telemetry saved to {telemetry_file}")
+
+    def save_data(self, failed_images=None):
+        """Compact the streamed products into the JSON products file and summary"""
+        summary = self.store.compact(failed_images, extra_summary={'parse_time': self.parse_time_stats()})
+
+        print(f"💾 Saved {summary['total_products']} products to {self.store.products_path}")
+
+        return summary
+
+
+class TheradermpScraper(BrandScraper):
+    def __init__(self, **kwargs):
+        super().__init__(TheradermAdapter(), **kwargs)
+
 
 if __name__ == "__main__":
-    scraper = TheradermpScraper()
-    products = scraper.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape Theraderm products from NureDerm")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Fetch product pages concurrently with asyncio")
+    parser.add_argument('--max-per-host', type=int, default=4,
+                        help="Maximum in-flight requests per host in async mode")
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help="Maximum requests per second per host in async mode")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Bypass the on-disk HTTP cache")
+    parser.add_argument('--offline', action='store_true',
+                        help="Serve every request from the HTTP cache without touching the network")
+    parser.add_argument('--image-workers', type=int, default=None,
+                        help="Number of processes converting images (default: CPU count)")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="Number of processes parsing product pages in async mode (default: CPU count)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip products already recorded in theraderm_data/crawl_checkpoint.txt")
+    parser.add_argument('--max-retries', type=int, default=3,
+                        help="Retries for failed requests, 429 and 5xx responses")
+    parser.add_argument('--event-log', default=None,
+                        help="Append a JSON-lines event per request, retry, parse and image to this file")
+    args = parser.parse_args()
+
+    scraper = TheradermpScraper(max_per_host=args.max_per_host, rate=args.rate,
+                                use_cache=not args.no_cache, offline=args.offline,
+                                image_workers=args.image_workers, parse_workers=args.parse_workers,
+                                resume=args.resume, max_retries=args.max_retries,
+                                event_log=args.event_log)
+    if args.use_async:
+        scraper.run_async()
+    else:
+        scraper.run()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Candidate index for near-duplicate product names
+MinHash signatures over character n-grams, bucketed with locality
+sensitive hashing so only plausibly similar names are compared exactly
+"""
+
+import random
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, Iterator, List, Set, Tuple
+
+# Mersenne prime larger than any 32-bit shingle hash
+_PRIME = (1 << 61) - 1
+
+
+class MinHashLSH:
+    """MinHash LSH over character n-grams
+
+    Each text gets `bands * rows` MinHash values; two texts become a
+    candidate pair when all `rows` values of at least one band agree. The
+    chance of that for texts with n-gram Jaccard similarity J is
+    1 - (1 - J**rows) ** bands, so few rows per band favour recall: with
+    the defaults a pair at J=0.3 is still found ~95% of the time and one at
+    J=0.5 ~99.99%, while unrelated names (J near 0) rarely meet. Names
+    scoring 0.85 with SequenceMatcher sit at J >= 0.3 on 3-grams.
+
+    Hashes are derived from crc32 and a seeded RNG, so candidates are the
+    same on every run.
+    """
+
+    def __init__(self, bands: int = 32, rows: int = 2, shingle_size: int = 3, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+                             for _ in range(bands * rows)]
+        self.buckets: List[Dict[Tuple, List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+        self.signatures: Dict[Hashable, Tuple[int, ...]] = {}
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hashed character n-grams of a text, padded so short words still produce n-grams"""
+        padded = f" {text} "
+        size = self.shingle_size
+        if len(padded) <= size:
+            return {zlib.crc32(padded.encode('utf-8'))}
+        return {zlib.crc32(padded[i:i + size].encode('utf-8')) for i in range(len(padded) - size + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = self.shingles(text)
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self.permutations)
+
+    def add(self, key: Hashable, text: str) -> None:
+        signature = self.signature(text)
+        self.signatures[key] = signature
+        rows = self.rows
+        for band, buckets in enumerate(self.buckets):
+            buckets[signature[band * rows:(band + 1) * rows]].append(key)
+
+    def add_all(self, items: Iterable[Tuple[Hashable, str]]) -> 'MinHashLSH':
+        for key, text in items:
+            self.add(key, text)
+        return self
+
+    def candidate_pairs(self) -> Iterator[Tuple]:
+        """Every pair of keys sharing at least one band bucket, in sorted (smaller, larger) order
+
+        Pairs are generated per key rather than collected up front, so
+        memory stays proportional to one key's neighbours.
+        """
+        rows = self.rows
+        for key in sorted(self.signatures):
+            signature = self.signatures[key]
+            neighbours = set()
+            for band, buckets in enumerate(self.buckets):
+                bucket = buckets[signature[band * rows:(band + 1) * rows]]
+                if len(bucket) > 1:
+                    neighbours.update(other for other in bucket if other > key)
+            for other in sorted(neighbours):
+                yield key, other
+
+    def estimated_similarity(self, first: Hashable, second: Hashable) -> float:
+        """Share of agreeing MinHash values, an estimate of the n-gram Jaccard similarity"""
+        a, b = self.signatures[first], self.signatures[second]
+        return sum(x == y for x, y in zip(a, b)) / len(a)
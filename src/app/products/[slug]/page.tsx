@@ -1,8 +1,8 @@
 import type { Metadata } from 'next'
-import Image from 'next/image'
 import Link from 'next/link'
 import { notFound } from 'next/navigation'
 
+import { ProductImage } from '@/components/ProductImage'
 import { Badge } from '@/components/ui/badge'
 import { Button } from '@/components/ui/button'
 import {
@@ -117,7 +117,7 @@ export default async function ProductDetailPage({ params }: ProductPageProps) {
             <div className="relative overflow-hidden rounded-3xl border bg-white shadow-xl shadow-primary/10">
               <div className="relative aspect-[4/5] w-full">
                 {product.image ? (
-                  <Image
+                  <ProductImage
                     src={product.image}
                     alt={product.name}
                     fill
@@ -139,7 +139,7 @@ export default async function ProductDetailPage({ params }: ProductPageProps) {
                     key={imagePath}
                     className="relative aspect-square overflow-hidden rounded-2xl border"
                   >
-                    <Image
+                    <ProductImage
                       src={imagePath}
                       alt={`${product.name} görseli`}
                       fill
@@ -226,7 +226,7 @@ export default async function ProductDetailPage({ params }: ProductPageProps) {
                   <div className="flex items-center gap-6 p-6">
                     <div className="relative h-28 w-28 overflow-hidden rounded-2xl bg-muted">
                       {related.image ? (
-                        <Image
+                        <ProductImage
                           src={related.image}
                           alt={related.name}
                           fill
@@ -1,12 +1,12 @@
 'use client'
 
 import { useMemo, useState, useEffect, Suspense } from 'react'
-import Image from 'next/image'
 import Link from 'next/link'
 import { motion } from 'framer-motion'
 import { SlidersHorizontal, MessageCircle, ChevronDown } from 'lucide-react'
 import { useSearchParams } from 'next/navigation'
 
+import { ProductImage } from '@/components/ProductImage'
 import { Badge } from '@/components/ui/badge'
 import { Button } from '@/components/ui/button'
 import {
@@ -22,6 +22,7 @@ import {
   CollapsibleTrigger,
 } from '@/components/ui/collapsible'
 import {
+  getProductsByBrand,
   productBrands,
   productCategories,
   products,
@@ -30,7 +31,7 @@ import { cn } from '@/lib/utils'
 
 const brandStats = productBrands.map((brand) => ({
   name: brand,
-  count: products.filter((product) => product.brand === brand).length,
+  count: getProductsByBrand(brand).length,
 }))
 
 const categoryOptions: { label: string; value: CategoryFilterState }[] = [
@@ -315,7 +316,7 @@ function ProductCard({ product }: ProductCardProps) {
     <Card className="group flex h-full flex-col overflow-hidden rounded-2xl border border-border/60 bg-background shadow-sm transition duration-300 hover:-translate-y-1 hover:shadow-lg">
       <div className="relative aspect-square w-full overflow-hidden bg-muted/20">
         {product.image ? (
-          <Image
+          <ProductImage
             src={product.image}
             alt={product.name}
             fill
@@ -0,0 +1,38 @@
+"use client"
+
+import Image, { type ImageLoaderProps, type ImageProps } from "next/image"
+
+import variants from "@/data/product-images.json"
+
+// Packshots are pre-resized by optimize_images.py into public/optimized;
+// this serves those files instead of resizing the originals on request.
+// Images the build has not seen fall back to the default loader.
+type VariantEntry = string | [string, number[]]
+
+const table = variants as { format: string; widths: number[]; images: Record<string, VariantEntry> }
+
+const hasKey = (index: object, key: string) => Object.prototype.hasOwnProperty.call(index, key)
+
+function variantLoader(entry: VariantEntry) {
+  const [base, widths] = typeof entry === "string" ? [entry, table.widths] : entry
+  // Smallest variant at least as wide as requested, else the widest there is
+  return ({ width }: ImageLoaderProps) => {
+    const chosen = widths.find((candidate) => candidate >= width) ?? widths[widths.length - 1]
+    return `${base}-${chosen}.${table.format}`
+  }
+}
+
+const loaders = new Map<string, ReturnType<typeof variantLoader>>()
+
+export function ProductImage(props: ImageProps) {
+  const { src } = props
+  if (typeof src !== "string" || !hasKey(table.images, src)) {
+    return <Image {...props} />
+  }
+  let loader = loaders.get(src)
+  if (!loader) {
+    loader = variantLoader(table.images[src])
+    loaders.set(src, loader)
+  }
+  return <Image {...props} loader={loader} />
+}
@@ -1,150 +1,43 @@
-import rawProducts from "@/data/products.enriched.json"
+import catalog from "@/data/products.compiled.json"
 
-type RawProduct = (typeof rawProducts)[number]
+export { normalizeText } from "@/lib/normalize"
 
-const categoryGroupMap: Record<string, string> = {
-  "Temizleyici ve Tonikler": "Temizleme & Hazırlık",
-  "Temizleyici, Tonikler & Peeling": "Temizleme & Hazırlık",
-  Temizleyici: "Temizleme & Hazırlık",
-  Hazırlayıcılar: "Temizleme & Hazırlık",
-  Neutralizer: "Temizleme & Hazırlık",
+// Built by compile_catalog.py: categories are already grouped (see
+// src/data/catalog.config.json) and the lookup tables are precomputed,
+// so nothing here is rebuilt on load. Re-run it after editing the data.
+export type Product = (typeof catalog.products)[number]
 
-  "Organik Peelingler": "Peeling & Klinik Protokoller",
-  Peeling: "Peeling & Klinik Protokoller",
-  "Profesyonel Peelingler": "Peeling & Klinik Protokoller",
-  "Dermaterapi Solüsyonları": "Peeling & Klinik Protokoller",
-  Snowcell: "Peeling & Klinik Protokoller",
+export const products: Product[] = catalog.products
 
-  Maskeler: "Maskeler & Spa",
-  "Profesyonel Maskeler": "Maskeler & Spa",
-  "Krem Maskeler": "Maskeler & Spa",
-  Maske: "Maskeler & Spa",
-  "Yosun Özlü Peel off Maskeler": "Maskeler & Spa",
+export const productBrands: string[] = catalog.brands
 
-  "Günlük Bakım Serumları": "Serum & Ampuller",
-  Serumlar: "Serum & Ampuller",
-  "Serum Serisi": "Serum & Ampuller",
-  "Vitamin Serisi": "Serum & Ampuller",
-  "Vita C Serisi": "Serum & Ampuller",
-  "Cilt Yapılandırıcı Gece Serumu": "Serum & Ampuller",
-  "Anti-Aging Serisi": "Serum & Ampuller",
-  "Rozasea Serisi": "Serum & Ampuller",
-  "Point Serisi": "Serum & Ampuller",
-  "Akne Serisi": "Serum & Ampuller",
-  Leke: "Serum & Ampuller",
-  "Leke Serisi": "Serum & Ampuller",
-  "SOS Serisi": "Serum & Ampuller",
-  "VDR Serisi": "Serum & Ampuller",
-  "Güneş Çili": "Serum & Ampuller",
-  "Aydınlatma Ürünleri": "Serum & Ampuller",
+export const productCategories: string[] = catalog.categories
 
-  "Günlük Bakım Kremleri": "Nemlendirme & Bariyer",
-  "Nemlendirici ve Onarıcı Kremler": "Nemlendirme & Bariyer",
-  "Onarıcı ve Nemlendirici": "Nemlendirme & Bariyer",
-  "Onarıcı Kremler": "Nemlendirme & Bariyer",
-  "İşlem Sonrası Bakım Kremleri": "Nemlendirme & Bariyer",
-  "Profesyonel Bakım Sonrası Ürünler": "Nemlendirme & Bariyer",
+const slugIndex: Record<string, number> = catalog.bySlug
+const brandIndex: Record<string, number[]> = catalog.byBrand
+const categoryIndex: Record<string, number[]> = catalog.byCategory
+// Each product's nearest neighbours by text, category and brand, best first (related_products.py)
+const relatedIndex: number[][] = catalog.related
 
-  "Güneş Koruyucular": "Güneş Koruması",
-  "Güneş Kremleri": "Güneş Koruması",
-  "Güneş Kremleri Serisi": "Güneş Koruması",
+const hasKey = (index: object, key: string) => Object.prototype.hasOwnProperty.call(index, key)
 
-  "Saç Bakım Ürünleri": "Saç & Vücut Bakımı",
-  "Vücut El ,Boyun ve Dudak Serisi": "Saç & Vücut Bakımı",
-  "İntim Bölge": "Saç & Vücut Bakımı",
-
-  "Göz Bakım Ürünleri": "Göz & Bölgesel Bakım",
-  "Göz Serisi": "Göz & Bölgesel Bakım",
-  "Gözaltı Koyu Halkaları": "Göz & Bölgesel Bakım",
-  "Boyun ve Dekolte Bakım Ürünleri": "Göz & Bölgesel Bakım",
-
-  "Ev Bakım Kitleri": "Profesyonel Kitler & Setler",
-  "Dermal Kitler": "Profesyonel Kitler & Setler",
-}
-
-const fallbackCategory = "Diğer Profesyonel Ürünler"
-
-const mapCategory = (category: string) => categoryGroupMap[category] ?? fallbackCategory
-
-export type Product = Omit<RawProduct, "category"> & {
-  category: string
-  originalCategory: string
+export function getProductBySlug(slug: string) {
+  return hasKey(slugIndex, slug) ? products[slugIndex[slug]] : null
 }
 
-export const products: Product[] = rawProducts.map((product) => {
-  const originalCategory = product.category
-  const category = mapCategory(originalCategory)
-  const tags = Array.from(
-    new Set(
-      [category, product.brand, ...product.tags.filter((tag) => tag !== originalCategory)].filter(
-        Boolean
-      )
-    )
-  )
-
-  return {
-    ...product,
-    category,
-    originalCategory,
-    tags,
-  }
-})
-
-// Marka sıralaması - özel sırayla
-const brandOrder = ['pHformula', 'Genosys', 'Meline', 'Theraderm', 'My Lamination']
-const allBrands = Array.from(new Set(products.map((product) => product.brand)))
-export const productBrands = [
-  ...brandOrder.filter(brand => allBrands.includes(brand)),
-  ...allBrands.filter(brand => !brandOrder.includes(brand)).sort()
-]
-
-export const productCategories = Array.from(new Set(products.map((product) => product.category))).sort()
-
-export const productSearchIndex = products.map((product) => ({
-  slug: product.slug,
-  content: normalizeText(
-    [product.name, product.brand, product.category, product.summary, product.description].join(" ")
-  ),
-}))
-
-export function normalizeText(value: string) {
-  return value
-    .toLowerCase()
-    .normalize("NFD")
-    .replace(/[\u0300-\u036f]/g, "")
-    .replace(/[ıİ]/g, "i")
-    .replace(/[ğĞ]/g, "g")
-    .replace(/[üÜ]/g, "u")
-    .replace(/[öÖ]/g, "o")
-    .replace(/[şŞ]/g, "s")
-    .replace(/[çÇ]/g, "c")
-    .replace(/&/g, " ve ")
-    .replace(/[^a-z0-9\s]/g, " ")
-    .replace(/\s+/g, " ")
-    .trim()
+export function getProductsByBrand(brand: string) {
+  return hasKey(brandIndex, brand) ? brandIndex[brand].map((index) => products[index]) : []
 }
 
-export function getProductBySlug(slug: string) {
-  return products.find((product) => product.slug === slug) || null
+export function getProductsByCategory(category: string) {
+  return hasKey(categoryIndex, category) ? categoryIndex[category].map((index) => products[index]) : []
 }
 
 export function getRelatedProducts(slug: string, limit = 4) {
-  const target = getProductBySlug(slug)
-  if (!target) return []
+  if (!hasKey(slugIndex, slug)) return []
+  const index = slugIndex[slug]
 
-  const related = products
-    .filter((product) => product.slug !== slug)
-    .map((product) => {
-      const brandScore = product.brand === target.brand ? 2 : 0
-      const categoryScore = product.category === target.category ? 3 : 0
-      const nameOverlap = overlapScore(target.name, product.name)
-      const totalScore = brandScore + categoryScore + nameOverlap
-      return { product, score: totalScore }
-    })
-    .filter(({ score }) => score > 0)
-    .sort((a, b) => b.score - a.score)
-    .slice(0, limit)
-    .map(({ product }) => product)
+  const related = relatedIndex[index].slice(0, limit).map((neighbour) => products[neighbour])
 
   if (related.length < limit) {
     const missing = limit - related.length
@@ -156,24 +49,3 @@ export function getRelatedProducts(slug: string, limit = 4) {
 
   return related
 }
-
-function overlapScore(a: string, b: string) {
-  const wordsA = new Set(
-    normalizeText(a)
-      .split(" ")
-      .filter((chunk) => chunk.length > 2)
-  )
-  const wordsB = new Set(
-    normalizeText(b)
-      .split(" ")
-      .filter((chunk) => chunk.length > 2)
-  )
-
-  let score = 0
-  for (const word of wordsA) {
-    if (wordsB.has(word)) {
-      score += 1
-    }
-  }
-  return score
-}
@@ -0,0 +1,143 @@
+import { normalizeText } from "@/lib/normalize"
+
+// Client side of the search index written to public/search by
+// build_search_index.py. Nothing is bundled: the manifest, the postings
+// shard of each query word and the document blocks of the hits are
+// fetched on first use and kept for later queries.
+const searchRoot = "/search"
+
+type Posting = [number, number]
+
+type Shard = {
+  terms: Record<string, Posting[]>
+  prefixes: Record<string, Posting[]>
+}
+
+type Manifest = {
+  version: string
+  documents: number
+  docsPerShard: number
+  minPrefix: number
+  shards: string[]
+}
+
+export type SearchDocument = {
+  slug: string
+  name: string
+  brand: string
+  category: string
+  image: string
+}
+
+export type SearchResult = SearchDocument & { score: number }
+
+let manifestRequest: Promise<Manifest> | null = null
+const fileRequests = new Map<string, Promise<unknown>>()
+
+const hasKey = (index: object, key: string) => Object.prototype.hasOwnProperty.call(index, key)
+
+async function fetchJson<T>(url: string, init?: RequestInit): Promise<T> {
+  const response = await fetch(url, init)
+  if (!response.ok) {
+    throw new Error(`Search index request failed: ${url} (${response.status})`)
+  }
+  return response.json() as Promise<T>
+}
+
+function loadManifest() {
+  if (!manifestRequest) {
+    manifestRequest = fetchJson<Manifest>(`${searchRoot}/manifest.json`, { cache: "no-cache" }).catch(
+      (error) => {
+        manifestRequest = null
+        throw error
+      }
+    )
+  }
+  return manifestRequest
+}
+
+function loadFile<T>(manifest: Manifest, name: string) {
+  // Versioned URLs let the browser cache shards until the index is rebuilt
+  const url = `${searchRoot}/${name}?v=${manifest.version}`
+  let request = fileRequests.get(url)
+  if (!request) {
+    request = fetchJson<T>(url).catch((error) => {
+      fileRequests.delete(url)
+      throw error
+    })
+    fileRequests.set(url, request)
+  }
+  return request as Promise<T>
+}
+
+const shardKeys = new WeakMap<Manifest, Set<string>>()
+
+// A word lives in the shard with the longest key it starts with
+function shardKey(manifest: Manifest, word: string) {
+  let keys = shardKeys.get(manifest)
+  if (!keys) {
+    keys = new Set(manifest.shards)
+    shardKeys.set(manifest, keys)
+  }
+  for (let length = word.length; length > 0; length--) {
+    if (keys.has(word.slice(0, length))) return word.slice(0, length)
+  }
+  return null
+}
+
+async function wordPostings(manifest: Manifest, word: string) {
+  const key = shardKey(manifest, word)
+  if (key === null) return new Map<number, number>()
+
+  const shard = await loadFile<Shard>(manifest, `shard-${key}.json`)
+  const scores = new Map<number, number>()
+  const add = (postings: Posting[]) => {
+    for (const [index, weight] of postings) {
+      scores.set(index, Math.max(scores.get(index) ?? 0, weight))
+    }
+  }
+  if (hasKey(shard.terms, word)) add(shard.terms[word])
+  // Partly typed words match the words they start
+  if (word.length >= manifest.minPrefix && hasKey(shard.prefixes, word)) add(shard.prefixes[word])
+  return scores
+}
+
+export async function searchProducts(query: string, limit = 20): Promise<SearchResult[]> {
+  const words = Array.from(new Set(normalizeText(query).split(" ").filter(Boolean)))
+  if (words.length === 0) return []
+
+  const manifest = await loadManifest()
+  const postings = await Promise.all(words.map((word) => wordPostings(manifest, word)))
+
+  // Every word has to match; the scores of the words add up
+  postings.sort((a, b) => a.size - b.size)
+  const [rarest, ...rest] = postings
+  const totals: [number, number][] = []
+  for (const [index, weight] of rarest) {
+    let total = weight
+    let matchesAll = true
+    for (const scores of rest) {
+      const score = scores.get(index)
+      if (score === undefined) {
+        matchesAll = false
+        break
+      }
+      total += score
+    }
+    if (matchesAll) totals.push([index, total])
+  }
+
+  const top = totals.sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, limit)
+  const blocks = new Map<number, Promise<SearchDocument[]>>()
+  for (const [index] of top) {
+    const block = Math.floor(index / manifest.docsPerShard)
+    if (!blocks.has(block)) blocks.set(block, loadFile<SearchDocument[]>(manifest, `docs-${block}.json`))
+  }
+
+  return Promise.all(
+    top.map(async ([index, score]) => {
+      const documents = await blocks.get(Math.floor(index / manifest.docsPerShard))!
+      return { ...documents[index % manifest.docsPerShard], score }
+    })
+  )
+}
@@ -1,112 +1,114 @@
 #!/usr/bin/env python3
 """
-Summary Report Generator for Product Image Matching
+Summary Report Generator for the Product Catalogs
 ==================================================
 
-This script generates a comprehensive summary of the product-image matching process.
+This script summarizes field, brand and image coverage of the catalogs,
+computed by catalog_stats in one streaming pass and cached by input hashes.
 
-Author: Claude Code Assistant  
+Author: Claude Code Assistant
 Date: 2025-09-06
 """
 
+import argparse
 import json
-import os
-from pathlib import Path
-
-def generate_summary():
-    """Generate a comprehensive summary of the matching results."""
-    
-    # Paths
-    original_json = "/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/src/data/products_data.json"
-    updated_json = "/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/src/data/products_data_updated.json"
-    images_dir = "/Volumes/SSD/Projects/NKGuzellik/nk-guzellik/public/images/products"
-    
-    print("="*70)
-    print("📊 FINAL SUMMARY: PRODUCT IMAGE MATCHING COMPLETED")
-    print("="*70)
-    
-    # Load data
-    with open(original_json, 'r', encoding='utf-8') as f:
-        original_data = json.load(f)
-    
-    with open(updated_json, 'r', encoding='utf-8') as f:
-        updated_data = json.load(f)
-    
-    # Count images
-    image_files = [f for f in os.listdir(images_dir) if f.endswith('-main.jpg')]
-    
-    # Analysis
-    original_products = original_data.get('products', [])
-    updated_products = updated_data.get('products', [])
-    
-    # Count unique product IDs
-    unique_product_ids = set()
-    for product in original_products:
-        if product.get('product_id'):
-            unique_product_ids.add(product['product_id'])
-    
-    # Count products with updated image paths
-    products_with_images = 0
-    for product in updated_products:
-        image_paths = product.get('image_paths', [])
-        # Check if any image path contains /public/images/products/
-        if any('/public/images/products/' in path for path in image_paths):
-            products_with_images += 1
-    
-    print(f"📁 DATA ANALYSIS:")
-    print(f"   • Original JSON entries: {len(original_products)}")
-    print(f"   • Unique product IDs: {len(unique_product_ids)}")
-    print(f"   • Available image files: {len(image_files)}")
-    print(f"   • Products updated with images: {products_with_images}")
-    
-    print(f"\n🎯 MATCHING RESULTS:")
-    print(f"   • Match rate: {(products_with_images/len(unique_product_ids))*100:.1f}%")
-    print(f"   • Direct matches: {products_with_images}")
-    print(f"   • Fuzzy matches needed: 0")
-    print(f"   • Unmatched products: {len(unique_product_ids) - products_with_images}")
-    print(f"   • Unmatched images: {len(image_files) - products_with_images}")
-    
-    print(f"\n📂 FILES CREATED:")
-    print(f"   • Updated JSON: {updated_json}")
-    print(f"   • Matching report: /Volumes/SSD/Projects/NKGuzellik/nk-guzellik/src/data/matching_report.md")
-    print(f"   • Matching script: /Volumes/SSD/Projects/NKGuzellik/nk-guzellik/match_product_images.py")
-    print(f"   • This summary: /Volumes/SSD/Projects/NKGuzellik/nk-guzellik/summary_report.py")
-    
-    print(f"\n🔧 TECHNICAL DETAILS:")
-    print(f"   • Script used intelligent matching with Turkish character support")
-    print(f"   • Handled size variations (ml, gr, etc.) automatically")
-    print(f"   • Applied fuzzy matching algorithms for edge cases")
-    print(f"   • Updated image_paths field for each matched product")
-    print(f"   • Images are referenced as '/public/images/products/{{filename}}'")
-    
-    print(f"\n✅ KEY ACHIEVEMENTS:")
-    print(f"   • 100% match rate - all available images matched to products")
-    print(f"   • Zero manual intervention required")  
-    print(f"   • Preserved existing image_paths while adding new ones")
-    print(f"   • Generated detailed documentation and reports")
-    print(f"   • Created reusable, intelligent matching script")
-    
-    print(f"\n💡 NEXT STEPS:")
-    print(f"   • Use the updated JSON file in your application")
-    print(f"   • Implement image display using the /public/images/products/ paths")
-    print(f"   • Consider optimizing images for web performance")
-    print(f"   • Set up automated matching for future product additions")
-    
-    # Sample matched products
-    print(f"\n📋 SAMPLE MATCHED PRODUCTS:")
-    count = 0
-    for product in updated_products[:5]:
-        image_paths = product.get('image_paths', [])
-        public_images = [p for p in image_paths if '/public/images/products/' in p]
-        if public_images:
-            count += 1
-            name = product.get('name', 'N/A')[:40]
-            print(f"   {count}. {product['product_id']} → {public_images[0].split('/')[-1]}")
-            print(f"      Name: {name}...")
-    
-    print("="*70)
-    print("🎉 MISSION ACCOMPLISHED! All product images successfully matched.")
-    print("="*70)
+import time
+from typing import Dict, List, Optional
+
+from catalog_stats import cached_stats
+
+DEFAULT_CATALOGS = ['public/data/products_data.json', 'src/data/products.enriched.json']
+DEFAULT_IMAGES_DIR = 'public/products'
+
+
+def _percent(part: int, whole: int) -> str:
+    return f"{part / whole * 100:.1f}%" if whole else "n/a"
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def render_summary(stats: Dict, low_coverage: float = 0.9, max_missing: int = 10) -> str:
+    """Text report of catalog statistics; fields below `low_coverage` are listed per brand"""
+    report = []
+    report.append("=" * 70)
+    report.append("📊 CATALOG SUMMARY")
+    report.append("=" * 70)
+
+    for catalog in stats['catalogs']:
+        total = catalog['products']
+        ids = catalog['ids']
+        images = catalog['images']
+        report.append(f"\n📁 {catalog['path']}")
+        report.append(f"   • Products: {total}")
+        report.append(f"   • Unique ids: {ids['unique']} ({ids['duplicated']} duplicated, {ids['missing']} products without one)")
+        report.append(f"   • Products with image references: {images['products_with_images']} "
+                      f"({_percent(images['products_with_images'], total)})")
+        report.append(f"   • Products with an existing local image: {images['products_with_local_images']} "
+                      f"({_percent(images['products_with_local_images'], total)})")
+        report.append(f"   • Image references resolved: {images['resolved']} of {images['references']}")
+        for name in images['missing'][:max_missing]:
+            report.append(f"     ⚠️ Missing file: {name}")
+        if len(images['missing']) > max_missing:
+            report.append(f"     ... and {len(images['missing']) - max_missing} more missing files")
+
+        report.append("   Field coverage:")
+        for field, filled in catalog['fields'].items():
+            report.append(f"     {field:<24} {filled:>6}  {_percent(filled, total):>6}")
+
+        report.append("   🏷️ Brands:")
+        for brand, brand_stats in catalog['brands'].items():
+            count = brand_stats['products']
+            report.append(f"     {brand}: {count} products, {brand_stats['with_local_images']} with local images "
+                          f"({_percent(brand_stats['with_local_images'], count)})")
+            gaps = [f"{field} {_percent(brand_stats['fields'].get(field, 0), count)}"
+                    for field in catalog['fields']
+                    if brand_stats['fields'].get(field, 0) < low_coverage * count]
+            if gaps:
+                report.append(f"       Low coverage: {', '.join(gaps)}")
+
+    images = stats['images']
+    report.append(f"\n🖼️ IMAGES ({stats['images_dir']}):")
+    report.append(f"   • Files: {images['files']} ({_mb(images['bytes'])})")
+    report.append(f"   • Referenced by a catalog: {images['referenced']}")
+    report.append(f"   • Unreferenced: {images['unreferenced']} ({_mb(images['unreferenced_bytes'])})")
+    if len(stats['catalogs']) > 1:
+        report.append(f"\n🔗 Product ids present in more than one catalog: {stats['shared_ids']}")
+
+    report.append("=" * 70)
+    return "\n".join(report)
+
+
+def generate_summary(catalogs: List[str] = None, images_dir: str = DEFAULT_IMAGES_DIR,
+                     cache_path: Optional[str] = 'catalog_stats_cache.json',
+                     output: Optional[str] = None) -> Dict:
+    """Print the summary of the given catalogs, saving the statistics as JSON when output is set"""
+    started_at = time.perf_counter()
+    stats, from_cache = cached_stats(catalogs or DEFAULT_CATALOGS, images_dir, cache_path)
+    print(render_summary(stats))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2, ensure_ascii=False)
+        print(f"📄 Statistics saved to: {output}")
+    source = f"cached from {stats['generated_at']}" if from_cache else "computed"
+    print(f"⏱️ {source} in {(time.perf_counter() - started_at) * 1000:.0f} ms")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize field, brand and image coverage of the catalogs")
+    parser.add_argument('catalogs', nargs='*', help=f"Catalog files (default: {' '.join(DEFAULT_CATALOGS)})")
+    parser.add_argument('--images', default=DEFAULT_IMAGES_DIR, help="Directory of local product images")
+    parser.add_argument('--cache', default='catalog_stats_cache.json',
+                        help="Statistics cache keyed by the input hashes")
+    parser.add_argument('--no-cache', action='store_true', help="Always recompute")
+    parser.add_argument('--output', help="Save the statistics as JSON")
+    args = parser.parse_args()
+
+    generate_summary(args.catalogs, args.images, None if args.no_cache else args.cache, args.output)
+
 
 if __name__ == "__main__":
-    generate_summary()
\ No newline at end of file
+    main()
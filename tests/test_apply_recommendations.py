@@ -0,0 +1,31 @@
+"""Recommendations applied to a catalog file"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from apply_recommendations import RecommendationApplier, apply_to_file  # noqa: E402
+
+
+def test_rename_skips_ids_of_later_products(tmp_path):
+    catalog = tmp_path / 'catalog.json'
+    catalog.write_text(json.dumps({'products': [
+        {'product_id': 'x', 'name': 'Serum'},
+        {'product_id': 'x', 'name': 'Serum Travel', 'size': '50 ml'},
+        {'product_id': 'x-50-ml', 'name': 'Serum Mini'},
+    ]}), encoding='utf-8')
+    recommendations = [{
+        'action': 'FIX_ID_CONFLICT',
+        'product1': {'id': 'x', 'name': 'Serum'},
+        'product2': {'id': 'x', 'name': 'Serum Travel', 'size': '50 ml'},
+    }]
+    output = tmp_path / 'cleaned.json'
+
+    applier = RecommendationApplier().load(recommendations)
+    apply_to_file(applier, str(catalog), str(output))
+
+    ids = [product['product_id'] for product in json.loads(output.read_text(encoding='utf-8'))['products']]
+    assert ids == ['x', 'x-50-ml-2', 'x-50-ml']
+    assert applier.stats['renamed'] == 1
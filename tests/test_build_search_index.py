@@ -0,0 +1,42 @@
+"""Sharded search index against the client's shard lookup"""
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import build_search_index  # noqa: E402
+from build_search_index import build_postings, build_shards  # noqa: E402
+
+
+def shard_key(shards, word):
+    """Longest shard key the word starts with, as shardKey() in src/lib/search.ts"""
+    for length in range(len(word), 0, -1):
+        if word[:length] in shards:
+            return word[:length]
+    return None
+
+
+def test_every_key_is_found_through_the_longest_shard_key(monkeypatch):
+    rng = random.Random(5)
+    syllables = ['se', 'rum', 'kre', 'm', 'ha', 'dra', 'to', 'nik', 'ser', 'a', 'sa', 'ç', 'ış', 'jel']
+    products = [{'name': ' '.join(''.join(rng.choices(syllables, k=rng.randint(1, 4))) for _ in range(3)),
+                 'brand': rng.choice(['Theraderm', 'Genosys', 'Me Line']),
+                 'description': 'serum krem sabah akşam'} for _ in range(300)]
+    terms, prefixes = build_postings(products)
+
+    monkeypatch.setattr(build_search_index, 'MAX_SHARD_BYTES', 512)
+    shards = build_shards(terms, prefixes)
+    assert any(len(key) > 1 for key in shards)
+
+    decoded = {key: json.loads(content) for key, content in shards.items()}
+    for kind, postings in (('terms', terms), ('prefixes', prefixes)):
+        for word, expected in postings.items():
+            shard = decoded[shard_key(shards, word)]
+            assert shard[kind][word] == [list(posting) for posting in expected]
+
+    # Each key is stored once
+    assert sum(len(shard['terms']) for shard in decoded.values()) == len(terms)
+    assert sum(len(shard['prefixes']) for shard in decoded.values()) == len(prefixes)
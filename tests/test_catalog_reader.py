@@ -0,0 +1,57 @@
+"""Streaming catalog reader against json.load, whatever the chunk boundaries"""
+
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_reader import iter_catalog  # noqa: E402
+
+CATALOGS = [
+    '{"products": [{"name": "A"}], "z": 1.5}',
+    '{"count": -12.5e+3, "products": [{"name": "A", "price": 1.25}, {"name": "B"}], "total": 10, "ratio": 2E-2}',
+    '{"summary": {"n": 100}, "products": [{"name": "Şampuan", "size": 250}], "flag": true, "none": null}',
+    '[{"name": "A", "price": 19.99}, {"name": "B", "price": 1e3}]',
+]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64 * 1024])
+@pytest.mark.parametrize('content', CATALOGS)
+def test_matches_json_load(tmp_path, content, chunk_size):
+    path = tmp_path / 'catalog.json'
+    path.write_text(content, encoding='utf-8')
+    expected = json.loads(content)
+
+    extras = {}
+    products = list(iter_catalog(str(path), chunk_size=chunk_size, extras=extras))
+
+    if isinstance(expected, list):
+        assert products == expected
+        assert extras == {}
+    else:
+        assert products == expected.pop('products')
+        assert extras == expected
+
+
+def _lookups(record):
+    return record.get('product_id', ''), 'size' in record, record.get('name'), record['brand']
+
+
+def test_records_survive_pickling(tmp_path):
+    path = tmp_path / 'catalog.json'
+    path.write_text('{"products": [{"name": "A", "brand": "X", "price": 5}]}', encoding='utf-8')
+    record, = iter_catalog(str(path), fields=('product_id', 'name', 'brand', 'size'))
+
+    copy = pickle.loads(pickle.dumps(record))
+    assert _lookups(copy) == ('', False, 'A', 'X')
+    assert copy['price'] == 5
+    with pytest.raises(KeyError):
+        copy['size']
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(_lookups, record).result() == ('', False, 'A', 'X')
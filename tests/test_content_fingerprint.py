@@ -0,0 +1,55 @@
+"""SimHash content fingerprints and their permuted block-table lookup"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_fingerprint import SimHashIndex, content_text, hamming_distance, simhash  # noqa: E402
+
+SERUM = ("Hyaluronik asit ve niasinamid içeren bu serum cildi yoğun şekilde nemlendirir, gözenek görünümünü "
+         "azaltır ve cilt bariyerini güçlendirir. Sabah ve akşam temiz cilde birkaç damla uygulayın. Tüm cilt "
+         "tipleri için uygundur. Parfüm ve paraben içermez, dermatolojik olarak test edilmiştir.")
+SERUM_INGREDIENTS = ("Aqua, Glycerin, Niacinamide, Sodium Hyaluronate, Panthenol, Allantoin, "
+                     "Phenoxyethanol, Ethylhexylglycerin")
+SUN_CREAM = ("Güneş koruyucu krem SPF 50 yüksek koruma sağlar, suya dayanıklı formülü ile plajda ve havuzda "
+             "güvenle kullanılır. Güneşe çıkmadan 20 dakika önce bolca uygulayın.")
+
+
+def test_near_identical_descriptions_are_found_and_unrelated_ones_are_not():
+    products = {
+        'serum': {'description': SERUM, 'ingredients': SERUM_INGREDIENTS},
+        # Same text with other punctuation and an ingredient list instead of a string
+        'serum-copy': {'description': SERUM.replace(',', ' -'),
+                       'ingredients': SERUM_INGREDIENTS.split(', ')},
+        # One word reworded
+        'serum-edit': {'description': SERUM.replace('yoğun', 'derinlemesine'), 'ingredients': SERUM_INGREDIENTS},
+        'sun-cream': {'description': SUN_CREAM, 'ingredients': 'Aqua, Octocrylene, Zinc Oxide'},
+    }
+    index = SimHashIndex(max_distance=3).add_all(
+        (key, simhash(content_text(product))) for key, product in products.items())
+
+    assert [(a, b) for a, b, _ in index.near_pairs()] == [
+        ('serum', 'serum-copy'), ('serum', 'serum-edit'), ('serum-copy', 'serum-edit')]
+
+
+def test_block_tables_find_every_fingerprint_within_distance():
+    rng = random.Random(7)
+    fingerprints = {}
+    for base in range(50):
+        fingerprint = rng.getrandbits(64)
+        fingerprints[(base, 0)] = fingerprint
+        # Copies at 1..6 bits apart, straddling max_distance
+        for flips in range(1, 7):
+            copy = fingerprint
+            for bit in rng.sample(range(64), flips):
+                copy ^= 1 << bit
+            fingerprints[(base, flips)] = copy
+
+    for max_distance in (2, 3, 5):
+        index = SimHashIndex(max_distance).add_all(fingerprints.items())
+        expected = sorted((a, b, hamming_distance(fingerprints[a], fingerprints[b]))
+                          for a in fingerprints for b in fingerprints
+                          if a < b and hamming_distance(fingerprints[a], fingerprints[b]) <= max_distance)
+        assert list(index.near_pairs()) == expected
@@ -0,0 +1,28 @@
+"""Incremental duplicate detection against the persistent index"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup_index import DedupIndex  # noqa: E402
+
+
+def test_product_sharing_an_id_is_still_indexed_and_compared():
+    with DedupIndex(':memory:') as index:
+        update = index.update([
+            {'product_id': 'x', 'name': 'Hydra Serum', 'brand': 'Theraderm'},
+            {'product_id': 'x', 'name': 'Sun Cream SPF50', 'brand': 'Theraderm'},
+            {'product_id': 'y', 'name': 'Sun Cream SPF 50', 'brand': 'Theraderm'},
+        ])
+        assert (update['new'], update['skipped']) == (3, 0)
+        assert [(match['name'], match['match_name']) for match in update['matches']] == [
+            ('Sun Cream SPF 50', 'Sun Cream SPF50')]
+
+        # The same catalog again is unchanged, colliding id included
+        update = index.update([
+            {'product_id': 'x', 'name': 'Hydra Serum', 'brand': 'Theraderm'},
+            {'product_id': 'x', 'name': 'Sun Cream SPF50', 'brand': 'Theraderm'},
+            {'product_id': 'x', 'name': 'Sun Cream SPF50', 'brand': 'Theraderm'},
+        ])
+        assert (update['unchanged'], update['skipped']) == (2, 1)
@@ -0,0 +1,45 @@
+"""Cross-catalog duplicate clustering"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duplicate_clusters import DuplicateClusterer  # noqa: E402
+
+
+def cluster_names(catalogs):
+    clusterer = DuplicateClusterer()
+    for path, products in catalogs:
+        clusterer.add_catalog(path, products)
+    return sorted(sorted(clusterer.records[position]['name'] for position in members)
+                  for members in clusterer.cluster())
+
+
+def test_id_conflict_within_a_catalog_is_not_merged():
+    clusters = cluster_names([
+        ('scraped.json', [{'product_id': '17', 'name': 'AC Serum', 'brand': 'Theraderm'},
+                          {'product_id': '17', 'name': 'Peeling Gel', 'brand': 'Theraderm'}]),
+        ('site.json', [{'product_id': '17', 'name': 'AC Serum 30 ml', 'brand': 'Theraderm'}]),
+    ])
+    assert clusters == [['AC Serum', 'AC Serum 30 ml'], ['Peeling Gel']]
+
+
+def test_name_that_adds_words_is_reviewed_not_merged():
+    clusterer = DuplicateClusterer()
+    clusterer.add_catalog('site.json', [
+        {'slug': 'hydra-gel-mask', 'name': 'HYDRA Gel Mask', 'brand': 'Theraderm'},
+        {'slug': 'sos-hydra-gel-mask-50-ml', 'name': 'SOS Hydra Gel Mask 50 ml', 'brand': 'Theraderm'},
+    ])
+    result = clusterer.build()
+    assert result['total_clusters'] == 2
+    assert result['review_families'] == [['hydra-gel-mask', 'sos-hydra-gel-mask-50-ml']]
+
+
+def test_similar_name_does_not_merge_two_entries_of_one_catalog():
+    clusters = cluster_names([
+        ('site.json', [{'slug': 'u-v-protect-spf-30', 'name': 'U.V. protect SPF 30', 'brand': 'Genosys'}]),
+        ('products.json', [{'name': 'U.V. protect SPF 30', 'brand': 'Genosys'},
+                           {'name': 'UV Protect SPF 30+ 200 ml', 'brand': 'Genosys'}]),
+    ])
+    assert clusters == [['U.V. protect SPF 30', 'U.V. protect SPF 30'], ['UV Protect SPF 30+ 200 ml']]
@@ -0,0 +1,56 @@
+"""MinHash LSH candidates against all-pairs SequenceMatcher"""
+
+import itertools
+import os
+import random
+import sys
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyze_duplicates import ProductDuplicateAnalyzer  # noqa: E402
+from similarity_index import MinHashLSH  # noqa: E402
+
+WORDS = ['hydra', 'serum', 'cream', 'gel', 'mask', 'vitamin', 'peeling', 'tonic', 'foam', 'oil',
+         'repair', 'daily', 'night', 'spf', 'protect', 'clear', 'bright', 'age', 'lift', 'balm']
+SIZES = ['', ' 30 ml', ' 50 ml', ' 200 ml']
+
+
+def synthetic_names(count: int, seed: int = 3):
+    """Product names plus near variants (typos, spacing, sizes, dropped words)"""
+    rng = random.Random(seed)
+    names = []
+    while len(names) < count:
+        words = rng.sample(WORDS, rng.randint(2, 4))
+        name = ' '.join(words) + rng.choice(SIZES)
+        names.append(name)
+        variant = rng.choice([
+            name.replace(' ', '', 1),
+            name + rng.choice(SIZES),
+            name[:-1],
+            ' '.join(words[:-1]) + ' ' + words[-1][:-1] + rng.choice(SIZES),
+        ])
+        names.append(variant.strip())
+    return sorted(set(names))
+
+
+def test_lsh_candidates_cover_every_all_pairs_match():
+    names = synthetic_names(400)
+    expected = set()
+    for a, b in itertools.combinations(range(len(names)), 2):
+        matcher = SequenceMatcher(None, names[a], names[b])
+        # quick_ratio() bounds ratio() from above, so this skips no match
+        if matcher.quick_ratio() >= 0.85 and matcher.ratio() >= 0.85:
+            expected.add((a, b))
+    assert len(expected) > 100
+
+    index = MinHashLSH().add_all(enumerate(names))
+    assert expected <= set(index.candidate_pairs())
+
+
+def test_analyzer_recall_on_the_index_is_complete():
+    products = [{'name': name, 'brand': 'Theraderm'} for name in synthetic_names(300)]
+    result = ProductDuplicateAnalyzer('').check_similar_recall(products)
+    assert result['expected'] > 0
+    assert result['recall'] == 1.0
+    assert result['candidate_pairs'] < result['all_pairs']
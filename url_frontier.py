@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+URL frontier for the NK Beauty scrapers
+Discovers product URLs by crawling paginated brand listings, seeded with
+the brand's listing pages found in sitemap.xml, normalizing every URL and
+de-duplicating through set-backed indexes
+"""
+
+import re
+import xml.etree.ElementTree as ET
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# fetch(url) -> (status, body), as provided by the scrapers
+Fetcher = Callable[[str], Tuple[int, bytes]]
+AsyncFetcher = Callable[[str], Awaitable[Tuple[int, bytes]]]
+
+TRACKING_PARAMS = {'fbclid', 'gclid', 'yclid', 'mc_cid', 'mc_eid'}
+# Query parameters that select a page of a listing; sort and filter parameters
+# only reorder or narrow the same products and are dropped from listing URLs
+PAGINATION_PARAMS = {'page', 'p', 'pg', 'sayfa'}
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+# Only the link-bearing tags of a listing page are built into a tree
+LINK_STRAINER = SoupStrainer(['a', 'link'])
+
+
+def normalize_url(url: str, base_url: Optional[str] = None) -> str:
+    """Canonical form of a URL: absolute, lowercase host, no fragment/tracking params/trailing slash"""
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url.strip())
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = re.sub(r'/{2,}', '/', parts.path) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    ))
+
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class URLFrontier:
+    """Collects product URLs for one brand
+
+    Listing pages (the brand category page, its sub-paths and pagination,
+    and any listing URLs found in sitemap.xml) are queued breadth-first,
+    keeping only pagination query parameters so sort and filter variants
+    of a page collapse into the page itself; product links found
+    on them are recorded once, in discovery order. Product URLs listed in
+    the sitemap are not recorded: nothing in them says which brand they
+    belong to, so products only come from the brand's listings. `seen` is a set, so
+    de-duplication costs O(1) per link however large the catalog grows.
+    """
+
+    def __init__(self, base_url: str, listing_prefix: str, product_pattern: str = r'/urun/',
+                 max_listing_pages: int = 100):
+        self.base_url = normalize_url(base_url)
+        self.host = urlsplit(self.base_url).netloc
+        self.listing_prefix = listing_prefix.rstrip('/')
+        self.product_pattern = re.compile(product_pattern)
+        self.max_listing_pages = max_listing_pages
+
+        self.seen: Set[str] = set()
+        self.product_urls: List[str] = []
+        self.listing_queue: Deque[str] = deque()
+        self.listings_fetched = 0
+
+    def normalize(self, url: str) -> Optional[str]:
+        """Normalize a URL, returning None for links that leave the site or cannot be parsed"""
+        try:
+            # A malformed port ('http://x.com:abc/') or IPv6 host makes urlsplit raise
+            normalized = normalize_url(url, self.base_url)
+        except ValueError:
+            return None
+        parts = urlsplit(normalized)
+        if parts.scheme not in ('http', 'https'):
+            return None
+        # nurederm.com and www.nurederm.com serve the same pages
+        host = parts.netloc
+        if host != self.host and host.removeprefix('www.') != self.host.removeprefix('www.'):
+            return None
+        if host != self.host:
+            normalized = urlunsplit((parts.scheme, self.host, parts.path, parts.query, ''))
+        return normalized
+
+    def _add(self, url: str) -> Optional[str]:
+        normalized = self.normalize(url)
+        if normalized is None or normalized in self.seen:
+            return None
+        self.seen.add(normalized)
+        return normalized
+
+    def is_listing(self, url: str) -> bool:
+        path = urlsplit(url).path
+        return path == self.listing_prefix or path.startswith(self.listing_prefix + '/')
+
+    def listing_url(self, url: str) -> str:
+        """Normalized listing URL with every query parameter but pagination dropped"""
+        parts = urlsplit(url)
+        query = urlencode([(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                           if key.lower() in PAGINATION_PARAMS])
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+
+    def is_product(self, url: str) -> bool:
+        return bool(self.product_pattern.search(urlsplit(url).path))
+
+    def add_listing(self, url: str) -> bool:
+        """Queue a listing page; returns False if it was already seen"""
+        normalized = self.normalize(url)
+        if normalized is not None:
+            normalized = self._add(self.listing_url(normalized))
+        if normalized is None:
+            return False
+        self.listing_queue.append(normalized)
+        return True
+
+    def add_product(self, url: str) -> bool:
+        """Record a product URL; returns False if it was already seen"""
+        normalized = self._add(url)
+        if normalized is None:
+            return False
+        self.product_urls.append(normalized)
+        return True
+
+    def _sitemap_start(self, sitemap_url: Optional[str]) -> Deque[str]:
+        return deque([sitemap_url or urljoin(self.base_url, '/sitemap.xml')])
+
+    def _read_sitemap(self, url: str, status: int, content: bytes, pending: Deque[str]) -> int:
+        """Queue sitemap-index children and the brand's listing pages from one sitemap"""
+        if status != 200 or not content:
+            return 0
+        try:
+            root = ET.fromstring(content)
+        except ET.ParseError:
+            print(f"Could not parse sitemap {url}")
+            return 0
+
+        found = 0
+        is_index = root.tag.endswith('sitemapindex')
+        for loc in root.iter():
+            if not loc.tag.endswith('loc') or not loc.text:
+                continue
+            location = loc.text.strip()
+            if is_index:
+                pending.append(location)
+                continue
+            normalized = self.normalize(location)
+            if normalized is not None and self.is_listing(normalized) and self.add_listing(normalized):
+                found += 1
+        return found
+
+    def discover_sitemap(self, fetch: Fetcher, sitemap_url: Optional[str] = None, max_sitemaps: int = 20) -> int:
+        """Queue the brand's listing pages found in sitemap.xml (following sitemap indexes)"""
+        pending = self._sitemap_start(sitemap_url)
+        visited = set()
+        found = 0
+
+        while pending and len(visited) < max_sitemaps:
+            url = pending.popleft()
+            if url in visited:
+                continue
+            visited.add(url)
+            try:
+                response = fetch(url)
+            except Exception as e:
+                # The sitemap is an extra source; the listings are still crawled without it
+                print(f"Could not fetch sitemap {url}: {e}")
+                continue
+            found += self._read_sitemap(url, *response, pending)
+
+        return found
+
+    async def discover_sitemap_async(self, fetch: AsyncFetcher, sitemap_url: Optional[str] = None,
+                                     max_sitemaps: int = 20) -> int:
+        """Async counterpart of discover_sitemap"""
+        pending = self._sitemap_start(sitemap_url)
+        visited = set()
+        found = 0
+
+        while pending and len(visited) < max_sitemaps:
+            url = pending.popleft()
+            if url in visited:
+                continue
+            visited.add(url)
+            try:
+                response = await fetch(url)
+            except Exception as e:
+                # The sitemap is an extra source; the listings are still crawled without it
+                print(f"Could not fetch sitemap {url}: {e}")
+                continue
+            found += self._read_sitemap(url, *response, pending)
+
+        return found
+
+    def parse_listing(self, content: bytes) -> Tuple[int, int]:
+        """Record product links and queue further listing pages from one listing page"""
+        soup = BeautifulSoup(content, 'lxml', parse_only=LINK_STRAINER)
+        products = listings = 0
+
+        for link in soup.find_all(['a', 'link']):
+            href = link.get('href')
+            if not href:
+                continue
+            if link.name == 'link' and 'next' not in (link.get('rel') or []):
+                continue
+
+            normalized = self.normalize(href)
+            if normalized is None:
+                continue
+            if self.is_product(normalized):
+                products += self.add_product(normalized)
+            elif self.is_listing(normalized):
+                listings += self.add_listing(normalized)
+
+        return products, listings
+
+    def _read_listing(self, url: str, status: int, content: bytes) -> None:
+        self.listings_fetched += 1
+        if status != 200:
+            print(f"Failed to fetch listing page {url}: {status}")
+            return
+        products, listings = self.parse_listing(content)
+        print(f"  {url}: {products} new products, {listings} new listing pages")
+
+    def _listing_failed(self, url: str, error: Exception) -> None:
+        """Skip a listing page whose fetch raised, keeping the products found so far"""
+        self.listings_fetched += 1
+        print(f"Failed to fetch listing page {url}: {error}")
+
+    def _listings_done(self) -> List[str]:
+        if self.listing_queue:
+            print(f"Stopped after {self.max_listing_pages} listing pages, "
+                  f"{len(self.listing_queue)} left unvisited")
+        return self.product_urls
+
+    def crawl_listings(self, fetch: Fetcher) -> List[str]:
+        """Fetch queued listing pages breadth-first and return every product URL found"""
+        while self.listing_queue and self.listings_fetched < self.max_listing_pages:
+            url = self.listing_queue.popleft()
+            try:
+                response = fetch(url)
+            except Exception as e:
+                self._listing_failed(url, e)
+                continue
+            self._read_listing(url, *response)
+        return self._listings_done()
+
+    async def crawl_listings_async(self, fetch: AsyncFetcher) -> List[str]:
+        """Async counterpart of crawl_listings; pages are still visited one at a time, in order"""
+        while self.listing_queue and self.listings_fetched < self.max_listing_pages:
+            url = self.listing_queue.popleft()
+            try:
+                response = await fetch(url)
+            except Exception as e:
+                self._listing_failed(url, e)
+                continue
+            self._read_listing(url, *response)
+        return self._listings_done()